@@ -1,8 +1,9 @@
-from flask import Flask, request, jsonify
+from flask import Blueprint, Flask, current_app, g, jsonify, make_response, request
 from flask_cors import CORS
 from flask_pymongo import PyMongo
-from werkzeug.security import generate_password_hash, check_password_hash
 from bson.objectid import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 import jwt
 from datetime import datetime, timedelta
 from functools import wraps
@@ -12,62 +13,170 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
-app = Flask(__name__)
-
-# CORS configuration - Allow both localhost and 127.0.0.1
-CORS(app,
-     resources={r"/api/*": {
-         "origins": ["http://localhost:3000", "http://127.0.0.1:3000"],
-         "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-         "allow_headers": ["Content-Type", "Authorization"],
-         "supports_credentials": True,
-         "expose_headers": ["Content-Type", "Authorization"]
-     }})
-
-# Configuration
-app.config['MONGO_URI'] = os.environ.get('MONGO_URI')
-app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY')
-
-# Initialize PyMongo
-try:
-    mongo = PyMongo(app)
-    # Test connection
-    mongo.db.command('ping')
-    print("✓ MongoDB connection successful!")
-except Exception as e:
-    print(f"✗ MongoDB connection failed: {e}")
-    mongo = None
-
-# Token verification decorator
+# Local modules read their settings from the environment, so import them after .env is loaded
+from archive import find_attended_events, find_hosted_events
+from auth import AuthError, authenticate, invalidate_user, load_user
+from categories import CATEGORIES, adjust_category_count, counted_category, get_category_counts
+from compression import compress_response, etag_matches
+from concurrency import gather
+from dates import parse_date_range, start_of_today
+from event_import import IMPORT_MAX_BYTES, import_event_rows, parse_import
+from events import build_event, build_event_update
+from etags import bump_version, bump_versions, compute_etag, feed_key, get_versions, school_key, user_key
+from hosts import embed_hosts, load_host_summaries
+from indexes import IndexBuildError, ensure_indexes
+from json_provider import FastJSONProvider
+from logger import configure_logging, log
+from pagination import fetch_page, fetch_ranked_page, parse_page_args, rank_offset
+from passwords import HashingBusy, hash_password, throttle_attempt, verify_password
+from ranking import invalidate_feed, ranked_event_ids, refresh_event
+from search import parse_search_query, search_event_ids
+from rsvps import add_rsvp, attending_event_ids, has_rsvp, remove_rsvp, rsvped_event_ids, update_rsvp_dates
+from serializers import event_projection, serialize_event
+from waitlist import (claim_seat, is_waitlisted, join_waitlist, leave_waitlist, promote_waitlisted, release_seat,
+                      waitlist_position)
+
+mongo = PyMongo()
+api = Blueprint('api', __name__)
+
+def create_app():
+    """
+    Application factory.
+
+    Each process builds its own app and MongoClient, so under a preforking
+    server (see gunicorn.conf.py) no client is ever shared across fork().
+    """
+    app = Flask(__name__)
+    # orjson-backed jsonify; responses keep the key order handlers build them in
+    app.json = FastJSONProvider(app)
+    app.json.sort_keys = False
+    configure_logging(app)
+
+    # CORS configuration - Allow both localhost and 127.0.0.1
+    CORS(app,
+         resources={r"/api/*": {
+             "origins": ["http://localhost:3000", "http://127.0.0.1:3000"],
+             "methods": ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
+             "allow_headers": ["Content-Type", "Authorization", "If-None-Match"],
+             "supports_credentials": True,
+             "expose_headers": ["Content-Type", "Authorization", "X-Request-ID", "ETag"],
+             # Let browsers reuse preflight results instead of an OPTIONS round trip per request
+             "max_age": int(os.environ.get('CORS_MAX_AGE', 86400))
+         }})
+
+    # Configuration
+    app.config['MONGO_URI'] = os.environ.get('MONGO_URI')
+    app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY')
+
+    # Initialize PyMongo - the pool is per process, so size it for this worker's threads
+    mongo.init_app(
+        app,
+        maxPoolSize=int(os.environ.get('MONGO_MAX_POOL_SIZE', 50)),
+        minPoolSize=int(os.environ.get('MONGO_MIN_POOL_SIZE', 0)),
+        serverSelectionTimeoutMS=int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000)),
+        connectTimeoutMS=int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', 5000)),
+        socketTimeoutMS=int(os.environ.get('MONGO_SOCKET_TIMEOUT_MS', 10000)),
+        waitQueueTimeoutMS=int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', 2000))
+    )
+
+    # Make sure every hot query is backed by an index. Under gunicorn the master
+    # does this once before forking and turns it off for the workers.
+    if os.environ.get('ENSURE_INDEXES_ON_STARTUP', 'true').lower() == 'true':
+        try:
+            ensure_indexes(mongo.db)
+        except IndexBuildError as e:
+            # The other indexes were still created
+            for label, error in e.failures:
+                log.error(f'Could not create MongoDB index {label}: {error}')
+        except Exception:
+            log.error('Could not ensure MongoDB indexes', exc_info=True)
+
+    # Compress large JSON bodies for clients that accept gzip/brotli
+    app.after_request(lambda response: compress_response(request, response))
+
+    app.register_blueprint(api)
+    return app
+
+# Token verification decorator - shared by every authenticated route
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = request.headers.get('Authorization')
-
-        if not token:
-            print("❌ No token provided in Authorization header")
-            return jsonify({'message': 'Token is missing'}), 401
+        # Let CORS preflight requests through without a token
+        if request.method == 'OPTIONS':
+            return '', 200
 
         try:
-            if token.startswith('Bearer '):
-                token = token[7:]
-            print(f"🔍 Decoding token: {token[:20]}...")
-            data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
-            print(f"✓ Token decoded successfully, user_id: {data['user_id']}")
-            current_user = mongo.db.users.find_one({'_id': ObjectId(data['user_id'])})
-            if not current_user:
-                print(f"❌ User not found with id: {data['user_id']}")
-                return jsonify({'message': 'User not found'}), 401
-            print(f"✓ User found: {current_user.get('email')}")
-        except Exception as e:
-            print(f"❌ Token validation error: {str(e)}")
-            return jsonify({'message': f'Token is invalid: {str(e)}'}), 401
+            current_user = authenticate(mongo.db, current_app.config['SECRET_KEY'],
+                                        request.headers.get('Authorization'))
+        except AuthError as e:
+            log.debug('authentication failed', extra={'fields': {'reason': str(e)}})
+            return jsonify({'message': str(e)}), 401
 
         return f(current_user, *args, **kwargs)
 
     return decorated
 
-@app.route('/api/signup', methods=['POST', 'OPTIONS'])
+def not_modified(etag):
+    """304 for a client whose cached copy (possibly a compressed variant) is current"""
+    response = make_response('', 304)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+# Conditional GET decorator - goes below token_required.
+# Scopes name the version counters a response depends on:
+#   'school' - the current user's school, 'user' - the current user,
+#   'target' - the user named by the <user_id> URL parameter,
+#   'feed' - the ranked feeds of the current user's school (see ranking.py)
+def conditional_get(*scopes):
+    def decorator(f):
+        @wraps(f)
+        def decorated(current_user, *args, **kwargs):
+            keys = []
+            for scope in scopes:
+                if scope == 'school':
+                    keys.append(school_key(current_user.get('school')))
+                elif scope == 'user':
+                    keys.append(user_key(current_user['_id']))
+                elif scope == 'target':
+                    keys.append(user_key(kwargs['user_id']))
+                elif scope == 'feed':
+                    keys.append(feed_key(current_user.get('school')))
+
+            # The ETag also varies on who is asking, on the query string and on the
+            # day, since the default date range (upcoming events) moves at midnight
+            versions = get_versions(mongo.db, keys)
+            etag = compute_etag(keys, versions, current_user['_id'], request.full_path, start_of_today().date())
+            # Let the route check its in-process caches against the same versions
+            g.versions = dict(zip(keys, versions))
+            matched = etag_matches(request.if_none_match, etag)
+            if matched:
+                return not_modified(matched)
+
+            # The response is about to be rebuilt - only refetch the cached user if
+            # their version moved since it was loaded (e.g. a write in another worker)
+            if 'user' in scopes:
+                current_user = load_user(mongo.db, str(current_user['_id']),
+                                         g.versions[user_key(current_user['_id'])]) or current_user
+
+            response = make_response(f(current_user, *args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag)
+                # Per-user data: browsers may keep it but must revalidate every time
+                response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+
+        return decorated
+
+    return decorator
+
+def retry_later(message, status, retry_after):
+    """429/503 response telling the client how many seconds to back off"""
+    response = make_response(jsonify({'message': message}), status)
+    response.headers['Retry-After'] = str(int(retry_after) + 1)
+    return response
+
+@api.route('/api/signup', methods=['POST', 'OPTIONS'])
 def signup():
     if request.method == 'OPTIONS':
         return '', 200
@@ -84,12 +193,16 @@ def signup():
                 'message': f'Missing required fields: {", ".join(missing_fields)}'
             }), 400
 
+        retry_after = throttle_attempt(request.remote_addr)
+        if retry_after:
+            return retry_later('Too many attempts, please try again later', 429, retry_after)
+
         # Check if user exists
         if mongo.db.users.find_one({'email': data['email']}):
             return jsonify({'message': 'User already exists'}), 409
 
-        # Create user
-        hashed_password = generate_password_hash(data['password'])
+        # Create user - hashing runs on the password pool, not this thread
+        hashed_password = hash_password(data['password'])
         user = {
             'first_name': data['first_name'],
             'last_name': data['last_name'],
@@ -104,13 +217,17 @@ def signup():
             'created_at': datetime.utcnow()
         }
 
-        result = mongo.db.users.insert_one(user)
+        try:
+            result = mongo.db.users.insert_one(user)
+        except DuplicateKeyError:
+            # Another signup with the same email won the race
+            return jsonify({'message': 'User already exists'}), 409
 
         # Generate token
         token = jwt.encode({
             'user_id': str(result.inserted_id),
             'exp': datetime.utcnow() + timedelta(days=7)
-        }, app.config['SECRET_KEY'], algorithm='HS256')
+        }, current_app.config['SECRET_KEY'], algorithm='HS256')
 
         return jsonify({
             'message': 'User created successfully',
@@ -122,12 +239,14 @@ def signup():
                 'email': data['email']
             }
         }), 201
-        
+
+    except HashingBusy:
+        return retry_later('Server busy, please try again', 503, 0)
     except Exception as e:
-        print(f"Signup error: {e}")
+        log.exception('signup error')
         return jsonify({'message': f'Server error: {str(e)}'}), 500
 
-@app.route('/api/login', methods=['POST', 'OPTIONS'])
+@api.route('/api/login', methods=['POST', 'OPTIONS'])
 def login():
     if request.method == 'OPTIONS':
         return '', 200
@@ -138,15 +257,31 @@ def login():
         if not data.get('email') or not data.get('password'):
             return jsonify({'message': 'Missing email or password'}), 400
 
+        # Cap how much hashing any one client or account can cause
+        retry_after = throttle_attempt(request.remote_addr, data['email'])
+        if retry_after:
+            return retry_later('Too many login attempts, please try again later', 429, retry_after)
+
         user = mongo.db.users.find_one({'email': data['email']})
+        if not user:
+            return jsonify({'message': 'Invalid credentials'}), 401
 
-        if not user or not check_password_hash(user['password'], data['password']):
+        matches, needs_rehash = verify_password(user['password'], data['password'])
+        if not matches:
             return jsonify({'message': 'Invalid credentials'}), 401
 
+        if needs_rehash:
+            # Hashing parameters changed - upgrade the stored hash while we have the password
+            mongo.db.users.update_one(
+                {'_id': user['_id'], 'password': user['password']},
+                {'$set': {'password': hash_password(data['password'])}}
+            )
+            invalidate_user(user['_id'])
+
         token = jwt.encode({
             'user_id': str(user['_id']),
             'exp': datetime.utcnow() + timedelta(days=7)
-        }, app.config['SECRET_KEY'], algorithm='HS256')
+        }, current_app.config['SECRET_KEY'], algorithm='HS256')
 
         return jsonify({
             'message': 'Login successful',
@@ -158,96 +293,115 @@ def login():
                 'email': user['email']
             }
         }), 200
-        
+
+    except HashingBusy:
+        return retry_later('Server busy, please try again', 503, 0)
     except Exception as e:
-        print(f"Login error: {e}")
+        log.exception('login error')
         return jsonify({'message': f'Server error: {str(e)}'}), 500
 
-@app.route('/api/profile', methods=['GET', 'OPTIONS'])
-def get_profile():
-    if request.method == 'OPTIONS':
-        return '', 200
-
-    # Get current user from token
-    token = request.headers.get('Authorization')
-    if not token:
-        return jsonify({'message': 'Token is missing'}), 401
-
+def include_requested(name):
+    """Whether the client asked for an optional section, e.g. ?include=host"""
+    return name in request.args.get('include', '').split(',')
+
+# Exactly the fields profile_data() reads - never the password hash
+PROFILE_PROJECTION = {field: 1 for field in ('first_name', 'last_name', 'email', 'gender', 'school', 'grade_level',
+                                             'interests', 'bio', 'profile_pic', 'created_at')}
+
+def profile_data(user):
+    """The signed-in user's own profile, as returned by /api/profile and /api/dashboard"""
+    return {
+        'id': str(user['_id']),
+        'first_name': user['first_name'],
+        'last_name': user['last_name'],
+        'email': user['email'],
+        'gender': user.get('gender'),
+        'school': user.get('school'),
+        'grade_level': user.get('grade_level'),
+        'interests': user.get('interests', []),
+        'bio': user.get('bio'),
+        'profile_pic': user.get('profile_pic'),
+        'created_at': user['created_at'].isoformat()
+    }
+
+@api.route('/api/profile', methods=['GET', 'OPTIONS'])
+@token_required
+@conditional_get('user')
+def get_profile(current_user):
+    return jsonify({'user': profile_data(current_user)}), 200
+
+@api.route('/api/dashboard', methods=['GET', 'OPTIONS'])
+@token_required
+@conditional_get('school', 'user')
+def get_dashboard(current_user):
+    """Profile, attending and hosting sections for the Profile page in one response"""
     try:
-        if token.startswith('Bearer '):
-            token = token[7:]
-        data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
-        current_user = mongo.db.users.find_one({'_id': ObjectId(data['user_id'])})
-        if not current_user:
-            return jsonify({'message': 'User not found'}), 401
-    except Exception as e:
-        return jsonify({'message': f'Token is invalid: {str(e)}'}), 401
-
-    return jsonify({
-        'user': {
-            'id': str(current_user['_id']),
-            'first_name': current_user['first_name'],
-            'last_name': current_user['last_name'],
-            'email': current_user['email'],
-            'gender': current_user.get('gender'),
-            'school': current_user.get('school'),
-            'grade_level': current_user.get('grade_level'),
-            'interests': current_user.get('interests', []),
-            'bio': current_user.get('bio'),
-            'profile_pic': current_user.get('profile_pic'),
-            'created_at': current_user['created_at'].isoformat()
-        }
-    }), 200
-
-@app.route('/api/user/<user_id>', methods=['GET', 'OPTIONS'])
-def get_user_by_id(user_id):
-    if request.method == 'OPTIONS':
-        return '', 200
+        user_id = str(current_user['_id'])
+        try:
+            date_range = parse_date_range(request.args)
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+
+        event_ids = attending_event_ids(mongo.db, user_id, date_range)
+
+        # One aggregation: the $or match is served by the _id and host_id indexes,
+        # then $facet splits the events into the two sections
+        result = next(mongo.db.events.aggregate([
+            {'$match': {'$or': [{'_id': {'$in': event_ids}}, {'host_id': user_id, 'date': date_range}]}},
+            {'$sort': {'date': 1}},
+            {'$project': event_projection('card')},
+            {'$facet': {
+                'attending': [{'$match': {'_id': {'$in': event_ids}, 'host_id': {'$ne': user_id}}}],
+                'hosting': [{'$match': {'host_id': user_id}}]
+            }}
+        ]))
+
+        attending = [serialize_event(event, 'card') for event in result['attending']]
+        hosting = [serialize_event(event, 'card') for event in result['hosting']]
 
-    # Get current user from token
-    token = request.headers.get('Authorization')
-    if not token:
-        return jsonify({'message': 'Token is missing'}), 401
+        return jsonify({
+            'user': profile_data(current_user),
+            'attending': {'events': attending, 'count': len(attending)},
+            'hosting': {'events': hosting, 'count': len(hosting)}
+        }), 200
 
-    try:
-        if token.startswith('Bearer '):
-            token = token[7:]
-        data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
-        current_user = mongo.db.users.find_one({'_id': ObjectId(data['user_id'])})
-        if not current_user:
-            return jsonify({'message': 'User not found'}), 401
     except Exception as e:
-        return jsonify({'message': f'Token is invalid: {str(e)}'}), 401
+        log.exception('error fetching dashboard')
+        return jsonify({'message': f'Server error: {str(e)}'}), 500
 
+@api.route('/api/user/<user_id>', methods=['GET', 'OPTIONS'])
+@token_required
+@conditional_get('target')
+def get_user_by_id(current_user, user_id):
     try:
-        # Find the user by ID
-        user = mongo.db.users.find_one({'_id': ObjectId(user_id)})
-
-        if not user:
-            return jsonify({'message': 'User not found'}), 404
+        db = mongo.db
 
         # Get query parameter to check if full profile is requested
         full_profile = request.args.get('full', 'false').lower() == 'true'
 
         if full_profile:
-            # Fetch hosting events for this user
-            hosting_events = mongo.db.events.find({
-                'host_id': user_id
-            }).sort('date', 1)
+            include_archived = include_requested('archived')
+            try:
+                date_range = parse_date_range(request.args, default_upcoming=not include_archived)
+            except ValueError as e:
+                return jsonify({'message': str(e)}), 400
+
+            # Fetch the user and their hosting events at the same time
+            user, hosting_events = gather(
+                lambda: db.users.find_one({'_id': ObjectId(user_id)}),
+                lambda: find_hosted_events(db, user_id, date_range, event_projection('host-profile'),
+                                           include_archived)
+            )
+        else:
+            user = db.users.find_one({'_id': ObjectId(user_id)})
 
+        if not user:
+            return jsonify({'message': 'User not found'}), 404
+
+        if full_profile:
             events_list = []
             for event in hosting_events:
-                events_list.append({
-                    'id': str(event['_id']),
-                    'title': event.get('title'),
-                    'description': event.get('description'),
-                    'date': event.get('date'),
-                    'time': event.get('time'),
-                    'location': event.get('location'),
-                    'category': event.get('category'),
-                    'image': event.get('image'),
-                    'attendees_count': len(event.get('registered_users', []))
-                })
+                events_list.append(serialize_event(event, 'host-profile'))
 
             return jsonify({
                 'user': {
@@ -275,55 +429,28 @@ def get_user_by_id(user_id):
             }), 200
 
     except Exception as e:
-        print(f"Error fetching user: {e}")
+        log.exception('error fetching user')
         return jsonify({'message': f'Server error: {str(e)}'}), 500
 
-@app.route('/api/user/hosting', methods=['GET', 'OPTIONS'])
-def get_user_hosting():
-    if request.method == 'OPTIONS':
-        return '', 200
-
-    # Get current user from token
-    token = request.headers.get('Authorization')
-    if not token:
-        return jsonify({'message': 'Token is missing'}), 401
-
-    try:
-        if token.startswith('Bearer '):
-            token = token[7:]
-        data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
-        current_user = mongo.db.users.find_one({'_id': ObjectId(data['user_id'])})
-        if not current_user:
-            return jsonify({'message': 'User not found'}), 401
-    except Exception as e:
-        return jsonify({'message': f'Token is invalid: {str(e)}'}), 401
-
+@api.route('/api/user/hosting', methods=['GET', 'OPTIONS'])
+@token_required
+@conditional_get('user')
+def get_user_hosting(current_user):
     try:
         user_id = str(current_user['_id'])
-        print(f"🔍 Fetching hosted events for user_id: {user_id}")
+        include_archived = include_requested('archived')
+        try:
+            date_range = parse_date_range(request.args, default_upcoming=not include_archived)
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
 
-        # Find all events where this user is the host
-        hosted_events = mongo.db.events.find({
-            'host_id': user_id
-        }).sort('date', 1)
+        # Find the events in the date range where this user is the host
+        hosted_events = find_hosted_events(mongo.db, user_id, date_range, event_projection('card'),
+                                           include_archived)
 
         events_list = []
         for event in hosted_events:
-            events_list.append({
-                'id': str(event['_id']),
-                'title': event.get('title'),
-                'description': event.get('description'),
-                'date': event.get('date'),
-                'time': event.get('time'),
-                'location': event.get('location'),
-                'category': event.get('category'),
-                'image': event.get('image'),
-                'host': event.get('host'),
-                'school': event.get('school'),
-                'attendees_count': len(event.get('registered_users', []))
-            })
-
-        print(f"✓ Found {len(events_list)} hosted events for user")
+            events_list.append(serialize_event(event, 'card'))
 
         return jsonify({
             'events': events_list,
@@ -331,57 +458,28 @@ def get_user_hosting():
         }), 200
 
     except Exception as e:
-        print(f"❌ Error fetching hosted events: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception('error fetching hosted events')
         return jsonify({'message': f'Server error: {str(e)}'}), 500
 
-@app.route('/api/user/events', methods=['GET', 'OPTIONS'])
-def get_user_events():
-    if request.method == 'OPTIONS':
-        return '', 200
-
-    # Get current user from token
-    token = request.headers.get('Authorization')
-    if not token:
-        return jsonify({'message': 'Token is missing'}), 401
-
-    try:
-        if token.startswith('Bearer '):
-            token = token[7:]
-        data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
-        current_user = mongo.db.users.find_one({'_id': ObjectId(data['user_id'])})
-        if not current_user:
-            return jsonify({'message': 'User not found'}), 401
-    except Exception as e:
-        return jsonify({'message': f'Token is invalid: {str(e)}'}), 401
-
+@api.route('/api/user/events', methods=['GET', 'OPTIONS'])
+@token_required
+@conditional_get('school', 'user')
+def get_user_events(current_user):
     try:
         user_id = str(current_user['_id'])
-        print(f"🔍 Fetching attending events for user_id: {user_id}")
+        include_archived = include_requested('archived')
+        try:
+            date_range = parse_date_range(request.args, default_upcoming=not include_archived)
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
 
-        # Find all events where this user is registered BUT NOT the host
-        registered_events = mongo.db.events.find({
-            'registered_users': user_id,
-            'host_id': {'$ne': user_id}  # Exclude events where user is the host
-        }).sort('date', 1)
+        # Find the events in the date range where this user is registered BUT NOT the host
+        registered_events = find_attended_events(mongo.db, user_id, date_range, event_projection('card'),
+                                                 include_archived)
 
         events_list = []
         for event in registered_events:
-            events_list.append({
-                'id': str(event['_id']),
-                'title': event.get('title'),
-                'description': event.get('description'),
-                'date': event.get('date'),
-                'time': event.get('time'),
-                'location': event.get('location'),
-                'category': event.get('category'),
-                'image': event.get('image'),
-                'host': event.get('host'),
-                'school': event.get('school')
-            })
-
-        print(f"✓ Found {len(events_list)} attending events for user")
+            events_list.append(serialize_event(event, 'card'))
 
         return jsonify({
             'events': events_list,
@@ -389,226 +487,140 @@ def get_user_events():
         }), 200
 
     except Exception as e:
-        print(f"❌ Error fetching user events: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception('error fetching user events')
         return jsonify({'message': f'Server error: {str(e)}'}), 500
 
-@app.route('/api/events/categories', methods=['GET', 'OPTIONS'])
-def get_event_categories():
-    if request.method == 'OPTIONS':
-        return '', 200
-
-    # Get current user from token
-    token = request.headers.get('Authorization')
-    if not token:
-        return jsonify({'message': 'Token is missing'}), 401
-
-    try:
-        if token.startswith('Bearer '):
-            token = token[7:]
-        data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
-        current_user = mongo.db.users.find_one({'_id': ObjectId(data['user_id'])})
-        if not current_user:
-            return jsonify({'message': 'User not found'}), 401
-    except Exception as e:
-        return jsonify({'message': f'Token is invalid: {str(e)}'}), 401
-
+@api.route('/api/events/categories', methods=['GET', 'OPTIONS'])
+@token_required
+def get_event_categories(current_user):
     try:
         # Get user's school to filter events
         user_school = current_user.get('school')
 
-        # Define categories with their images
-        categories = [
-            {
-                'name': 'Sports',
-                'image': 'https://images.unsplash.com/photo-1461896836934-ffe607ba8211?w=800&q=80'
-            },
-            {
-                'name': 'Music',
-                'image': 'https://images.unsplash.com/photo-1511379938547-c1f69419868d?w=800&q=80'
-            },
-            {
-                'name': 'Art',
-                'image': 'https://images.unsplash.com/photo-1460661419201-fd4cecdf8a8b?w=800&q=80'
-            },
-            {
-                'name': 'Technology',
-                'image': 'https://images.unsplash.com/photo-1518770660439-4636190af475?w=800&q=80'
-            },
-            {
-                'name': 'Science',
-                'image': 'https://images.unsplash.com/photo-1532094349884-543bc11b234d?w=800&q=80'
-            },
-            {
-                'name': 'Reading',
-                'image': 'https://images.unsplash.com/photo-1481627834876-b7833e8f5570?w=800&q=80'
-            },
-            {
-                'name': 'Gaming',
-                'image': 'https://images.unsplash.com/photo-1511512578047-dfb367046420?w=800&q=80'
-            },
-            {
-                'name': 'Cooking',
-                'image': 'https://images.unsplash.com/photo-1556910103-1c02745aae4d?w=800&q=80'
-            },
-            {
-                'name': 'Travel',
-                'image': 'https://images.unsplash.com/photo-1488646953014-85cb44e25828?w=800&q=80'
-            }
-        ]
+        # One aggregation (or a cache hit) covers every category
+        counts = get_category_counts(mongo.db, user_school)
 
-        # Count events for each category at the user's school
         categories_with_counts = []
-        for category in categories:
-            count = mongo.db.events.count_documents({
-                'category': category['name'],
-                'school': user_school
-            })
+        for category in CATEGORIES:
             categories_with_counts.append({
                 'name': category['name'],
                 'image': category['image'],
-                'events': count
+                'events': counts.get(category['name'], 0)
             })
 
-        return jsonify({'categories': categories_with_counts}), 200
+        # Counts come from memory, so tag the body itself - a per-process cache
+        # must never pin a stale body to a fresh version counter
+        response = jsonify({'categories': categories_with_counts})
+        response.add_etag()
+        matched = etag_matches(request.if_none_match, response.get_etag()[0])
+        if matched:
+            return not_modified(matched)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
 
     except Exception as e:
-        print(f"Error fetching categories: {e}")
+        log.exception('error fetching categories')
         return jsonify({'message': f'Server error: {str(e)}'}), 500
 
-@app.route('/api/events/category/<category_name>', methods=['GET', 'OPTIONS'])
-def get_events_by_category(category_name):
-    if request.method == 'OPTIONS':
-        return '', 200
-
-    # Get current user from token
-    token = request.headers.get('Authorization')
-    if not token:
-        return jsonify({'message': 'Token is missing'}), 401
-
-    try:
-        if token.startswith('Bearer '):
-            token = token[7:]
-        data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
-        current_user = mongo.db.users.find_one({'_id': ObjectId(data['user_id'])})
-        if not current_user:
-            return jsonify({'message': 'User not found'}), 401
-    except Exception as e:
-        return jsonify({'message': f'Token is invalid: {str(e)}'}), 401
-
+@api.route('/api/events/category/<category_name>', methods=['GET', 'OPTIONS'])
+@token_required
+@conditional_get('school')
+def get_events_by_category(current_user, category_name):
     try:
         # Get user's school to filter events
         user_school = current_user.get('school')
 
-        # Find all events in this category at the user's school
-        events = mongo.db.events.find({
+        try:
+            after, limit = parse_page_args(request.args)
+            date_range = parse_date_range(request.args)
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+
+        # Find one page of events in this category at the user's school
+        events, next_cursor = fetch_page(mongo.db.events, {
             'category': category_name,
-            'school': user_school
-        }).sort('date', 1)
+            'school': user_school,
+            'date': date_range
+        }, 'date', 1, after=after, limit=limit, projection=event_projection('card'))
 
         # Convert to list and format
         events_list = []
         for event in events:
-            events_list.append({
-                'id': str(event['_id']),
-                'title': event.get('title'),
-                'description': event.get('description'),
-                'date': event.get('date'),
-                'time': event.get('time'),
-                'location': event.get('location'),
-                'category': event.get('category'),
-                'image': event.get('image'),
-                'host': event.get('host'),
-                'host_id': event.get('host_id'),
-                'school': event.get('school')
-            })
+            events_list.append(serialize_event(event, 'card'))
+
+        if include_requested('host'):
+            embed_hosts(mongo.db, events_list)
 
         return jsonify({
             'category': category_name,
-            'events': events_list
+            'events': events_list,
+            'next_cursor': next_cursor
         }), 200
 
     except Exception as e:
-        print(f"Error fetching events: {e}")
+        log.exception('error fetching events')
         return jsonify({'message': f'Server error: {str(e)}'}), 500
 
-@app.route('/api/events/create', methods=['POST', 'OPTIONS'])
-def create_event():
-    if request.method == 'OPTIONS':
-        return '', 200
+@api.route('/api/events/search', methods=['GET', 'OPTIONS'])
+@token_required
+@conditional_get('school')
+def search_events(current_user):
+    try:
+        try:
+            text = parse_search_query(request.args)
+            after, limit = parse_page_args(request.args)
+            date_range = parse_date_range(request.args)
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+
+        # Rank the matches at the user's school, then fetch only the requested page
+        ranked_ids = search_event_ids(mongo.db, current_user.get('school'), text, date_range)
+        try:
+            events, next_cursor = fetch_ranked_page(mongo.db.events, ranked_ids, after=after, limit=limit,
+                                                    projection=event_projection('card'))
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
 
-    # Get current user from token
-    token = request.headers.get('Authorization')
-    if not token:
-        return jsonify({'message': 'Token is missing'}), 401
+        # Convert to list and format
+        events_list = []
+        for event in events:
+            events_list.append(serialize_event(event, 'card'))
+
+        if include_requested('host'):
+            embed_hosts(mongo.db, events_list)
+
+        return jsonify({
+            'query': text,
+            'events': events_list,
+            'next_cursor': next_cursor
+        }), 200
 
-    try:
-        if token.startswith('Bearer '):
-            token = token[7:]
-        data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
-        current_user = mongo.db.users.find_one({'_id': ObjectId(data['user_id'])})
-        if not current_user:
-            return jsonify({'message': 'User not found'}), 401
     except Exception as e:
-        return jsonify({'message': f'Token is invalid: {str(e)}'}), 401
+        log.exception('error searching events')
+        return jsonify({'message': f'Server error: {str(e)}'}), 500
 
+@api.route('/api/events/create', methods=['POST', 'OPTIONS'])
+@token_required
+def create_event(current_user):
     try:
         event_data = request.get_json()
 
-        # Validation
-        required_fields = ['title', 'description', 'category', 'date', 'time', 'location']
-        missing_fields = [field for field in required_fields if not event_data.get(field)]
-
-        if missing_fields:
-            return jsonify({
-                'message': f'Missing required fields: {", ".join(missing_fields)}'
-            }), 400
-
-        # Get host info from current user
-        host_name = f"{current_user.get('first_name', '')} {current_user.get('last_name', '')}".strip()
-        if not host_name:
-            host_name = current_user.get('email', 'Unknown Host')
-
-        # Create event document - auto-RSVP the creator
-        user_id = str(current_user['_id'])
-        new_event = {
-            'title': event_data['title'],
-            'description': event_data['description'],
-            'category': event_data['category'],
-            'date': event_data['date'],
-            'time': event_data['time'],
-            'start_time': event_data.get('start_time'),
-            'end_time': event_data.get('end_time'),
-            'location': event_data['location'],
-            'school_years': event_data.get('school_years', 'All'),
-            'genders': event_data.get('genders', 'All'),
-            'image': event_data['image'],
-            'host': host_name,
-            'host_id': user_id,
-            'school': current_user.get('school'),
-            'registered_users': [user_id],  # Auto-RSVP creator
-            'created_at': datetime.utcnow()
-        }
+        # Validate and build the event document - the creator is auto-RSVPed
+        try:
+            new_event = build_event(event_data, current_user)
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
 
+        user_id = new_event['host_id']
         result = mongo.db.events.insert_one(new_event)
+        add_rsvp(mongo.db, result.inserted_id, user_id, new_event['date'])
+        adjust_category_count(new_event['school'], new_category=counted_category(new_event))
+        feed_version = bump_version(mongo.db, feed_key(new_event['school']))
+        bump_versions(mongo.db, school_key(new_event['school']), user_key(user_id))
+        refresh_event(new_event, feed_version)
 
         # Return created event
-        created_event = {
-            'id': str(result.inserted_id),
-            'title': new_event['title'],
-            'description': new_event['description'],
-            'category': new_event['category'],
-            'date': str(new_event['date']),
-            'time': new_event['time'],
-            'location': new_event['location'],
-            'image': new_event['image'],
-            'host': new_event['host'],
-            'host_id': new_event['host_id'],
-            'school': new_event['school'],
-            'attendees_count': 0,
-            'user_rsvp': False
-        }
+        created_event = serialize_event(new_event, 'detail', user_rsvp=True)
 
         return jsonify({
             'message': 'Event created successfully',
@@ -616,159 +628,186 @@ def create_event():
         }), 201
 
     except Exception as e:
-        print(f"Error creating event: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception('error creating event')
         return jsonify({'message': f'Server error: {str(e)}'}), 500
 
-@app.route('/api/events/<event_id>/rsvp', methods=['POST', 'DELETE', 'OPTIONS'])
-def rsvp_event(event_id):
-    if request.method == 'OPTIONS':
-        return '', 200
+@api.route('/api/events/import', methods=['POST', 'OPTIONS'])
+@token_required
+def import_events(current_user):
+    try:
+        if request.content_length and request.content_length > IMPORT_MAX_BYTES:
+            return jsonify({'message': f'Import is larger than {IMPORT_MAX_BYTES} bytes'}), 413
+        try:
+            rows = parse_import(request.stream, request.mimetype)
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 415
 
-    # Get current user from token
-    token = request.headers.get('Authorization')
-    if not token:
-        return jsonify({'message': 'Token is missing'}), 401
+        result = import_event_rows(mongo.db, current_user, rows)
+
+        message = f"Imported {result['imported']} events"
+        if result['failed']:
+            message += f", {result['failed']} rows failed"
+        return jsonify({'message': message, **result}), 201 if result['imported'] else 400
 
-    try:
-        if token.startswith('Bearer '):
-            token = token[7:]
-        data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
-        current_user = mongo.db.users.find_one({'_id': ObjectId(data['user_id'])})
-        if not current_user:
-            return jsonify({'message': 'User not found'}), 401
     except Exception as e:
-        return jsonify({'message': f'Token is invalid: {str(e)}'}), 401
+        log.exception('error importing events')
+        return jsonify({'message': f'Server error: {str(e)}'}), 500
 
+@api.route('/api/events/<event_id>/rsvp', methods=['POST', 'DELETE', 'OPTIONS'])
+@token_required
+def rsvp_event(current_user, event_id):
     try:
         user_id = str(current_user['_id'])
 
-        # Find the event
-        event = mongo.db.events.find_one({'_id': ObjectId(event_id)})
+        db = mongo.db
+        event = db.events.find_one(
+            {'_id': ObjectId(event_id)},
+            {'date': 1, 'school': 1, 'host_id': 1, 'category': 1, 'school_years': 1, 'genders': 1}
+        )
         if not event:
             return jsonify({'message': 'Event not found'}), 404
 
-        registered_users = event.get('registered_users', [])
-
         if request.method == 'POST':
-            # RSVP to event
-            if user_id in registered_users:
-                return jsonify({'message': 'Already registered for this event'}), 400
-
-            # Add user to event's registered_users
-            mongo.db.events.update_one(
-                {'_id': ObjectId(event_id)},
-                {'$push': {'registered_users': user_id}}
-            )
+            # Claim a seat with one conditional update, so a full event is never
+            # oversubscribed however many students RSVP at once
+            attendees_count = claim_seat(db, event['_id'])
+            if attendees_count is not None:
+                # The unique (event_id, user_id) index rejects a second registration
+                if not add_rsvp(db, event['_id'], user_id, event.get('date')):
+                    release_seat(db, event['_id'])
+                    promote_waitlisted(db, event['_id'])
+                    return jsonify({'message': 'Already registered for this event'}), 400
+                # A waitlisted user who got a seat this way gives up their place in line
+                leave_waitlist(db, event['_id'], user_id)
+                promoted, registered = [], True
+            else:
+                if has_rsvp(db, event['_id'], user_id):
+                    return jsonify({'message': 'Already registered for this event'}), 400
+                if not join_waitlist(db, event['_id'], user_id, event.get('date')):
+                    return jsonify({'message': 'Already on the waitlist for this event'}), 400
+                # A seat may have freed up since the claim failed
+                promoted = promote_waitlisted(db, event['_id'])
+                registered = user_id in promoted
+                attendees_count = db.events.find_one({'_id': event['_id']}, {'attendees_count': 1})['attendees_count']
+
+            # Only attendees_count changed: listings need new ETags, but cached feeds are left
+            # as they are (see ranking.py)
+            bump_versions(db, school_key(event.get('school')), user_key(user_id), user_key(event.get('host_id')),
+                          *[user_key(u) for u in promoted])
+
+            if registered:
+                return jsonify({
+                    'message': 'Successfully registered for event',
+                    'attendees_count': attendees_count,
+                    'registered': True,
+                    'waitlisted': False
+                }), 200
 
             return jsonify({
-                'message': 'Successfully registered for event',
-                'attendees_count': len(registered_users) + 1
-            }), 200
+                'message': 'Event is full - you have been added to the waitlist',
+                'attendees_count': attendees_count,
+                'registered': False,
+                'waitlisted': True,
+                'waitlist_position': waitlist_position(db, event['_id'], user_id)
+            }), 202
 
         elif request.method == 'DELETE':
-            # Cancel RSVP
-            if user_id not in registered_users:
+            # Cancel RSVP - only the request that actually deletes the RSVP gives the seat back,
+            # and the seat goes straight to the front of the waitlist
+            if remove_rsvp(db, event['_id'], user_id):
+                attendees_count = release_seat(db, event['_id'])
+                promoted = promote_waitlisted(db, event['_id'])
+                attendees_count += len(promoted)
+                message = 'Successfully cancelled registration'
+            elif leave_waitlist(db, event['_id'], user_id):
+                promoted = []
+                attendees_count = db.events.find_one({'_id': event['_id']}, {'attendees_count': 1})['attendees_count']
+                message = 'Left the waitlist'
+            else:
                 return jsonify({'message': 'Not registered for this event'}), 400
 
-            # Remove user from event's registered_users
-            mongo.db.events.update_one(
-                {'_id': ObjectId(event_id)},
-                {'$pull': {'registered_users': user_id}}
-            )
+            # Only attendees_count changed: listings need new ETags, but cached feeds are left
+            # as they are (see ranking.py)
+            bump_versions(db, school_key(event.get('school')), user_key(user_id), user_key(event.get('host_id')),
+                          *[user_key(u) for u in promoted])
 
             return jsonify({
-                'message': 'Successfully cancelled registration',
-                'attendees_count': len(registered_users) - 1
+                'message': message,
+                'attendees_count': attendees_count,
+                'registered': False,
+                'waitlisted': False
             }), 200
 
     except Exception as e:
-        print(f"Error processing RSVP: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception('error processing RSVP')
         return jsonify({'message': f'Server error: {str(e)}'}), 500
 
-@app.route('/api/events/<event_id>', methods=['GET', 'OPTIONS'])
-def get_event_by_id(event_id):
-    if request.method == 'OPTIONS':
-        return '', 200
-
-    # Get current user from token
-    token = request.headers.get('Authorization')
-    if not token:
-        return jsonify({'message': 'Token is missing'}), 401
-
+@api.route('/api/events/<event_id>', methods=['GET', 'OPTIONS'])
+@token_required
+@conditional_get('school', 'user')
+def get_event_by_id(current_user, event_id):
     try:
-        if token.startswith('Bearer '):
-            token = token[7:]
-        data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
-        current_user = mongo.db.users.find_one({'_id': ObjectId(data['user_id'])})
-        if not current_user:
-            return jsonify({'message': 'User not found'}), 401
-    except Exception as e:
-        return jsonify({'message': f'Token is invalid: {str(e)}'}), 401
+        db = mongo.db
+        object_id = ObjectId(event_id)
+        user_id = str(current_user['_id'])
 
-    try:
-        # Find the event by ID
-        event = mongo.db.events.find_one({'_id': ObjectId(event_id)})
+        # Find the event and check if the user is registered or waitlisted at the same time
+        event, user_registered, user_waitlisted = gather(
+            lambda: db.events.find_one({'_id': object_id}, event_projection('detail')),
+            lambda: has_rsvp(db, object_id, user_id),
+            lambda: is_waitlisted(db, object_id, user_id)
+        )
+        if not event:
+            # Past events linked from profile history may have been archived
+            event = db.events_archive.find_one({'_id': object_id}, event_projection('detail'))
+            user_registered = event is not None and db.rsvps_archive.find_one(
+                {'event_id': object_id, 'user_id': user_id}, {'_id': 1}
+            ) is not None
 
         if not event:
             return jsonify({'message': 'Event not found'}), 404
 
-        # Check if user is registered
-        registered_users = event.get('registered_users', [])
-        user_registered = str(current_user['_id']) in [str(uid) for uid in registered_users]
-
-        event_data = {
-            'id': str(event['_id']),
-            'title': event.get('title'),
-            'description': event.get('description'),
-            'date': str(event.get('date', '')),
-            'time': event.get('time'),
-            'start_time': event.get('start_time'),
-            'end_time': event.get('end_time'),
-            'location': event.get('location'),
-            'category': event.get('category'),
-            'image': event.get('image'),
-            'host': event.get('host'),
-            'host_id': event.get('host_id'),
-            'school': event.get('school'),
-            'school_years': event.get('school_years', 'All'),
-            'genders': event.get('genders', 'All'),
-            'attendees_count': len(registered_users),
-            'user_rsvp': user_registered
-        }
+        event_data = serialize_event(event, 'detail', user_rsvp=user_registered, user_waitlisted=user_waitlisted)
+        if include_requested('host'):
+            embed_hosts(mongo.db, [event_data])
 
         return jsonify({'event': event_data}), 200
 
     except Exception as e:
-        print(f"Error fetching event: {e}")
+        log.exception('error fetching event')
         return jsonify({'message': f'Server error: {str(e)}'}), 500
 
-@app.route('/api/events/all', methods=['GET', 'OPTIONS'])
-def get_all_events():
-    print(f"🔵 /api/events/all called with method: {request.method}")
-    if request.method == 'OPTIONS':
-        print("🔵 Returning OPTIONS response")
-        return '', 200
-
-    # Get current user from token
-    token = request.headers.get('Authorization')
-    print(f"🔵 Token present: {bool(token)}")
-    if not token:
-        return jsonify({'message': 'Token is missing'}), 401
-
-    try:
-        if token.startswith('Bearer '):
-            token = token[7:]
-        data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
-        current_user = mongo.db.users.find_one({'_id': ObjectId(data['user_id'])})
-        if not current_user:
-            return jsonify({'message': 'User not found'}), 401
-    except Exception as e:
-        return jsonify({'message': f'Token is invalid: {str(e)}'}), 401
-
+def events_page_response(current_user, events, next_cursor):
+    """Serialize one page of event cards for the Home page"""
+    db = mongo.db
+    include_host = include_requested('host')
+
+    # Check which of these events the user is registered for in one query,
+    # while the host summaries load
+    user_rsvps, host_summaries = gather(
+        lambda: rsvped_event_ids(db, str(current_user['_id']), [event['_id'] for event in events]),
+        lambda: load_host_summaries(db, [event.get('host_id') for event in events]) if include_host else {}
+    )
+
+    # Convert to list and format
+    events_list = []
+    for event in events:
+        user_registered = event['_id'] in user_rsvps
+
+        events_list.append(serialize_event(event, 'card',
+                                           organizer=event.get('host', 'Unknown'),
+                                           user_rsvp=user_registered))
+
+    if include_host:
+        for event_data in events_list:
+            event_data['host_summary'] = host_summaries.get(event_data.get('host_id'))
+
+    return jsonify({'events': events_list, 'next_cursor': next_cursor}), 200
+
+@api.route('/api/events/all', methods=['GET', 'OPTIONS'])
+@token_required
+@conditional_get('school', 'user', 'feed')
+def get_all_events(current_user):
     try:
         # Get query parameters
         interests_only = request.args.get('interests_only', 'false').lower() == 'true'
@@ -777,256 +816,151 @@ def get_all_events():
         user_school = current_user.get('school')
         user_id = str(current_user['_id'])
 
+        try:
+            after, limit = parse_page_args(request.args)
+            date_range = parse_date_range(request.args)
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+
+        if interests_only:
+            # Personalized ranking - page through the user's cached top-K feed
+            feed_version = g.get('versions', {}).get(feed_key(user_school))
+            narrowed = bool(request.args.get('from') or request.args.get('to'))
+            try:
+                ranked_ids, more = ranked_event_ids(mongo.db, current_user, date_range, narrowed,
+                                                    rank_offset(after), limit, feed_version)
+                events, next_cursor = fetch_ranked_page(mongo.db.events, ranked_ids,
+                                                        after=after, limit=limit,
+                                                        projection=event_projection('card'), more=more)
+            except ValueError as e:
+                return jsonify({'message': str(e)}), 400
+            return events_page_response(current_user, events, next_cursor)
+
         # Build query - exclude events the user is hosting
         query = {
             'school': user_school,
-            'host_id': {'$ne': user_id}  # Exclude events where user is the host
+            'host_id': {'$ne': user_id},  # Exclude events where user is the host
+            'date': date_range
         }
 
-        # Add interest filtering if requested
-        if interests_only:
-            user_interests = current_user.get('interests', [])
-            print(f"User interests: {user_interests}")
-            if user_interests:
-                query['category'] = {'$in': user_interests}
-            print(f"Query: {query}")
-
-        # Find all events at the user's school, sorted by _id descending (most recent first)
+        # Find one page of events at the user's school, sorted by _id descending (most recent first)
         # Using _id for sorting since ObjectId contains timestamp
-        events = mongo.db.events.find(query).sort('_id', -1)
-        print(f"Found {mongo.db.events.count_documents(query)} events")
-
-        # Convert to list and format
-        events_list = []
-        for event in events:
-            # Check if user is registered
-            registered_users = event.get('registered_users', [])
-            user_registered = str(current_user['_id']) in [str(uid) for uid in registered_users]
-
-            events_list.append({
-                'id': str(event['_id']),
-                'title': event.get('title'),
-                'description': event.get('description'),
-                'date': str(event.get('date', '')),
-                'time': event.get('time'),
-                'location': event.get('location'),
-                'category': event.get('category'),
-                'image': event.get('image'),
-                'host': event.get('host'),
-                'host_id': event.get('host_id'),
-                'school': event.get('school'),
-                'organizer': event.get('host', 'Unknown'),
-                'attendees_count': len(registered_users),
-                'user_rsvp': user_registered
-            })
+        events, next_cursor = fetch_page(mongo.db.events, query, '_id', -1, after=after, limit=limit,
+                                         projection=event_projection('card'))
 
-        return jsonify({'events': events_list}), 200
+        return events_page_response(current_user, events, next_cursor)
 
     except Exception as e:
-        print(f"Error fetching all events: {e}")
+        log.exception('error fetching all events')
         return jsonify({'message': f'Server error: {str(e)}'}), 500
 
-@app.route('/api/profile/bio', methods=['PUT', 'OPTIONS'])
-def update_bio():
-    if request.method == 'OPTIONS':
-        return '', 200
-
-    # Get current user from token
-    token = request.headers.get('Authorization')
-    if not token:
-        return jsonify({'message': 'Token is missing'}), 401
-
-    try:
-        if token.startswith('Bearer '):
-            token = token[7:]
-        data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
-        current_user = mongo.db.users.find_one({'_id': ObjectId(data['user_id'])})
-        if not current_user:
-            return jsonify({'message': 'User not found'}), 401
-    except Exception as e:
-        return jsonify({'message': f'Token is invalid: {str(e)}'}), 401
-
+@api.route('/api/profile/bio', methods=['PUT', 'OPTIONS'])
+@token_required
+def update_bio(current_user):
     try:
         request_data = request.get_json()
         bio = request_data.get('bio', '').strip()
 
-        # Update the user's bio in MongoDB
-        mongo.db.users.update_one(
+        # One round trip: the update hands back the new profile
+        updated_user = mongo.db.users.find_one_and_update(
             {'_id': current_user['_id']},
-            {'$set': {'bio': bio}}
+            {'$set': {'bio': bio}},
+            projection=PROFILE_PROJECTION,
+            return_document=ReturnDocument.AFTER
         )
-
-        # Fetch updated user data
-        updated_user = mongo.db.users.find_one({'_id': current_user['_id']})
+        if not updated_user:
+            return jsonify({'message': 'User not found'}), 404
+        invalidate_user(current_user['_id'])
+        bump_versions(mongo.db, user_key(current_user['_id']))
 
         return jsonify({
             'message': 'Bio updated successfully',
-            'user': {
-                'id': str(updated_user['_id']),
-                'first_name': updated_user['first_name'],
-                'last_name': updated_user['last_name'],
-                'email': updated_user['email'],
-                'gender': updated_user.get('gender'),
-                'school': updated_user.get('school'),
-                'grade_level': updated_user.get('grade_level'),
-                'interests': updated_user.get('interests', []),
-                'bio': updated_user.get('bio'),
-                'profile_pic': updated_user.get('profile_pic')
-            }
+            'user': profile_data(updated_user)
         }), 200
 
     except Exception as e:
-        print(f"Error updating bio: {e}")
+        log.exception('error updating bio')
         return jsonify({'message': f'Server error: {str(e)}'}), 500
 
-@app.route('/api/profile/interests', methods=['PUT', 'OPTIONS'])
-def update_interests():
-    if request.method == 'OPTIONS':
-        return '', 200
-
-    # Get current user from token
-    token = request.headers.get('Authorization')
-    if not token:
-        return jsonify({'message': 'Token is missing'}), 401
-
-    try:
-        if token.startswith('Bearer '):
-            token = token[7:]
-        data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
-        current_user = mongo.db.users.find_one({'_id': ObjectId(data['user_id'])})
-        if not current_user:
-            return jsonify({'message': 'User not found'}), 401
-    except Exception as e:
-        return jsonify({'message': f'Token is invalid: {str(e)}'}), 401
-
+@api.route('/api/profile/interests', methods=['PUT', 'OPTIONS'])
+@token_required
+def update_interests(current_user):
     try:
         request_data = request.get_json()
         interests = request_data.get('interests', [])
 
-        # Update the user's interests in MongoDB
-        mongo.db.users.update_one(
+        # One round trip: the update hands back the new profile
+        updated_user = mongo.db.users.find_one_and_update(
             {'_id': current_user['_id']},
-            {'$set': {'interests': interests}}
+            {'$set': {'interests': interests}},
+            projection=PROFILE_PROJECTION,
+            return_document=ReturnDocument.AFTER
         )
-
-        # Fetch updated user data
-        updated_user = mongo.db.users.find_one({'_id': current_user['_id']})
+        if not updated_user:
+            return jsonify({'message': 'User not found'}), 404
+        invalidate_user(current_user['_id'])
+        invalidate_feed(current_user['_id'])
+        bump_versions(mongo.db, user_key(current_user['_id']))
 
         return jsonify({
             'message': 'Interests updated successfully',
-            'user': {
-                'id': str(updated_user['_id']),
-                'first_name': updated_user['first_name'],
-                'last_name': updated_user['last_name'],
-                'email': updated_user['email'],
-                'gender': updated_user.get('gender'),
-                'school': updated_user.get('school'),
-                'grade_level': updated_user.get('grade_level'),
-                'interests': updated_user.get('interests', []),
-                'bio': updated_user.get('bio'),
-                'profile_pic': updated_user.get('profile_pic')
-            }
+            'user': profile_data(updated_user)
         }), 200
 
     except Exception as e:
-        print(f"Error updating interests: {e}")
+        log.exception('error updating interests')
         return jsonify({'message': f'Server error: {str(e)}'}), 500
 
-@app.route('/api/events/<event_id>', methods=['PUT', 'OPTIONS'])
-def update_event(event_id):
-    if request.method == 'OPTIONS':
-        return '', 200
-
-    # Get current user from token
-    token = request.headers.get('Authorization')
-    if not token:
-        return jsonify({'message': 'Token is missing'}), 401
-
+@api.route('/api/events/<event_id>', methods=['PUT', 'PATCH', 'OPTIONS'])
+@token_required
+def update_event(current_user, event_id):
+    """Edit an event - PUT sends every field, PATCH only the ones that change"""
     try:
-        if token.startswith('Bearer '):
-            token = token[7:]
-        data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
-        current_user = mongo.db.users.find_one({'_id': ObjectId(data['user_id'])})
-        if not current_user:
-            return jsonify({'message': 'User not found'}), 401
-    except Exception as e:
-        return jsonify({'message': f'Token is invalid: {str(e)}'}), 401
-
-    try:
-        # Find the event
-        event = mongo.db.events.find_one({'_id': ObjectId(event_id)})
-        if not event:
-            return jsonify({'message': 'Event not found'}), 404
-
-        # Verify that the current user is the host of the event
+        db = mongo.db
         user_id = str(current_user['_id'])
-        if event.get('host_id') != user_id:
-            return jsonify({'message': 'Unauthorized: Only the event host can edit this event'}), 403
-
-        # Get updated event data
-        event_data = request.get_json()
-
-        # Validation
-        required_fields = ['title', 'description', 'category', 'date', 'time', 'location']
-        missing_fields = [field for field in required_fields if not event_data.get(field)]
 
-        if missing_fields:
-            return jsonify({
-                'message': f'Missing required fields: {", ".join(missing_fields)}'
-            }), 400
-
-        # Update event document
-        update_data = {
-            'title': event_data['title'],
-            'description': event_data['description'],
-            'category': event_data['category'],
-            'date': event_data['date'],
-            'time': event_data['time'],
-            'start_time': event_data.get('start_time'),
-            'end_time': event_data.get('end_time'),
-            'location': event_data['location'],
-            'school_years': event_data.get('school_years', 'All'),
-            'genders': event_data.get('genders', 'All'),
-            'image': event_data.get('image', event.get('image')),
-            'updated_at': datetime.utcnow()
-        }
-
-        mongo.db.events.update_one(
-            {'_id': ObjectId(event_id)},
-            {'$set': update_data}
+        try:
+            update_data = build_event_update(request.get_json() or {}, partial=request.method == 'PATCH')
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+
+        # The host check is part of the filter, so the write is a single round trip.
+        # The pre-image it returns, plus the new values, is both the response and
+        # what the category counts, RSVP dates and waitlist need to know changed.
+        event = db.events.find_one_and_update(
+            {'_id': ObjectId(event_id), 'host_id': user_id},
+            {'$set': update_data},
+            projection=event_projection('detail'),
+            return_document=ReturnDocument.BEFORE
         )
+        if not event:
+            if db.events.find_one({'_id': ObjectId(event_id)}, {'_id': 1}) is None:
+                return jsonify({'message': 'Event not found'}), 404
+            return jsonify({'message': 'Unauthorized: Only the event host can edit this event'}), 403
 
-        # Fetch updated event
-        updated_event = mongo.db.events.find_one({'_id': ObjectId(event_id)})
-
-        # Return updated event
-        event_response = {
-            'id': str(updated_event['_id']),
-            'title': updated_event['title'],
-            'description': updated_event['description'],
-            'category': updated_event['category'],
-            'date': str(updated_event['date']),
-            'time': updated_event['time'],
-            'location': updated_event['location'],
-            'image': updated_event['image'],
-            'host': updated_event['host'],
-            'host_id': updated_event['host_id'],
-            'school': updated_event['school'],
-            'school_years': updated_event.get('school_years', 'All'),
-            'genders': updated_event.get('genders', 'All'),
-            'attendees_count': len(updated_event.get('registered_users', []))
-        }
+        updated_event = dict(event, **update_data)
+        # Also covers a date moving either way across today, in or out of the upcoming counts
+        adjust_category_count(event.get('school'), counted_category(event), counted_category(updated_event))
+        if updated_event.get('date') != event.get('date'):
+            update_rsvp_dates(db, event['_id'], updated_event['date'])
+        # A larger (or removed) capacity lets the waitlist in; a smaller one bumps nobody
+        promoted = []
+        if updated_event.get('capacity') != event.get('capacity'):
+            promoted = promote_waitlisted(db, event['_id'])
+            updated_event['attendees_count'] = event.get('attendees_count', 0) + len(promoted)
+        feed_version = bump_version(db, feed_key(event.get('school')))
+        bump_versions(db, school_key(event.get('school')), user_key(user_id), *[user_key(u) for u in promoted])
+        refresh_event(updated_event, feed_version)
 
         return jsonify({
             'message': 'Event updated successfully',
-            'event': event_response
+            'event': serialize_event(updated_event, 'detail')
         }), 200
 
     except Exception as e:
-        print(f"Error updating event: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception('error updating event')
         return jsonify({'message': f'Server error: {str(e)}'}), 500
 
 if __name__ == '__main__':
-    app.run(debug=True, port=5001)
\ No newline at end of file
+    # Development server only - use gunicorn (see gunicorn.conf.py) in production
+    create_app().run(debug=True, port=5001)
\ No newline at end of file
@@ -0,0 +1,167 @@
+"""
+Archival of finished events.
+
+Events that started more than ARCHIVE_AFTER_DAYS ago are moved, together with
+their RSVPs, from events / rsvps to events_archive / rsvps_archive, so the hot
+collections and their indexes only hold the live window. Run it on a schedule
+(e.g. nightly from cron):
+
+    python archive.py             # archive events older than ARCHIVE_AFTER_DAYS
+    python archive.py --days 60   # use a different cutoff
+
+Each batch is copied with upserts before it is deleted from the hot
+collections, and progress is checkpointed in the jobs collection, so an
+interrupted run is simply started again: it resumes from the checkpoint with
+the same cutoff.
+
+Profile history endpoints read the archive when called with ?include=archived.
+"""
+
+from datetime import datetime, timedelta
+from pymongo import ReplaceOne
+import os
+import sys
+
+from dates import start_of_today
+from etags import bump_versions, school_key, user_key
+from pagination import decode_cursor, fetch_page
+from rsvps import attending_event_ids
+
+ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', 30))
+ARCHIVE_BATCH_SIZE = int(os.environ.get('ARCHIVE_BATCH_SIZE', 500))
+
+CHECKPOINT_ID = 'archive_events'
+
+
+def _copy(collection, docs, archived_at):
+    if docs:
+        collection.bulk_write([
+            ReplaceOne({'_id': doc['_id']}, dict(doc, archived_at=archived_at), upsert=True)
+            for doc in docs
+        ], ordered=False)
+
+
+def archive_batch(db, events):
+    """Move one batch of events and their RSVPs to the archive collections"""
+    event_ids = [event['_id'] for event in events]
+    rsvps = list(db.rsvps.find({'event_id': {'$in': event_ids}}))
+    now = datetime.utcnow()
+
+    # Copy first, delete second - a crash in between only leaves copies to redo
+    _copy(db.events_archive, events, now)
+    _copy(db.rsvps_archive, rsvps, now)
+    db.rsvps.delete_many({'event_id': {'$in': event_ids}})
+    # Nobody can get into a finished event
+    db.waitlist.delete_many({'event_id': {'$in': event_ids}})
+    db.events.delete_many({'_id': {'$in': event_ids}})
+
+    # History responses of the schools and hosts involved have changed
+    bump_versions(db, *[school_key(event.get('school')) for event in events],
+                  *[user_key(event.get('host_id')) for event in events if event.get('host_id')])
+    return len(rsvps)
+
+
+def archive_events(db, after_days=ARCHIVE_AFTER_DAYS, batch_size=ARCHIVE_BATCH_SIZE):
+    """Archive every event older than the cutoff in batches - returns (events, rsvps) moved"""
+    checkpoint = db.jobs.find_one({'_id': CHECKPOINT_ID})
+    if checkpoint and checkpoint.get('status') == 'running':
+        print(f"Resuming interrupted run from {checkpoint['started_at']:%Y-%m-%d %H:%M}")
+    else:
+        checkpoint = {
+            '_id': CHECKPOINT_ID,
+            'status': 'running',
+            'cutoff': start_of_today() - timedelta(days=after_days),
+            'cursor': None,
+            'events': 0,
+            'rsvps': 0,
+            'started_at': datetime.utcnow()
+        }
+        db.jobs.replace_one({'_id': CHECKPOINT_ID}, checkpoint, upsert=True)
+
+    cursor = checkpoint['cursor']
+    while True:
+        # Oldest first through the date_id index, continuing after the last checkpoint
+        events, next_cursor = fetch_page(db.events, {'date': {'$lt': checkpoint['cutoff']}}, 'date', 1,
+                                         after=decode_cursor(cursor) if cursor else None, limit=batch_size)
+        if events:
+            checkpoint['rsvps'] += archive_batch(db, events)
+            checkpoint['events'] += len(events)
+            print(f"✓ Archived {checkpoint['events']} events so far")
+
+        cursor = next_cursor
+        db.jobs.update_one({'_id': CHECKPOINT_ID}, {'$set': {
+            'cursor': cursor,
+            'events': checkpoint['events'],
+            'rsvps': checkpoint['rsvps'],
+            'status': 'running' if cursor else 'done',
+            'updated_at': datetime.utcnow()
+        }})
+        if not cursor:
+            return checkpoint['events'], checkpoint['rsvps']
+
+
+def _merge_by_date(hot, archived):
+    """Merge two date-sorted event lists, skipping events caught mid-archive in both"""
+    seen = set()
+    merged = []
+    for event in sorted(list(hot) + list(archived), key=lambda event: (event.get('date') or datetime.min)):
+        if event['_id'] not in seen:
+            seen.add(event['_id'])
+            merged.append(event)
+    return merged
+
+
+def find_hosted_events(db, host_id, date_range, projection, include_archived=False):
+    """Events hosted by a user, ordered by date, optionally including archived ones"""
+    query = {'host_id': host_id}
+    if date_range:
+        query['date'] = date_range
+    events = db.events.find(query, projection).sort('date', 1)
+    if not include_archived:
+        return list(events)
+    return _merge_by_date(events, db.events_archive.find(query, projection).sort('date', 1))
+
+
+def find_attended_events(db, user_id, date_range, projection, include_archived=False):
+    """Events a user is registered for but not hosting, ordered by date, optionally including archived ones"""
+    event_ids = attending_event_ids(db, user_id, date_range)
+    events = db.events.find({'_id': {'$in': event_ids}, 'host_id': {'$ne': user_id}}, projection).sort('date', 1)
+    if not include_archived:
+        return list(events)
+
+    query = {'user_id': user_id}
+    if date_range:
+        query['date'] = date_range
+    archived_ids = [rsvp['event_id'] for rsvp in db.rsvps_archive.find(query, {'event_id': 1, '_id': 0})]
+    archived = db.events_archive.find({'_id': {'$in': archived_ids}, 'host_id': {'$ne': user_id}}, projection)
+    return _merge_by_date(events, archived)
+
+
+if __name__ == '__main__':
+    from pymongo import MongoClient
+    from dotenv import load_dotenv
+    import argparse
+
+    from indexes import ensure_indexes
+
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description='Move finished events and their RSVPs to the archive')
+    parser.add_argument('--days', type=int, default=ARCHIVE_AFTER_DAYS,
+                        help='archive events that started more than this many days ago')
+    parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    client = MongoClient(os.environ.get('MONGO_URI'))
+    db = client.get_database()
+    ensure_indexes(db)
+
+    try:
+        events, rsvps = archive_events(db, args.days, args.batch_size)
+    except Exception as e:
+        print(f"❌ Archival stopped: {e} - run again to resume")
+        sys.exit(1)
+
+    print(f"\n=== Archival Summary ===")
+    print(f"✓ Events archived: {events}")
+    print(f"✓ RSVPs archived: {rsvps}")
@@ -0,0 +1,94 @@
+"""
+Shared authentication layer.
+
+Decoded tokens and user documents are kept in small in-process caches so
+that authenticated requests don't pay a MongoDB round trip every time.
+Writes to a user document must call invalidate_user() so stale profiles
+are never served by this process. Other processes notice the write through
+the user's version counter (see load_user).
+"""
+
+from bson.objectid import ObjectId
+import jwt
+import os
+import time
+
+from cache import TTLCache
+
+# Cache settings (seconds / number of entries)
+TOKEN_CACHE_TTL = int(os.environ.get('AUTH_TOKEN_CACHE_TTL', 300))
+USER_CACHE_TTL = int(os.environ.get('AUTH_USER_CACHE_TTL', 60))
+CACHE_SIZE = int(os.environ.get('AUTH_CACHE_SIZE', 10000))
+
+token_cache = TTLCache(maxsize=CACHE_SIZE, ttl=TOKEN_CACHE_TTL)
+user_cache = TTLCache(maxsize=CACHE_SIZE, ttl=USER_CACHE_TTL)
+
+
+class AuthError(Exception):
+    """Raised when a request cannot be authenticated"""
+
+
+def decode_token(token, secret_key):
+    """Decode a JWT, reusing the result for repeated requests with the same token"""
+    payload = token_cache.get(token)
+    if payload is not None:
+        # Never trust a cached token past its own expiry
+        if payload.get('exp', 0) > time.time():
+            return payload
+        token_cache.delete(token)
+
+    payload = jwt.decode(token, secret_key, algorithms=['HS256'])
+
+    # Don't keep the token around longer than it is valid
+    ttl = TOKEN_CACHE_TTL
+    if 'exp' in payload:
+        ttl = min(ttl, payload['exp'] - time.time())
+    token_cache.set(token, payload, ttl=ttl)
+
+    return payload
+
+
+def load_user(db, user_id, version=None):
+    """
+    Fetch a user document by id, served from the cache when possible.
+
+    version is the user's current version counter, when the caller knows it.
+    A cached copy loaded at a different version may predate a write made by
+    another process, so it is fetched again.
+    """
+    entry = user_cache.get(user_id)
+    if entry is None or (version is not None and entry['version'] != version):
+        user = db.users.find_one({'_id': ObjectId(user_id)})
+        if not user:
+            return None
+        entry = {'user': user, 'version': version}
+        user_cache.set(user_id, entry)
+
+    # Hand out a copy so callers can't corrupt the cached document
+    return dict(entry['user'])
+
+
+def invalidate_user(user_id):
+    """Drop a user from the cache after their document changes"""
+    user_cache.delete(str(user_id))
+
+
+def authenticate(db, secret_key, auth_header):
+    """Resolve an Authorization header to the current user document"""
+    if not auth_header:
+        raise AuthError('Token is missing')
+
+    token = auth_header
+    if token.startswith('Bearer '):
+        token = token[7:]
+
+    try:
+        data = decode_token(token, secret_key)
+        current_user = load_user(db, data['user_id'])
+    except Exception as e:
+        raise AuthError(f'Token is invalid: {str(e)}')
+
+    if not current_user:
+        raise AuthError('User not found')
+
+    return current_user
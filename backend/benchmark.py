@@ -0,0 +1,456 @@
+"""
+Latency and throughput benchmark for every /api route.
+
+Seeds a dedicated MongoDB database with synthetic data (see
+synthetic_data.generate), then drives each route at a fixed
+concurrency and reports p50/p95/p99 latency and requests per second.
+
+    python benchmark.py                          # run against the in-process app
+    python benchmark.py --url http://127.0.0.1:5001   # run against a running server
+    python benchmark.py --save-baseline          # record the results as the new baseline
+    python benchmark.py --compare                # exit 1 if any route regressed
+    python benchmark.py --sweep 3x4,5x4,5x8      # compare gunicorn workers x threads settings
+
+Point --mongo-uri at a local mongod; the target database is wiped and reseeded.
+"""
+
+from bson.objectid import ObjectId
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pymongo import MongoClient
+from dotenv import load_dotenv
+import argparse
+import jwt
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+load_dotenv()
+
+DEFAULT_MONGO_URI = 'mongodb://localhost:27017/serendipity_bench'
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BACKEND_DIR, 'bench_baseline.json')
+BENCH_PASSWORD = 'benchmark'
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+class InProcessClient:
+    """Sends requests through Flask's test client - one client per thread"""
+
+    def __init__(self, app):
+        self.app = app
+        self.local = threading.local()
+
+    def request(self, method, path, token=None, body=None, headers=None):
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            client = self.local.client = self.app.test_client()
+        all_headers = dict(headers or {})
+        if token:
+            all_headers['Authorization'] = f'Bearer {token}'
+        response = client.open(path, method=method, json=body, headers=all_headers)
+        # Size of the body as sent, i.e. after any compression
+        return response.status_code, len(response.get_data())
+
+
+class HttpClient:
+    """Sends real HTTP requests to a running server"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def request(self, method, path, token=None, body=None, headers=None):
+        all_headers = dict(headers or {})
+        data = None
+        if body is not None:
+            data = json.dumps(body).encode('utf-8')
+            all_headers['Content-Type'] = 'application/json'
+        if token:
+            all_headers['Authorization'] = f'Bearer {token}'
+        req = urllib.request.Request(self.base_url + path, data=data, method=method, headers=all_headers)
+        try:
+            with urllib.request.urlopen(req) as response:
+                return response.status, len(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, len(e.read())
+
+
+def build_routes(ctx):
+    """
+    Every /api route as (name, method, path_fn, body_fn).
+
+    path_fn and body_fn receive (rng, worker_state) and return the path / JSON body.
+    """
+    categories = ['Sports', 'Music', 'Art', 'Technology', 'Science', 'Reading', 'Gaming', 'Cooking', 'Travel']
+
+    def any_event(rng, state):
+        return rng.choice(state['events'])
+
+    def own_event(rng, state):
+        return rng.choice(state['hosted_events']) if state['hosted_events'] else any_event(rng, state)
+
+    event_body = lambda rng, state: {
+        'title': 'Benchmark Event',
+        'description': 'Created by the benchmark harness.',
+        'category': rng.choice(categories),
+        'date': (datetime.utcnow() + timedelta(days=rng.randint(1, 60))).isoformat(),
+        'time': '6:00 PM - 8:00 PM',
+        'location': 'Student Union',
+        'image': 'https://images.unsplash.com/photo-1546519638-68e109498ffc?w=800'
+    }
+
+    return [
+        ('POST /api/login', 'POST', lambda rng, state: '/api/login',
+         lambda rng, state: {'email': state['email'], 'password': BENCH_PASSWORD}),
+        ('POST /api/signup', 'POST', lambda rng, state: '/api/signup',
+         lambda rng, state: {
+             'email': f"bench-{ctx['run_id']}-{rng.getrandbits(64):x}@{state['school']}.edu",
+             'password': BENCH_PASSWORD, 'first_name': 'Bench', 'last_name': 'User',
+             'gender': 'Other', 'school': state['school'], 'grade_level': 'Junior',
+             'interests': ['Sports', 'Music']
+         }),
+        ('GET /api/profile', 'GET', lambda rng, state: '/api/profile', None),
+        ('GET /api/user/<id>', 'GET', lambda rng, state: f"/api/user/{rng.choice(state['users'])}", None),
+        ('GET /api/user/<id>?full=true', 'GET',
+         lambda rng, state: f"/api/user/{rng.choice(state['users'])}?full=true", None),
+        ('GET /api/user/hosting', 'GET', lambda rng, state: '/api/user/hosting', None),
+        ('GET /api/dashboard', 'GET', lambda rng, state: '/api/dashboard', None),
+        ('GET /api/user/events', 'GET', lambda rng, state: '/api/user/events', None),
+        ('GET /api/events/categories', 'GET', lambda rng, state: '/api/events/categories', None),
+        ('GET /api/events/category/<name>', 'GET',
+         lambda rng, state: f"/api/events/category/{rng.choice(categories)}", None),
+        ('GET /api/events/search', 'GET',
+         lambda rng, state: f"/api/events/search?q={rng.choice(['night', 'workshop', 'tournament', 'club'])}", None),
+        ('GET /api/events/all', 'GET', lambda rng, state: '/api/events/all', None),
+        ('GET /api/events/all?interests_only=true', 'GET',
+         lambda rng, state: '/api/events/all?interests_only=true', None),
+        ('GET /api/events/<id>', 'GET', lambda rng, state: f"/api/events/{any_event(rng, state)}", None),
+        ('POST /api/events/<id>/rsvp', 'POST', lambda rng, state: f"/api/events/{any_event(rng, state)}/rsvp", None),
+        ('DELETE /api/events/<id>/rsvp', 'DELETE',
+         lambda rng, state: f"/api/events/{any_event(rng, state)}/rsvp", None),
+        ('POST /api/events/create', 'POST', lambda rng, state: '/api/events/create', event_body),
+        # A small semester schedule sent as a JSON array
+        ('POST /api/events/import', 'POST', lambda rng, state: '/api/events/import',
+         lambda rng, state: [event_body(rng, state) for _ in range(rng.randint(1, 3))]),
+        ('PUT /api/events/<id>', 'PUT', lambda rng, state: f"/api/events/{own_event(rng, state)}", event_body),
+        ('PATCH /api/events/<id>', 'PATCH', lambda rng, state: f"/api/events/{own_event(rng, state)}",
+         lambda rng, state: {'title': f'Benchmark event {rng.randint(0, 1000)}'}),
+        ('PUT /api/profile/bio', 'PUT', lambda rng, state: '/api/profile/bio',
+         lambda rng, state: {'bio': f'Benchmark bio {rng.randint(0, 1000)}'}),
+        ('PUT /api/profile/interests', 'PUT', lambda rng, state: '/api/profile/interests',
+         lambda rng, state: {'interests': rng.sample(categories, 3)}),
+    ]
+
+
+def make_worker_states(db, schools, secret_key, count, seed):
+    """One simulated user per worker, each with a valid token"""
+    rng = random.Random(seed)
+    states = []
+    for _ in range(count):
+        school = rng.choice(sorted(schools))
+        data = schools[school]
+        user_id = rng.choice(data['user_ids'])
+        user = db.users.find_one({'_id': ObjectId(user_id)}, {'email': 1})
+        token = jwt.encode({'user_id': user_id, 'exp': datetime.utcnow() + timedelta(days=1)},
+                           secret_key, algorithm='HS256')
+        hosted = [str(e['_id']) for e in db.events.find({'host_id': user_id}, {'_id': 1}).limit(50)]
+        states.append({
+            'school': school,
+            'email': user['email'],
+            'token': token,
+            'users': data['user_ids'],
+            'events': data['event_ids'],
+            'hosted_events': hosted,
+        })
+    return states
+
+
+def run_route(client, route, states, requests_per_route, concurrency, seed, accept_encoding=None):
+    name, method, path_fn, body_fn = route
+    headers = {'Accept-Encoding': accept_encoding} if accept_encoding else None
+    latencies = []
+    statuses = {}
+    bytes_total = 0
+    lock = threading.Lock()
+
+    def work(worker_index):
+        nonlocal bytes_total
+        rng = random.Random(seed + worker_index)
+        state = states[worker_index % len(states)]
+        local = []
+        for _ in range(requests_per_route // concurrency):
+            path = path_fn(rng, state)
+            body = body_fn(rng, state) if body_fn else None
+            token = None if name in ('POST /api/login', 'POST /api/signup') else state['token']
+            started = time.perf_counter()
+            status, size = client.request(method, path, token=token, body=body, headers=headers)
+            local.append((time.perf_counter() - started) * 1000)
+            with lock:
+                statuses[status] = statuses.get(status, 0) + 1
+                bytes_total += size
+        with lock:
+            latencies.extend(local)
+
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(work, range(concurrency)))
+    elapsed = time.perf_counter() - started
+    # In-process this includes the app's own work (encoding, compression); over --url only the client's
+    cpu_ms = (time.process_time() - cpu_started) * 1000
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'p50_ms': round(percentile(latencies, 0.50), 2),
+        'p95_ms': round(percentile(latencies, 0.95), 2),
+        'p99_ms': round(percentile(latencies, 0.99), 2),
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'cpu_ms': round(cpu_ms / len(latencies), 3) if latencies else 0.0,
+        'avg_bytes': round(bytes_total / len(latencies)) if latencies else 0,
+        'statuses': {str(code): count for code, count in sorted(statuses.items())},
+    }
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """Return human readable regressions (p95 latency, throughput or CPU per request worse than tolerance)"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if base['p95_ms'] and result['p95_ms'] > base['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {base['p95_ms']}ms -> {result['p95_ms']}ms")
+        if base['rps'] and result['rps'] < base['rps'] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {base['rps']} -> {result['rps']} req/s")
+        if base.get('cpu_ms') and result['cpu_ms'] > base['cpu_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: CPU {base['cpu_ms']}ms -> {result['cpu_ms']}ms per request")
+    return regressions
+
+
+def print_report(results):
+    header = (f"{'route':<42} {'p50':>8} {'p95':>8} {'p99':>8} {'req/s':>9} {'cpu/req':>8} {'bytes':>8}"
+              "  statuses")
+    print(header)
+    print('-' * len(header))
+    for name, r in results.items():
+        print(f"{name:<42} {r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8} {r['rps']:>9} "
+              f"{r.get('cpu_ms', '-'):>8} {r['avg_bytes']:>8}  {r['statuses']}")
+
+
+def parse_sweep(text):
+    """'3x4,5x4' -> [(3, 4), (5, 4)] - gunicorn (workers, threads) settings; raises ValueError"""
+    settings = []
+    for item in text.split(','):
+        workers, _, threads = item.strip().lower().partition('x')
+        if not workers.isdigit() or not threads.isdigit() or int(workers) < 1 or int(threads) < 1:
+            raise ValueError(f"Invalid sweep setting '{item}' - use WORKERSxTHREADS, e.g. 5x4")
+        settings.append((int(workers), int(threads)))
+    return settings
+
+
+def start_gunicorn(mongo_uri, secret_key, workers, threads, port, timeout=30):
+    """Serve the app with gunicorn.conf.py at the given size and wait until it answers"""
+    env = dict(os.environ, MONGO_URI=mongo_uri, SECRET_KEY=secret_key, LOGIN_THROTTLE='false',
+               GUNICORN_WORKER_CLASS='gthread', WEB_CONCURRENCY=str(workers),
+               GUNICORN_THREADS=str(threads), BIND=f'127.0.0.1:{port}')
+    process = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py'],
+                               cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'gunicorn exited with status {process.returncode}')
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f'gunicorn did not start listening on port {port} within {timeout}s')
+
+
+def summarize(results):
+    """Whole-run throughput and the worst route p95 of one benchmark run"""
+    requests = sum(r['requests'] for r in results.values())
+    seconds = sum(r['requests'] / r['rps'] for r in results.values() if r['rps'])
+    return {
+        'rps': round(requests / seconds, 1) if seconds else 0.0,
+        'worst_p95_ms': max((r['p95_ms'] for r in results.values()), default=0.0),
+        'errors': sum(count for r in results.values() for code, count in r['statuses'].items()
+                      if code.startswith('5')),
+    }
+
+
+def recommend(sweep, tolerance):
+    """
+    The (workers, threads) setting to run with: the highest throughput among
+    the settings without server errors whose worst p95 is within tolerance of
+    the best one. None if every setting had errors.
+    """
+    healthy = {setting: summary for setting, summary in sweep.items() if not summary['errors']}
+    if not healthy:
+        return None
+    best_p95 = min(summary['worst_p95_ms'] for summary in healthy.values())
+    return max((setting for setting, summary in healthy.items()
+                if summary['worst_p95_ms'] <= best_p95 * (1 + tolerance)),
+               key=lambda setting: healthy[setting]['rps'])
+
+
+def run_routes(client, states, args):
+    ctx = {'run_id': f'{int(time.time())}'}
+    results = {}
+    for route in build_routes(ctx):
+        if args.routes and args.routes not in route[0]:
+            continue
+        results[route[0]] = run_route(client, route, states, args.requests, args.concurrency, args.seed,
+                                      args.accept_encoding)
+    return results
+
+
+def run_sweep(args, settings, secret_key, states):
+    """Benchmark a gunicorn server at each (workers, threads) setting - returns the recommended one"""
+    sweep = {}
+    for workers, threads in settings:
+        print(f"\n=== {workers} workers x {threads} threads ===")
+        try:
+            process = start_gunicorn(args.mongo_uri, secret_key, workers, threads, args.sweep_port)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            continue
+        try:
+            results = run_routes(HttpClient(f'http://127.0.0.1:{args.sweep_port}'), states, args)
+        finally:
+            process.terminate()
+            process.wait(timeout=60)
+        print_report(results)
+        sweep[(workers, threads)] = summarize(results)
+
+    print("\n=== Summary ===")
+    print(f"{'workers x threads':<20} {'req/s':>9} {'worst p95':>10} {'5xx':>6}")
+    for (workers, threads), summary in sweep.items():
+        print(f"{f'{workers} x {threads}':<20} {summary['rps']:>9} {summary['worst_p95_ms']:>10} "
+              f"{summary['errors']:>6}")
+
+    choice = recommend(sweep, args.tolerance)
+    if choice is None:
+        print("\n❌ Every setting had server errors - no recommendation")
+        return None
+    print(f"\n✓ Recommended: WEB_CONCURRENCY={choice[0]} GUNICORN_THREADS={choice[1]} "
+          f"on {os.cpu_count()} CPU cores at --concurrency {args.concurrency}")
+    return choice
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark every /api route')
+    parser.add_argument('--mongo-uri', default=os.environ.get('BENCH_MONGO_URI', DEFAULT_MONGO_URI),
+                        help='database to seed and benchmark against (it is wiped first)')
+    parser.add_argument('--url', help='benchmark a running server instead of the in-process app')
+    parser.add_argument('--schools', type=int, default=3)
+    parser.add_argument('--users', type=int, default=200, help='users per school')
+    parser.add_argument('--events', type=int, default=1000, help='events per school')
+    parser.add_argument('--rsvps', type=int, default=20, help='RSVPs per event')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=400, help='requests per route')
+    parser.add_argument('--routes', help='only run routes whose name contains this text')
+    parser.add_argument('--accept-encoding', default='br, gzip',
+                        help="Accept-Encoding sent with every request ('' for uncompressed responses)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--skip-seed', action='store_true', help='reuse the data from a previous run')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--compare', action='store_true', help='exit 1 if a route regressed')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed regression (0.2 = 20%%)')
+    parser.add_argument('--sweep', help="start gunicorn at each WORKERSxTHREADS setting, e.g. '3x4,5x4,5x8', "
+                                        "and recommend the best")
+    parser.add_argument('--sweep-port', type=int, default=5099)
+    args = parser.parse_args()
+
+    settings = None
+    if args.sweep:
+        try:
+            settings = parse_sweep(args.sweep)
+        except ValueError as e:
+            parser.error(str(e))
+
+    if not args.url:
+        # Every simulated client shares one address - measure login, not the throttle.
+        # Set before anything imports passwords.py (seeding does).
+        os.environ.setdefault('LOGIN_THROTTLE', 'false')
+
+    from synthetic_data import generate
+
+    secret_key = os.environ.get('SECRET_KEY') or 'benchmark-secret'
+    db = MongoClient(args.mongo_uri).get_database()
+
+    if args.skip_seed:
+        schools = {}
+        for school in db.users.distinct('school'):
+            schools[school] = {
+                'user_ids': [str(u['_id']) for u in db.users.find({'school': school}, {'_id': 1}).limit(1000)],
+                'event_ids': [str(e['_id']) for e in db.events.find({'school': school}, {'_id': 1}).limit(1000)],
+            }
+    else:
+        print(f"Seeding {args.schools} schools x {args.users} users x {args.events} events...")
+        schools = generate(db, args.schools, args.users, args.events, args.rsvps,
+                           password=BENCH_PASSWORD, seed=args.seed)
+        for school in schools.values():
+            # Keep paths and the routes' $in lists a realistic size
+            school['event_ids'] = school['event_ids'][:1000]
+
+    states = make_worker_states(db, schools, secret_key, args.concurrency, args.seed)
+
+    if settings:
+        if not run_sweep(args, settings, secret_key, states):
+            sys.exit(1)
+        return
+
+    if args.url:
+        client = HttpClient(args.url)
+    else:
+        os.environ['MONGO_URI'] = args.mongo_uri
+        os.environ['SECRET_KEY'] = secret_key
+        from app import create_app
+        client = InProcessClient(create_app())
+
+    results = run_routes(client, states, args)
+
+    print()
+    print_report(results)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump({'created_at': datetime.utcnow().isoformat(), 'config': vars(args), 'results': results},
+                      f, indent=2)
+        print(f"\n✓ Saved baseline to {args.baseline}")
+
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"\n❌ No baseline at {args.baseline} - run with --save-baseline first")
+            sys.exit(1)
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print("\n❌ Regressions:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("\n✓ No regressions against baseline")
+
+
+if __name__ == '__main__':
+    main()
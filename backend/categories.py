@@ -0,0 +1,105 @@
+"""
+Event categories and per-school event counts.
+
+Counts of upcoming events come from a single $group aggregation per school and are cached.
+create_event, update_event and the bulk import adjust the cached counts in
+place, so the Explore page normally costs no database round trips at all. The TTL
+bounds how stale another worker process's counts can get.
+"""
+
+from threading import Lock
+import os
+
+from cache import TTLCache
+from dates import start_of_today
+
+CATEGORIES = [
+    {
+        'name': 'Sports',
+        'image': 'https://images.unsplash.com/photo-1461896836934-ffe607ba8211?w=800&q=80'
+    },
+    {
+        'name': 'Music',
+        'image': 'https://images.unsplash.com/photo-1511379938547-c1f69419868d?w=800&q=80'
+    },
+    {
+        'name': 'Art',
+        'image': 'https://images.unsplash.com/photo-1460661419201-fd4cecdf8a8b?w=800&q=80'
+    },
+    {
+        'name': 'Technology',
+        'image': 'https://images.unsplash.com/photo-1518770660439-4636190af475?w=800&q=80'
+    },
+    {
+        'name': 'Science',
+        'image': 'https://images.unsplash.com/photo-1532094349884-543bc11b234d?w=800&q=80'
+    },
+    {
+        'name': 'Reading',
+        'image': 'https://images.unsplash.com/photo-1481627834876-b7833e8f5570?w=800&q=80'
+    },
+    {
+        'name': 'Gaming',
+        'image': 'https://images.unsplash.com/photo-1511512578047-dfb367046420?w=800&q=80'
+    },
+    {
+        'name': 'Cooking',
+        'image': 'https://images.unsplash.com/photo-1556910103-1c02745aae4d?w=800&q=80'
+    },
+    {
+        'name': 'Travel',
+        'image': 'https://images.unsplash.com/photo-1488646953014-85cb44e25828?w=800&q=80'
+    }
+]
+
+CATEGORY_COUNTS_TTL = int(os.environ.get('CATEGORY_COUNTS_TTL', 300))
+
+# school -> {category name: event count}
+counts_cache = TTLCache(maxsize=1000, ttl=CATEGORY_COUNTS_TTL)
+_counts_lock = Lock()
+
+
+def count_events_by_category(db, school):
+    """Count a school's upcoming events per category with one aggregation"""
+    pipeline = [
+        {'$match': {'school': school, 'date': {'$gte': start_of_today()}}},
+        {'$group': {'_id': '$category', 'count': {'$sum': 1}}}
+    ]
+    return {row['_id']: row['count'] for row in db.events.aggregate(pipeline)}
+
+
+def get_category_counts(db, school):
+    """Per-category event counts for a school, served from the cache when possible"""
+    counts = counts_cache.get(school)
+    if counts is None:
+        counts = count_events_by_category(db, school)
+        counts_cache.set(school, counts)
+    return counts
+
+
+def counted_category(event):
+    """The category an event is counted under - None once its date is past, as the counts are upcoming only"""
+    date = event.get('date')
+    if date is None or date < start_of_today():
+        return None
+    return event.get('category')
+
+
+def adjust_category_count(school, old_category=None, new_category=None):
+    """Move one event between categories in the cached counts for a school"""
+    if old_category == new_category:
+        return
+
+    with _counts_lock:
+        counts = counts_cache.get(school)
+        if counts is None:
+            # Nothing cached - the next read will aggregate fresh counts
+            return
+
+        # Store a new dict so readers never see a half-applied update
+        counts = dict(counts)
+        if old_category is not None:
+            counts[old_category] = max(counts.get(old_category, 0) - 1, 0)
+        if new_category is not None:
+            counts[new_category] = counts.get(new_category, 0) + 1
+        counts_cache.replace(school, counts)
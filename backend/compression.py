@@ -0,0 +1,69 @@
+"""
+Negotiated response compression.
+
+JSON responses larger than COMPRESS_MIN_SIZE bytes are compressed with brotli
+(when the brotli package is installed) or gzip, whichever the client's
+Accept-Encoding prefers. Event lists repeat the same image URLs and
+categories over and over, so they shrink several times over.
+
+A compressed response is a different representation, so its ETag gets a
+'-gzip' / '-br' suffix; etag_matches() accepts any suffixed variant of a
+resource's ETag in If-None-Match.
+"""
+
+import gzip
+import os
+
+try:
+    import brotli
+except ImportError:  # optional dependency - gzip only
+    brotli = None
+
+COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+COMPRESS_GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', 6))
+COMPRESS_BROTLI_QUALITY = int(os.environ.get('COMPRESS_BROTLI_QUALITY', 4))
+
+ENCODINGS = ('br', 'gzip')
+
+
+def _compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=COMPRESS_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=COMPRESS_GZIP_LEVEL)
+
+
+def choose_encoding(accept_encodings):
+    """Best supported encoding from a parsed Accept-Encoding header, or None"""
+    supported = [encoding for encoding in ENCODINGS if encoding != 'br' or brotli is not None]
+    return accept_encodings.best_match(supported)
+
+
+def etag_matches(if_none_match, etag):
+    """The If-None-Match tag that matches etag or one of its compressed variants, or None"""
+    for tag in [etag] + [f'{etag}-{encoding}' for encoding in ENCODINGS]:
+        if if_none_match.contains(tag):
+            return tag
+    return None
+
+
+def compress_response(request, response):
+    """after_request hook - compress large JSON bodies the client can decode"""
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or response.mimetype != 'application/json' or 'Content-Encoding' in response.headers):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+
+    response.set_data(_compress(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(f'{etag}-{encoding}')
+    return response
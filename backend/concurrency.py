@@ -0,0 +1,40 @@
+"""
+Running a request's independent database calls at the same time.
+
+Handlers are plain functions on blocking PyMongo calls. gather() overlaps
+calls that don't depend on each other, so a handler waits for its slowest
+query instead of the sum of them. Under gunicorn's gevent workers (see
+gunicorn.conf.py) the pool's threads are monkey-patched into greenlets, so
+this costs no real threads there.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+import os
+
+QUERY_POOL_SIZE = int(os.environ.get('QUERY_POOL_SIZE', 16))
+
+_executor = ThreadPoolExecutor(max_workers=QUERY_POOL_SIZE, thread_name_prefix='query')
+
+
+def gather(*calls):
+    """
+    Run zero-argument callables concurrently and return their results in order.
+
+    The first call runs on the calling thread. Each call sees a copy of the
+    caller's context, so the request id still reaches the logs. An exception
+    from any call is re-raised once every call has finished.
+    """
+    if len(calls) < 2:
+        return [call() for call in calls]
+
+    futures = [_executor.submit(contextvars.copy_context().run, call) for call in calls[1:]]
+    try:
+        first = calls[0]()
+    finally:
+        # Never leave work running against a request that has already failed
+        errors = [future.exception() for future in futures]
+    for error in errors:
+        if error is not None:
+            raise error
+    return [first] + [future.result() for future in futures]
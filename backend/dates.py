@@ -0,0 +1,166 @@
+"""
+Event dates and times.
+
+Events store `date`, `start_time` and `end_time` as BSON datetimes (naive,
+holding the wall-clock time the host entered), so sorting and range queries
+compare real dates instead of strings. Those wall-clock times are read as
+EVENT_TIMEZONE, the campus's zone: "today" starts at midnight there, and
+dates sent with a UTC offset are converted to it. `time` stays a free-text display
+string such as '3:00 PM - 6:00 PM'.
+
+Listings take optional `from` / `to` query parameters ('YYYY-MM-DD' or an ISO
+datetime). With neither, they default to upcoming events - everything from
+the start of today onwards.
+"""
+
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+import os
+import re
+
+EVENT_TIMEZONE = ZoneInfo(os.environ.get('EVENT_TIMEZONE', 'America/New_York'))
+
+_CLOCK_12H = re.compile(r'^(\d{1,2})(?::(\d{2}))?\s*([AaPp])\.?[Mm]\.?$')
+_CLOCK_24H = re.compile(r'^(\d{1,2}):(\d{2})(?::\d{2})?$')
+
+
+def event_now():
+    """The wall-clock time in EVENT_TIMEZONE, naive like stored event dates"""
+    return datetime.now(EVENT_TIMEZONE).replace(tzinfo=None)
+
+
+def start_of_today():
+    now = event_now()
+    return datetime(now.year, now.month, now.day)
+
+
+def parse_date(value):
+    """'YYYY-MM-DD', an ISO datetime string or a datetime -> naive EVENT_TIMEZONE datetime; raises ValueError"""
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, str) and value.strip():
+        text = value.strip()
+        if text.endswith('Z'):
+            text = text[:-1] + '+00:00'
+        try:
+            parsed = datetime.fromisoformat(text)
+        except ValueError:
+            raise ValueError(f'Invalid date: {value}')
+    else:
+        raise ValueError('Date is required')
+
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(EVENT_TIMEZONE).replace(tzinfo=None)
+    return parsed
+
+
+def parse_clock(value):
+    """'18:30' or '6:30 PM' -> (hour, minute); raises ValueError"""
+    text = str(value).strip()
+    match = _CLOCK_24H.match(text)
+    if match:
+        hour, minute = int(match.group(1)), int(match.group(2))
+    else:
+        match = _CLOCK_12H.match(text)
+        if not match:
+            raise ValueError(f'Invalid time: {value}')
+        hour, minute = int(match.group(1)), int(match.group(2) or 0)
+        if not 1 <= hour <= 12:
+            raise ValueError(f'Invalid time: {value}')
+        hour = hour % 12 + (12 if match.group(3).lower() == 'p' else 0)
+
+    if hour > 23 or minute > 59:
+        raise ValueError(f'Invalid time: {value}')
+    return hour, minute
+
+
+def parse_time_range(text):
+    """Start and end clock times from display text like '3:00 PM - 6:00 PM' (None if absent)"""
+    if not text:
+        return None, None
+    parts = [part.strip() for part in re.split(r'\s*[-–—]\s*|\s+to\s+', str(text)) if part.strip()]
+    clocks = []
+    for part in parts[:2]:
+        try:
+            clocks.append(parse_clock(part))
+        except ValueError:
+            clocks.append(None)
+    clocks += [None] * (2 - len(clocks))
+    return clocks[0], clocks[1]
+
+
+def _at(day, clock):
+    return day.replace(hour=clock[0], minute=clock[1], second=0, microsecond=0)
+
+
+def normalize_schedule(date, start_time=None, end_time=None, time_text=None):
+    """
+    Turn the date and times an event was submitted with into datetimes.
+
+    Returns {'date', 'start_time', 'end_time'}: `date` is the start of the
+    event (or midnight when no start time is known) and an end time earlier
+    than the start is taken to be on the next day. Raises ValueError.
+    """
+    day = parse_date(date)
+    text_start, text_end = parse_time_range(time_text)
+
+    def resolve(value, fallback):
+        if isinstance(value, datetime):
+            return parse_date(value)
+        if value:
+            return _at(day, parse_clock(value))
+        return _at(day, fallback) if fallback else None
+
+    # A full datetime in `date` doubles as the start time
+    has_clock = (day.hour, day.minute) != (0, 0)
+    start = resolve(start_time, text_start or ((day.hour, day.minute) if has_clock else None))
+    end = resolve(end_time, text_end)
+    if start and end and end < start:
+        end += timedelta(days=1)
+
+    return {
+        'date': start or day.replace(hour=0, minute=0, second=0, microsecond=0),
+        'start_time': start,
+        'end_time': end
+    }
+
+
+def _parse_bound(value, name):
+    try:
+        bound = parse_date(value)
+    except ValueError:
+        raise ValueError(f'{name} must be a date (YYYY-MM-DD) or an ISO datetime')
+    # A bare date as the upper bound includes the whole day
+    inclusive_day = len(value.strip()) == 10
+    return bound, inclusive_day
+
+
+def parse_date_range(args, default_upcoming=True):
+    """
+    MongoDB condition on `date` from the from/to query parameters - raises ValueError.
+
+    Defaults to upcoming events (or to no bound at all when default_upcoming is
+    False, which gives an empty condition); passing only `to` lists everything
+    before it.
+    """
+    from_value = args.get('from')
+    to_value = args.get('to')
+
+    condition = {}
+    if from_value:
+        condition['$gte'] = _parse_bound(from_value, 'from')[0]
+    elif not to_value and default_upcoming:
+        condition['$gte'] = start_of_today()
+
+    if to_value:
+        end, inclusive_day = _parse_bound(to_value, 'to')
+        if inclusive_day:
+            condition['$lt'] = end + timedelta(days=1)
+        else:
+            condition['$lte'] = end
+
+    lower = condition.get('$gte')
+    upper = condition.get('$lt') or condition.get('$lte')
+    if lower and upper and lower > upper:
+        raise ValueError('from must not be after to')
+    return condition
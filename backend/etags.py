@@ -0,0 +1,57 @@
+"""
+Version counters for conditional GETs.
+
+Every school and every user has a counter in the versions collection, and
+each school has a second one for its ranked feeds (see ranking.py). Writes
+bump the counters of whatever they touch, and reads derive a strong ETag from
+the counters they depend on, so an unchanged resource can be answered with
+304 Not Modified before any listing query runs.
+"""
+
+from pymongo import ReturnDocument, UpdateOne
+import hashlib
+
+
+def school_key(school):
+    return f'school:{school}'
+
+
+def user_key(user_id):
+    return f'user:{user_id}'
+
+
+def feed_key(school):
+    """Bumped only by writes that change which events rank in the school's feeds - not by RSVPs"""
+    return f'feed:{school}'
+
+
+def bump_versions(db, *keys):
+    """Increment the version counters for the given keys in one round trip"""
+    keys = [key for key in dict.fromkeys(keys) if key]
+    if not keys:
+        return
+    db.versions.bulk_write([
+        UpdateOne({'_id': key}, {'$inc': {'v': 1}}, upsert=True)
+        for key in keys
+    ], ordered=False)
+
+
+def bump_version(db, key):
+    """Increment a single counter and return its new value"""
+    doc = db.versions.find_one_and_update(
+        {'_id': key}, {'$inc': {'v': 1}}, upsert=True, return_document=ReturnDocument.AFTER
+    )
+    return doc['v']
+
+
+def get_versions(db, keys):
+    """Current counter for each key - keys that were never bumped are at 0"""
+    found = {doc['_id']: doc['v'] for doc in db.versions.find({'_id': {'$in': list(keys)}})}
+    return [found.get(key, 0) for key in keys]
+
+
+def compute_etag(keys, versions, *parts):
+    """Strong ETag from the version counters plus anything else the response varies on"""
+    raw = '|'.join(f'{key}={version}' for key, version in zip(keys, versions))
+    raw += '|' + '|'.join(str(part) for part in parts)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
@@ -0,0 +1,243 @@
+"""
+Bulk event import.
+
+Clubs publishing a semester schedule send all of it to /api/events/import in
+one request: a JSON array, NDJSON (one event per line) or CSV with a header
+row, chosen by Content-Type. The body is parsed incrementally from the
+request stream, each row is validated with build_event() as it arrives, and
+valid events are inserted in ordered insert_many batches of IMPORT_BATCH_SIZE.
+As with create_event, the host is registered for every event they import.
+
+Invalid rows are reported back with their row number (the line number for
+CSV and NDJSON, the 1-based position in a JSON array) and the rest of the
+import carries on. A body over IMPORT_MAX_BYTES stops the import there, like
+one over IMPORT_MAX_ROWS.
+"""
+
+from pymongo.errors import BulkWriteError
+import codecs
+import csv
+import json
+import os
+
+from categories import adjust_category_count, counted_category
+from etags import bump_version, bump_versions, feed_key, school_key, user_key
+from events import build_event
+from ranking import refresh_events
+from rsvps import add_host_rsvps
+
+IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', 100))
+IMPORT_MAX_ROWS = int(os.environ.get('IMPORT_MAX_ROWS', 1000))
+IMPORT_MAX_BYTES = int(os.environ.get('IMPORT_MAX_BYTES', 2 * 1024 * 1024))
+# Largest single JSON array element - the parser buffers one element at a time
+IMPORT_MAX_ROW_BYTES = 64 * 1024
+# Errors listed in the response; any further ones are only counted
+MAX_REPORTED_ERRORS = 100
+
+READ_CHUNK_SIZE = 16 * 1024
+
+# Content-Type -> format
+FORMATS = {
+    'application/json': 'json',
+    'application/x-ndjson': 'ndjson',
+    'application/jsonl': 'ndjson',
+    'text/csv': 'csv',
+}
+
+
+class ImportFormatError(ValueError):
+    """The body can't be parsed past this row"""
+
+    def __init__(self, row, message):
+        super().__init__(message)
+        self.row = row
+
+
+class _LimitedStream:
+    """
+    The request body, cut off at limit bytes.
+
+    Content-Length is checked before the import starts, but a chunked upload
+    has none, so the size is also counted as the body is read.
+    """
+
+    def __init__(self, stream, limit):
+        self.stream = stream
+        self.limit = limit
+        self.remaining = limit
+
+    def read(self, size=-1):
+        # Ask for one byte past the limit so an oversized body is noticed
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining + 1
+        chunk = self.stream.read(size)
+        self.remaining -= len(chunk)
+        if self.remaining < 0:
+            raise ImportFormatError(None, f'Import is larger than {self.limit} bytes')
+        return chunk
+
+
+def _json_array_rows(stream):
+    """(row, value, None) for each element of a top-level JSON array, read a chunk at a time"""
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    buffer, pos, eof = '', 0, False
+
+    def next_char():
+        # Skip whitespace, reading more of the body as needed; '' at the end
+        nonlocal buffer, pos, eof
+        while True:
+            pos = json.decoder.WHITESPACE.match(buffer, pos).end()
+            if pos < len(buffer) or eof:
+                return buffer[pos:pos + 1]
+            chunk = stream.read(READ_CHUNK_SIZE)
+            eof = not chunk
+            buffer, pos = utf8.decode(chunk, final=eof), 0
+
+    if next_char() != '[':
+        raise ImportFormatError(1, 'Expected a JSON array of events')
+    pos += 1
+
+    row = 0
+    while True:
+        char = next_char()
+        if char == ']':
+            return
+        if row:
+            if char != ',':
+                raise ImportFormatError(row + 1, "Expected ',' or ']' between events")
+            pos += 1
+            next_char()
+        row += 1
+
+        while True:
+            try:
+                value, pos = decoder.raw_decode(buffer, pos)
+                break
+            except json.JSONDecodeError as e:
+                # Probably cut off at the end of the chunk - read on unless it can't be
+                if eof:
+                    raise ImportFormatError(row, f'Invalid JSON: {e.msg}')
+                if len(buffer) - pos > IMPORT_MAX_ROW_BYTES:
+                    raise ImportFormatError(row, f'Row is larger than {IMPORT_MAX_ROW_BYTES} bytes')
+                chunk = stream.read(READ_CHUNK_SIZE)
+                eof = not chunk
+                buffer, pos = buffer[pos:] + utf8.decode(chunk, final=eof), 0
+        yield row, value, None
+
+
+def _ndjson_rows(stream):
+    """(line number, value, error) for each non-blank line"""
+    for line_number, line in enumerate(codecs.getreader('utf-8')(stream), 1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line), None
+        except ValueError as e:
+            yield line_number, None, f'Invalid JSON: {e}'
+
+
+def _csv_rows(stream):
+    """(line number, row dict, None) for each record after the header"""
+    reader = csv.DictReader(codecs.getreader('utf-8')(stream))
+    try:
+        for row in reader:
+            # Drop unnamed overflow columns and surrounding spaces from spreadsheet exports
+            yield reader.line_num, {key.strip(): (value or '').strip() for key, value in row.items()
+                                    if key is not None}, None
+    except csv.Error as e:
+        raise ImportFormatError(reader.line_num, f'Invalid CSV: {e}')
+
+
+def parse_import(stream, mimetype):
+    """Lazily parsed rows of an import body - raises ValueError for an unsupported Content-Type"""
+    kind = FORMATS.get(mimetype)
+    if kind is None:
+        raise ValueError(f'Unsupported Content-Type - use one of {", ".join(FORMATS)}')
+    stream = _LimitedStream(stream, IMPORT_MAX_BYTES)
+    if kind == 'json':
+        return _json_array_rows(stream)
+    if kind == 'ndjson':
+        return _ndjson_rows(stream)
+    return _csv_rows(stream)
+
+
+def _insert_batch(db, batch, fail):
+    """Insert (row, event) pairs in order - returns the events that were stored"""
+    inserted = []
+    while batch:
+        try:
+            db.events.insert_many([event for _, event in batch], ordered=True)
+            inserted.extend(event for _, event in batch)
+            break
+        except BulkWriteError as e:
+            # An ordered insert stops at the first failure: keep what went in and resume after it
+            error = e.details['writeErrors'][0]
+            inserted.extend(event for _, event in batch[:error['index']])
+            fail(batch[error['index']][0], error.get('errmsg', 'Could not be saved'))
+            batch = batch[error['index'] + 1:]
+    return inserted
+
+
+def import_event_rows(db, current_user, rows):
+    """
+    Validate and insert parsed rows as events hosted by current_user.
+
+    Returns {'imported', 'failed', 'event_ids', 'errors'}; errors lists the
+    first MAX_REPORTED_ERRORS failed rows as {'row', 'message'}.
+    """
+    result = {'imported': 0, 'failed': 0, 'event_ids': [], 'errors': []}
+    user_id = str(current_user['_id'])
+    batch = []
+
+    def fail(row, message):
+        result['failed'] += 1
+        if len(result['errors']) < MAX_REPORTED_ERRORS:
+            result['errors'].append({'row': row, 'message': message})
+
+    def flush():
+        events = _insert_batch(db, batch, fail)
+        batch.clear()
+        if not events:
+            return
+
+        # Same bookkeeping as create_event, once per batch
+        add_host_rsvps(db, events)
+        for event in events:
+            adjust_category_count(event['school'], new_category=counted_category(event))
+        feed_version = bump_version(db, feed_key(current_user.get('school')))
+        bump_versions(db, school_key(current_user.get('school')), user_key(user_id))
+        refresh_events(events, feed_version)
+
+        result['imported'] += len(events)
+        result['event_ids'].extend(str(event['_id']) for event in events)
+
+    try:
+        for count, (row, data, error) in enumerate(rows, 1):
+            if count > IMPORT_MAX_ROWS:
+                fail(row, f'Too many rows - at most {IMPORT_MAX_ROWS} events per import')
+                break
+            if error:
+                fail(row, error)
+                continue
+            if not isinstance(data, dict):
+                fail(row, 'Each event must be an object')
+                continue
+
+            try:
+                event = build_event(data, current_user)
+            except (ValueError, TypeError, AttributeError) as e:
+                # TypeError / AttributeError: non-string dates or times in JSON rows
+                fail(row, str(e) if isinstance(e, ValueError) else 'Dates and times must be strings')
+                continue
+
+            batch.append((row, event))
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                flush()
+    except ImportFormatError as e:
+        fail(e.row, str(e))
+    except UnicodeDecodeError:
+        fail(None, 'Body is not valid UTF-8')
+
+    flush()
+    return result
@@ -0,0 +1,118 @@
+"""
+Event documents built from submitted data.
+
+create_event and the bulk import (event_import.py) validate and shape events
+the same way through build_event(); update_event builds its $set with
+build_event_update().
+"""
+
+from datetime import datetime
+
+from categories import CATEGORIES
+from dates import normalize_schedule
+
+REQUIRED_EVENT_FIELDS = ['title', 'description', 'category', 'date', 'time', 'location']
+# Fields that are normalized together into date / start_time / end_time
+SCHEDULE_FIELDS = ['date', 'time', 'start_time', 'end_time']
+
+CATEGORY_IMAGES = {category['name']: category['image'] for category in CATEGORIES}
+
+
+def parse_capacity(value):
+    """None (unlimited) for an empty value, else a whole number of seats of at least 1; raises ValueError"""
+    if value is None or value == '':
+        return None
+    try:
+        capacity = int(str(value).strip())
+    except ValueError:
+        raise ValueError('Capacity must be a whole number')
+    if capacity < 1:
+        raise ValueError('Capacity must be at least 1')
+    return capacity
+
+
+def build_event(event_data, current_user):
+    """
+    A new event document hosted by current_user, counting the host's own RSVP.
+
+    Raises ValueError with a message for the client if a required field is
+    missing or the date, times or capacity can't be parsed.
+    """
+    missing_fields = [field for field in REQUIRED_EVENT_FIELDS if not event_data.get(field)]
+    if missing_fields:
+        raise ValueError(f'Missing required fields: {", ".join(missing_fields)}')
+
+    # Store the date and start/end times as datetimes
+    schedule = normalize_schedule(event_data['date'], event_data.get('start_time'),
+                                  event_data.get('end_time'), event_data['time'])
+
+    capacity = parse_capacity(event_data.get('capacity'))
+
+    host_name = f"{current_user.get('first_name', '')} {current_user.get('last_name', '')}".strip()
+    if not host_name:
+        host_name = current_user.get('email', 'Unknown Host')
+
+    return {
+        'title': event_data['title'],
+        'description': event_data['description'],
+        'category': event_data['category'],
+        'date': schedule['date'],
+        'time': event_data['time'],
+        'start_time': schedule['start_time'],
+        'end_time': schedule['end_time'],
+        'location': event_data['location'],
+        'school_years': event_data.get('school_years') or 'All',
+        'genders': event_data.get('genders') or 'All',
+        # Imported rows often have no image - fall back to the category's
+        'image': event_data.get('image') or CATEGORY_IMAGES.get(event_data['category']),
+        'host': host_name,
+        'host_id': str(current_user['_id']),
+        'school': current_user.get('school'),
+        'capacity': capacity,  # None - no limit
+        'attendees_count': 1,  # Auto-RSVP creator
+        'created_at': datetime.utcnow()
+    }
+
+
+def build_event_update(event_data, partial=False):
+    """
+    The $set document for an edit to an event.
+
+    A full update (PUT) needs every required field. A partial one (PATCH)
+    changes only the fields sent, but a schedule change needs both date and
+    time so it can be normalized without reading the event first. Raises
+    ValueError.
+    """
+    if partial:
+        blank_fields = [field for field in REQUIRED_EVENT_FIELDS if field in event_data and not event_data[field]]
+        if blank_fields:
+            raise ValueError(f'Fields cannot be empty: {", ".join(blank_fields)}')
+    else:
+        missing_fields = [field for field in REQUIRED_EVENT_FIELDS if not event_data.get(field)]
+        if missing_fields:
+            raise ValueError(f'Missing required fields: {", ".join(missing_fields)}')
+
+    update = {field: event_data[field] for field in ('title', 'description', 'category', 'location')
+              if field in event_data}
+
+    if any(field in event_data for field in SCHEDULE_FIELDS):
+        if not (event_data.get('date') and event_data.get('time')):
+            raise ValueError('date and time are both required to change the schedule')
+        update.update(normalize_schedule(event_data['date'], event_data.get('start_time'),
+                                         event_data.get('end_time'), event_data['time']))
+        update['time'] = event_data['time']
+
+    for field in ('school_years', 'genders'):
+        if field in event_data or not partial:
+            update[field] = event_data.get(field) or 'All'
+    # Without a new image the current one is kept
+    if event_data.get('image'):
+        update['image'] = event_data['image']
+    # Capacity is only changed when the request includes it
+    if 'capacity' in event_data:
+        update['capacity'] = parse_capacity(event_data['capacity'])
+
+    if not update:
+        raise ValueError('No fields to update')
+    update['updated_at'] = datetime.utcnow()
+    return update
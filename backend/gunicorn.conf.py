@@ -0,0 +1,74 @@
+"""
+Gunicorn configuration for serving the API in production:
+
+    gunicorn -c gunicorn.conf.py
+
+Workers are forked before the app is created (preload_app = False), so every
+worker builds its own Flask app and MongoClient via create_app() and no
+client is ever shared across fork().
+
+Sizing: requests spend most of their time waiting on MongoDB, so each worker
+runs a few threads. Start with (2 x CPU cores) + 1 workers and 4 threads per
+worker, keep MONGO_MAX_POOL_SIZE >= threads, and make sure
+workers x MONGO_MAX_POOL_SIZE stays below the mongod connection limit.
+`python benchmark.py --sweep 3x4,5x4,5x8` serves the app with this file at each
+workers x threads setting against a seeded local mongod and prints the one to use.
+
+Async mode: set GUNICORN_WORKER_CLASS=gevent to serve each request on a
+greenlet instead of a thread. The worker monkey-patches the standard library
+before the app is imported, so PyMongo's socket I/O yields to other requests
+and one worker holds up to GUNICORN_WORKER_CONNECTIONS requests in flight.
+Use fewer workers (about one per CPU core) and raise MONGO_MAX_POOL_SIZE so
+the pool isn't the bottleneck.
+"""
+
+from dotenv import load_dotenv
+import multiprocessing
+import os
+
+load_dotenv()
+
+wsgi_app = 'app:create_app()'
+bind = os.environ.get('BIND', '0.0.0.0:5001')
+
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+if worker_class == 'gevent':
+    workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+    worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000))
+else:
+    workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+    threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# Never create the app (and its MongoClient) in the master process
+preload_app = False
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers now and then to bound memory growth from in-process caches
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = 1000
+
+accesslog = None
+errorlog = '-'
+
+
+def on_starting(server):
+    """Create indexes once in the master, with a client that is closed before forking"""
+    from pymongo import MongoClient
+    from indexes import IndexBuildError, ensure_indexes
+
+    client = MongoClient(os.environ.get('MONGO_URI'), serverSelectionTimeoutMS=5000)
+    try:
+        ensure_indexes(client.get_database())
+    except IndexBuildError as e:
+        for label, error in e.failures:
+            server.log.error(f"Could not create MongoDB index {label}: {error}")
+    except Exception as e:
+        server.log.error(f"Could not ensure MongoDB indexes: {e}")
+    finally:
+        client.close()
+
+    # Workers don't need to repeat it
+    os.environ['ENSURE_INDEXES_ON_STARTUP'] = 'false'
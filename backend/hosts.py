@@ -0,0 +1,67 @@
+"""
+Host summaries for event responses.
+
+Hosts for a whole page of events are resolved with one batched $in query
+(dataloader style), backed by a small cache of host cards, so embedding
+hosts never turns into one users query per event.
+"""
+
+from bson.objectid import ObjectId
+from bson.errors import InvalidId
+import os
+
+from cache import TTLCache
+
+HOST_CACHE_TTL = int(os.environ.get('HOST_CACHE_TTL', 300))
+
+host_cache = TTLCache(maxsize=5000, ttl=HOST_CACHE_TTL)
+
+
+def _host_card(user):
+    return {
+        'id': str(user['_id']),
+        'first_name': user.get('first_name'),
+        'last_name': user.get('last_name'),
+        'profile_pic': user.get('profile_pic')
+    }
+
+
+def load_host_summaries(db, host_ids):
+    """Map each host id to its summary card, fetching all cache misses in one query"""
+    summaries = {}
+    missing = []
+    for host_id in dict.fromkeys(host_ids):
+        if not host_id:
+            continue
+        card = host_cache.get(host_id)
+        if card is None:
+            missing.append(host_id)
+        else:
+            summaries[host_id] = card
+
+    object_ids = []
+    for host_id in missing:
+        try:
+            object_ids.append(ObjectId(host_id))
+        except (InvalidId, TypeError):
+            continue
+
+    if object_ids:
+        users = db.users.find(
+            {'_id': {'$in': object_ids}},
+            {'first_name': 1, 'last_name': 1, 'profile_pic': 1}
+        )
+        for user in users:
+            card = _host_card(user)
+            host_cache.set(card['id'], card)
+            summaries[card['id']] = card
+
+    return summaries
+
+
+def embed_hosts(db, events):
+    """Add a host_summary to each serialized event (dicts with a host_id key)"""
+    summaries = load_host_summaries(db, [event.get('host_id') for event in events])
+    for event in events:
+        event['host_summary'] = summaries.get(event.get('host_id'))
+    return events
@@ -0,0 +1,181 @@
+"""
+Index management for the users, events, RSVP and waitlist collections and the archives.
+
+The indexes declared here back every hot query in app.py. They are created
+at startup, and can also be created or verified from the command line:
+
+    python indexes.py           # create any missing indexes
+    python indexes.py --check   # fail if any route query needs a COLLSCAN
+"""
+
+from bson.objectid import ObjectId
+from datetime import datetime
+from pymongo import ASCENDING, DESCENDING, TEXT
+from pymongo.errors import ConnectionFailure
+import sys
+
+# collection -> list of (keys, options)
+INDEXES = {
+    'users': [
+        ([('email', ASCENDING)], {'name': 'email_unique', 'unique': True}),
+    ],
+    'events': [
+        # /api/events/category/<name> and /api/events/categories
+        ([('school', ASCENDING), ('category', ASCENDING), ('date', ASCENDING), ('_id', ASCENDING)],
+         {'name': 'school_category_date'}),
+        # /api/events/all - newest first within a school; the trailing date key lets
+        # the from/to range be checked on index keys without fetching past events
+        ([('school', ASCENDING), ('_id', DESCENDING), ('date', ASCENDING)],
+         {'name': 'school_newest_date'}),
+        # /api/user/hosting and /api/user/<id>?full=true
+        ([('host_id', ASCENDING), ('date', ASCENDING)],
+         {'name': 'host_date'}),
+        # archive.py - finished events, oldest first
+        ([('date', ASCENDING), ('_id', ASCENDING)],
+         {'name': 'date_id'}),
+        # /api/events/search - text search scoped to one school
+        ([('school', ASCENDING), ('title', TEXT), ('description', TEXT), ('location', TEXT), ('host', TEXT)],
+         {'name': 'school_text', 'weights': {'title': 10, 'host': 5, 'location': 3, 'description': 1},
+          'default_language': 'english'}),
+    ],
+    'rsvps': [
+        # One RSVP per user per event, and membership checks for /api/events/*
+        ([('event_id', ASCENDING), ('user_id', ASCENDING)],
+         {'name': 'event_user_unique', 'unique': True}),
+        # /api/user/events
+        ([('user_id', ASCENDING), ('date', ASCENDING)],
+         {'name': 'user_date'}),
+    ],
+    # Waitlists of full events - one entry per user, promoted oldest first
+    'waitlist': [
+        ([('event_id', ASCENDING), ('user_id', ASCENDING)],
+         {'name': 'event_user_unique', 'unique': True}),
+        ([('event_id', ASCENDING), ('created_at', ASCENDING)],
+         {'name': 'event_created'}),
+    ],
+    # Cold copies written by archive.py, read by profile history (?include=archived)
+    'events_archive': [
+        ([('host_id', ASCENDING), ('date', ASCENDING)],
+         {'name': 'host_date'}),
+    ],
+    'rsvps_archive': [
+        ([('user_id', ASCENDING), ('date', ASCENDING)],
+         {'name': 'user_date'}),
+    ],
+}
+
+UPCOMING = {'$gte': datetime(2025, 1, 1)}
+
+# Representative queries issued by the routes: (label, collection, filter, sort)
+ROUTE_QUERIES = [
+    ('login / signup', 'users', {'email': 'someone@example.edu'}, None),
+    ('events by category', 'events', {'category': 'Sports', 'school': 'uf', 'date': UPCOMING},
+     [('date', ASCENDING), ('_id', ASCENDING)]),
+    ('category counts', 'events', {'school': 'uf', 'date': UPCOMING}, None),
+    ('all events', 'events', {'school': 'uf', 'host_id': {'$ne': 'user'}, 'date': UPCOMING},
+     [('_id', DESCENDING)]),
+    ('feed candidates', 'events',
+     {'school': 'uf', 'host_id': {'$ne': 'user'}, 'category': {'$in': ['Sports', 'Music']}, 'date': UPCOMING},
+     [('date', ASCENDING)]),
+    ('event search', 'events', {'school': 'uf', '$text': {'$search': 'game night'}, 'date': UPCOMING}, None),
+    ('hosting events', 'events', {'host_id': 'user', 'date': UPCOMING}, [('date', ASCENDING)]),
+    ('attending events', 'rsvps', {'user_id': 'user', 'date': UPCOMING}, [('date', ASCENDING)]),
+    ('attending events (details)', 'events', {'_id': {'$in': [ObjectId()]}, 'host_id': {'$ne': 'user'}},
+     [('date', ASCENDING)]),
+    ('dashboard events', 'events',
+     {'$or': [{'_id': {'$in': [ObjectId()]}}, {'host_id': 'user', 'date': UPCOMING}]}, None),
+    ('archive scan', 'events', {'date': {'$lt': datetime(2025, 1, 1)}},
+     [('date', ASCENDING), ('_id', ASCENDING)]),
+    ('archived hosting events', 'events_archive', {'host_id': 'user'}, [('date', ASCENDING)]),
+    ('archived attending events', 'rsvps_archive', {'user_id': 'user'}, [('date', ASCENDING)]),
+    ('rsvp lookup', 'rsvps', {'event_id': ObjectId(), 'user_id': 'user'}, None),
+    ('rsvp flags', 'rsvps', {'user_id': 'user', 'event_id': {'$in': [ObjectId()]}}, None),
+    ('waitlist lookup', 'waitlist', {'event_id': ObjectId(), 'user_id': 'user'}, None),
+    ('waitlist promotion', 'waitlist', {'event_id': ObjectId()}, [('created_at', ASCENDING), ('_id', ASCENDING)]),
+]
+
+
+class IndexBuildError(Exception):
+    """Some indexes could not be created - failures lists ('collection.index', error) pairs"""
+
+    def __init__(self, failures):
+        super().__init__(', '.join(f'{label}: {error}' for label, error in failures))
+        self.failures = failures
+
+
+def ensure_indexes(db):
+    """
+    Create every declared index that doesn't exist yet - raises IndexBuildError,
+    or ConnectionFailure as soon as the server can't be reached.
+
+    Each index is created on its own, so one that fails (typically a unique
+    index over existing duplicates) doesn't stop the rest. Unique indexes go
+    first: RSVPs, the waitlist and signup rely on them for correctness.
+    """
+    declared = [(collection_name, keys, options) for collection_name, indexes in INDEXES.items()
+                for keys, options in indexes]
+    failures = []
+    for collection_name, keys, options in sorted(declared, key=lambda index: not index[2].get('unique')):
+        try:
+            db[collection_name].create_index(keys, **options)
+        except ConnectionFailure:
+            # Every other index would wait out the same timeout
+            raise
+        except Exception as e:
+            failures.append((f"{collection_name}.{options['name']}", e))
+    if failures:
+        raise IndexBuildError(failures)
+
+
+def _plan_stages(plan):
+    """Yield every stage name in an explain() plan tree"""
+    if not isinstance(plan, dict):
+        return
+    if 'stage' in plan:
+        yield plan['stage']
+    for key in ('inputStage', 'queryPlan'):
+        if key in plan:
+            yield from _plan_stages(plan[key])
+    for child in plan.get('inputStages', []):
+        yield from _plan_stages(child)
+
+
+def find_collection_scans(db):
+    """Run explain() on each route query and return the labels of those that COLLSCAN"""
+    failures = []
+    for label, collection_name, query, sort in ROUTE_QUERIES:
+        cursor = db[collection_name].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        plan = cursor.explain()['queryPlanner']['winningPlan']
+        if 'COLLSCAN' in _plan_stages(plan):
+            failures.append(label)
+    return failures
+
+
+if __name__ == '__main__':
+    from pymongo import MongoClient
+    from dotenv import load_dotenv
+    import os
+
+    load_dotenv()
+    client = MongoClient(os.environ.get('MONGO_URI'))
+    db = client.get_database()
+
+    print("Ensuring indexes...")
+    try:
+        ensure_indexes(db)
+    except IndexBuildError as e:
+        for label, error in e.failures:
+            print(f"❌ Could not create {label}: {error}")
+        sys.exit(1)
+    print("✓ Indexes are in place")
+
+    if '--check' in sys.argv[1:]:
+        print("\nVerifying query plans...")
+        failures = find_collection_scans(db)
+        for label in failures:
+            print(f"❌ COLLSCAN: {label}")
+        if failures:
+            sys.exit(1)
+        print("✓ No route query needs a collection scan")
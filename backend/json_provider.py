@@ -0,0 +1,60 @@
+"""
+Fast JSON encoding for API responses.
+
+FastJSONProvider plugs into Flask's app.json, so jsonify() and friends use
+orjson when it is installed and fall back to the standard library otherwise.
+ObjectId and datetime values are encoded natively (as the id string and an
+ISO 8601 string), so handlers don't have to convert them first.
+"""
+
+from bson.objectid import ObjectId
+from datetime import date
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional dependency - stdlib json is used instead
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, date):
+        # orjson never gets here for dates; the stdlib path would otherwise use HTTP dates
+        return value.isoformat()
+    return DefaultJSONProvider.default(value)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    default = staticmethod(_default)
+
+    def _options(self, sort_keys=False, indent=None):
+        option = 0
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None:
+            return super().dumps(obj, **kwargs)
+        option = self._options(kwargs.get('sort_keys', self.sort_keys), kwargs.get('indent'))
+        return orjson.dumps(obj, default=_default, option=option).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is None:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = self.compact is False or (self.compact is None and self._app.debug)
+        option = self._options(self.sort_keys, indent=pretty)
+        # Hand the encoded bytes straight to the response - no str round trip
+        body = orjson.dumps(obj, default=_default, option=option) + b'\n'
+        return self._app.response_class(body, mimetype=self.mimetype)
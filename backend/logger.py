@@ -0,0 +1,117 @@
+"""
+Structured, leveled logging for the API.
+
+Every record is emitted as one JSON line tagged with the current request id.
+Debug output is sampled per request (LOG_DEBUG_SAMPLE_RATE), so a sampled
+request keeps all of its debug lines while most requests log none. Records
+are handed to a background thread through a queue, so request workers never
+block on stdout.
+
+Settings:
+    LOG_LEVEL              DEBUG, INFO, WARNING, ... (default INFO)
+    LOG_DEBUG_SAMPLE_RATE  fraction of requests whose debug lines are kept (default 0.01)
+"""
+
+from flask import g, has_request_context, request
+from logging.handlers import QueueHandler, QueueListener
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import time
+import uuid
+
+LOGGER_NAME = 'serendipity'
+
+log = logging.getLogger(LOGGER_NAME)
+
+_listener = None
+
+
+def _current_request_id():
+    if has_request_context():
+        return g.get('request_id')
+    return None
+
+
+class DebugSampler(logging.Filter):
+    """Drop debug records except for the sampled fraction of requests"""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG:
+            return True
+        if has_request_context():
+            return g.get('sample_debug', False)
+        return random.random() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    """Render a record as a single JSON line"""
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': _current_request_id(),
+        }
+        # Structured fields passed as log.info('...', extra={'fields': {...}})
+        entry.update(getattr(record, 'fields', {}))
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(app):
+    """Install the queue-backed JSON handler and per-request hooks on the app"""
+    global _listener
+
+    level = os.environ.get('LOG_LEVEL', 'INFO').upper()
+    sample_rate = float(os.environ.get('LOG_DEBUG_SAMPLE_RATE', 0.01))
+
+    if _listener is None:
+        # Formatting happens on the request thread (it needs the request id),
+        # the actual write to stdout happens on the listener thread
+        records = queue.SimpleQueue()
+        queue_handler = QueueHandler(records)
+        queue_handler.setFormatter(JsonFormatter())
+        queue_handler.addFilter(DebugSampler(sample_rate))
+
+        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler.setFormatter(logging.Formatter('%(message)s'))
+
+        _listener = QueueListener(records, stream_handler)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+        log.addHandler(queue_handler)
+        log.propagate = False
+
+    log.setLevel(level)
+
+    @app.before_request
+    def start_request_log():
+        g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+        g.sample_debug = random.random() < sample_rate
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def finish_request_log(response):
+        response.headers['X-Request-ID'] = g.get('request_id', '')
+        if log.isEnabledFor(logging.DEBUG):
+            elapsed_ms = (time.perf_counter() - g.get('request_started', time.perf_counter())) * 1000
+            log.debug('request finished', extra={'fields': {
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'duration_ms': round(elapsed_ms, 2),
+            }})
+        return response
@@ -0,0 +1,181 @@
+"""
+Versioned, resumable database migrations.
+
+Migrations live in migrations/ as NNNN_name.py modules and are applied in
+order. Each one defines DESCRIPTION and run(ctx), selects only documents that
+still need the change (so running it twice is harmless), and writes with
+batched bulk_write calls through ctx.
+
+Applied state is recorded in the migrations collection. A migration that
+stops partway keeps its last checkpoint there, and the next run resumes
+from it instead of starting over.
+
+    python migrate.py               # apply every pending migration
+    python migrate.py --status      # list migrations and their state
+    python migrate.py --dry-run     # report what would change without writing
+    python migrate.py --to 0002     # apply migrations up to and including 0002
+"""
+
+from datetime import datetime
+import importlib
+import os
+import re
+import sys
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+MIGRATION_BATCH_SIZE = int(os.environ.get('MIGRATION_BATCH_SIZE', 1000))
+# Per-document warnings printed before they are only counted
+MAX_WARNINGS = 20
+
+_MODULE_NAME = re.compile(r'^(\d{4})_\w+\.py$')
+
+
+class MigrationContext:
+    """Everything a migration's run() needs: the database, batching and checkpoints"""
+
+    def __init__(self, db, name, state, batch_size=MIGRATION_BATCH_SIZE, dry_run=False):
+        self.db = db
+        self.name = name
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.checkpoints = dict(state.get('checkpoints') or {})
+        self.stats = dict(state.get('stats') or {})
+        self._warnings = 0
+
+    def batches(self, collection, query, projection=None, key=None):
+        """
+        Yield the documents matching query in _id order, batch_size at a time.
+
+        The last _id of each batch is checkpointed under key (the collection
+        name by default) once the caller has processed the batch.
+        """
+        key = key or collection.name
+        last_id = self.checkpoints.get(key)
+        while True:
+            batch_query = query if last_id is None else {'$and': [query, {'_id': {'$gt': last_id}}]}
+            docs = list(collection.find(batch_query, projection).sort('_id', 1).limit(self.batch_size))
+            if not docs:
+                return
+
+            yield docs
+            last_id = docs[-1]['_id']
+            self.checkpoint(key, last_id)
+            if len(docs) < self.batch_size:
+                return
+
+    def checkpoint(self, key, value):
+        self.checkpoints[key] = value
+        if not self.dry_run:
+            self.db.migrations.update_one({'_id': self.name}, {'$set': {
+                'checkpoints': self.checkpoints,
+                'stats': self.stats,
+                'updated_at': datetime.utcnow()
+            }})
+
+    def bulk_write(self, collection, requests):
+        """Send write requests in one round trip - only counted on a dry run"""
+        if not requests:
+            return
+        if self.dry_run:
+            self.count(f'{collection.name} writes', len(requests))
+            return
+        result = collection.bulk_write(requests, ordered=False)
+        self.count(f'{collection.name} modified', result.modified_count + result.upserted_count)
+
+    def count(self, stat, n=1):
+        self.stats[stat] = self.stats.get(stat, 0) + n
+
+    def warn(self, message):
+        self.count('warnings')
+        self._warnings += 1
+        if self._warnings <= MAX_WARNINGS:
+            print(f"  ⚠ {message}")
+        elif self._warnings == MAX_WARNINGS + 1:
+            print("  ⚠ ...further warnings are only counted")
+
+
+def discover_migrations():
+    """(version, name, module) for every migration module, in version order"""
+    found = []
+    for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+        match = _MODULE_NAME.match(filename)
+        if match:
+            name = filename[:-3]
+            found.append((match.group(1), name, importlib.import_module(f'migrations.{name}')))
+    return found
+
+
+def migration_status(db):
+    """(name, state dict or None) for every known migration"""
+    applied = {doc['_id']: doc for doc in db.migrations.find()}
+    return [(name, applied.get(name)) for _, name, _ in discover_migrations()]
+
+
+def run_migrations(db, target=None, dry_run=False, batch_size=MIGRATION_BATCH_SIZE):
+    """Apply pending migrations in order - returns the names that ran"""
+    applied = {doc['_id']: doc for doc in db.migrations.find()}
+    ran = []
+
+    for version, name, module in discover_migrations():
+        if target and version > target:
+            break
+        state = applied.get(name) or {}
+        if state.get('status') == 'applied':
+            continue
+
+        label = f"→ {name}: {module.DESCRIPTION}"
+        if state.get('checkpoints'):
+            label += ' (resuming)'
+        print(label + (' [dry run]' if dry_run else ''))
+        if not dry_run:
+            db.migrations.update_one(
+                {'_id': name},
+                {'$set': {'status': 'running'}, '$setOnInsert': {'started_at': datetime.utcnow()}},
+                upsert=True
+            )
+
+        ctx = MigrationContext(db, name, state, batch_size, dry_run)
+        module.run(ctx)
+
+        if not dry_run:
+            db.migrations.update_one({'_id': name}, {
+                '$set': {'status': 'applied', 'stats': ctx.stats, 'applied_at': datetime.utcnow()},
+                '$unset': {'checkpoints': ''}
+            })
+        for stat, value in sorted(ctx.stats.items()):
+            print(f"  {stat}: {value}")
+        ran.append(name)
+
+    return ran
+
+
+if __name__ == '__main__':
+    from pymongo import MongoClient
+    from dotenv import load_dotenv
+    import argparse
+
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description='Apply pending database migrations')
+    parser.add_argument('--status', action='store_true', help='list migrations and their state')
+    parser.add_argument('--dry-run', action='store_true', help='report what would change without writing')
+    parser.add_argument('--to', help='stop after this migration version, e.g. 0002')
+    parser.add_argument('--batch-size', type=int, default=MIGRATION_BATCH_SIZE)
+    args = parser.parse_args()
+
+    client = MongoClient(os.environ.get('MONGO_URI'))
+    db = client.get_database()
+
+    if args.status:
+        for name, state in migration_status(db):
+            print(f"{(state or {}).get('status', 'pending'):<8} {name}")
+        sys.exit(0)
+
+    try:
+        ran = run_migrations(db, args.to, args.dry_run, args.batch_size)
+    except Exception as e:
+        print(f"\n❌ Migration stopped: {e} - run again to resume from the last checkpoint")
+        sys.exit(1)
+
+    print(f"\n✓ {len(ran)} migration(s) {'checked' if args.dry_run else 'applied'}" if ran
+          else "\n✓ Nothing to migrate")
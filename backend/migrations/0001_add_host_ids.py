@@ -0,0 +1,35 @@
+"""
+Add host_id to events that don't have it, matching the host name
+("FirstName LastName") to a user.
+"""
+
+from pymongo import UpdateOne
+
+DESCRIPTION = 'Add host_id to events by matching the host name to a user'
+
+
+def run(ctx):
+    db = ctx.db
+
+    # One pass over users builds the name -> id map, so no event needs its own lookup
+    users_by_name = {}
+    for user in db.users.find({}, {'first_name': 1, 'last_name': 1}):
+        users_by_name.setdefault((user.get('first_name'), user.get('last_name')), str(user['_id']))
+
+    for events in ctx.batches(db.events, {'host_id': {'$in': [None, '']}}, {'host': 1, 'title': 1}):
+        updates = []
+        for event in events:
+            host_name = (event.get('host') or '').strip()
+            name_parts = host_name.split(' ', 1)
+            if len(name_parts) != 2:
+                ctx.warn(f"Could not parse host name: {host_name!r} (event: {event.get('title')})")
+                continue
+
+            user_id = users_by_name.get(tuple(name_parts))
+            if not user_id:
+                ctx.warn(f"No user found for host name: {host_name} (event: {event.get('title')})")
+                continue
+
+            updates.append(UpdateOne({'_id': event['_id']}, {'$set': {'host_id': user_id}}))
+
+        ctx.bulk_write(db.events, updates)
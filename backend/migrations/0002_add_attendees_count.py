@@ -0,0 +1,20 @@
+"""
+Add the attendees_count counter to events that don't have it, computed from
+each event's registered_users array.
+"""
+
+DESCRIPTION = 'Backfill attendees_count from registered_users'
+
+
+def run(ctx):
+    query = {'attendees_count': {'$exists': False}}
+    if ctx.dry_run:
+        ctx.count('events writes', ctx.db.events.count_documents(query))
+        return
+
+    # Single pipeline update - no documents are shipped to the client
+    result = ctx.db.events.update_many(
+        query,
+        [{'$set': {'attendees_count': {'$size': {'$ifNull': ['$registered_users', []]}}}}]
+    )
+    ctx.count('events modified', result.modified_count)
@@ -0,0 +1,44 @@
+"""
+Move RSVPs out of the embedded registered_users array into the rsvps
+collection. Each event's attendees_count is set from its array and the array
+is removed once its RSVPs have been written.
+"""
+
+from datetime import datetime
+from pymongo import UpdateOne
+
+from indexes import ensure_indexes
+
+DESCRIPTION = 'Move registered_users arrays into the rsvps collection'
+
+
+def run(ctx):
+    db = ctx.db
+    if not ctx.dry_run:
+        # The unique (event_id, user_id) index makes the upserts below safe to repeat
+        ensure_indexes(db)
+
+    query = {'registered_users': {'$exists': True}}
+    for events in ctx.batches(db.events, query, {'registered_users': 1, 'date': 1}):
+        now = datetime.utcnow()
+        rsvps = []
+        counts = []
+        for event in events:
+            # Drop duplicates the old read-check-push code may have let in
+            user_ids = list(dict.fromkeys(str(uid) for uid in event.get('registered_users', [])))
+            rsvps.extend(
+                UpdateOne(
+                    {'event_id': event['_id'], 'user_id': user_id},
+                    {'$setOnInsert': {'date': event.get('date'), 'created_at': now}},
+                    upsert=True
+                )
+                for user_id in user_ids
+            )
+            counts.append(UpdateOne(
+                {'_id': event['_id']},
+                {'$set': {'attendees_count': len(user_ids)}, '$unset': {'registered_users': ''}}
+            ))
+
+        # RSVPs first - the array is only dropped once they exist
+        ctx.bulk_write(db.rsvps, rsvps)
+        ctx.bulk_write(db.events, counts)
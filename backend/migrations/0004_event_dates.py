@@ -0,0 +1,50 @@
+"""
+Convert event dates and start/end times from strings to BSON datetimes (see
+dates.py), update the date copied onto each event's RSVPs, and replace the
+school_newest index with school_newest_date.
+"""
+
+from pymongo import UpdateMany, UpdateOne
+from pymongo.errors import OperationFailure
+
+from dates import normalize_schedule
+from indexes import ensure_indexes
+
+DESCRIPTION = 'Store event dates and start/end times as datetimes'
+
+
+def run(ctx):
+    db = ctx.db
+    query = {'$or': [
+        {'date': {'$type': 'string'}},
+        {'start_time': {'$type': 'string'}},
+        {'end_time': {'$type': 'string'}}
+    ]}
+
+    projection = {'date': 1, 'time': 1, 'start_time': 1, 'end_time': 1, 'title': 1}
+    for events in ctx.batches(db.events, query, projection):
+        event_updates = []
+        rsvp_updates = []
+        for event in events:
+            try:
+                schedule = normalize_schedule(event.get('date'), event.get('start_time'),
+                                              event.get('end_time'), event.get('time'))
+            except ValueError as e:
+                ctx.warn(f"Event '{event.get('title')}' ({event['_id']}): {e}")
+                continue
+
+            event_updates.append(UpdateOne({'_id': event['_id']}, {'$set': schedule}))
+            rsvp_updates.append(UpdateMany({'event_id': event['_id']}, {'$set': {'date': schedule['date']}}))
+
+        ctx.bulk_write(db.events, event_updates)
+        ctx.bulk_write(db.rsvps, rsvp_updates)
+
+    if ctx.dry_run:
+        return
+
+    # school_newest_date supersedes school_newest for the date-filtered listing
+    try:
+        db.events.drop_index('school_newest')
+    except OperationFailure:
+        pass
+    ensure_indexes(db)
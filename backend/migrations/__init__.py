@@ -0,0 +1,5 @@
+"""
+Database migrations, applied in order by migrate.py.
+
+Each NNNN_name.py module defines DESCRIPTION and run(ctx) - see migrate.py.
+"""
@@ -0,0 +1,114 @@
+"""
+Keyset (cursor-based) pagination helpers for event listings.
+
+A cursor records the sort key and _id of the last document on a page, so the
+next page is fetched with an indexed range query instead of skip/limit.
+"""
+
+from bson import json_util
+import base64
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(values):
+    """Turn the last document's sort values into an opaque string"""
+    raw = json_util.dumps(values).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor - raises ValueError on a malformed cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii'))
+        values = json_util.loads(raw.decode('utf-8'))
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+    if not isinstance(values, list) or len(values) != 2:
+        raise ValueError('Invalid cursor')
+    return values
+
+
+def parse_page_args(args):
+    """Read the cursor and limit query parameters - raises ValueError if invalid"""
+    cursor = args.get('cursor')
+    after = decode_cursor(cursor) if cursor else None
+
+    try:
+        limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ValueError('limit must be an integer')
+    if limit < 1:
+        raise ValueError('limit must be positive')
+
+    return after, min(limit, MAX_PAGE_SIZE)
+
+
+def fetch_page(collection, query, sort_field, direction, after=None, limit=DEFAULT_PAGE_SIZE,
+               projection=None):
+    """
+    Fetch one page of documents ordered by (sort_field, _id).
+
+    Returns the documents and the cursor for the next page (None on the last page).
+    """
+    op = '$gt' if direction == 1 else '$lt'
+
+    if after is not None:
+        last_value, last_id = after
+        if sort_field == '_id':
+            keyset = {'_id': {op: last_id}}
+        else:
+            keyset = {'$or': [
+                {sort_field: {op: last_value}},
+                {sort_field: last_value, '_id': {op: last_id}}
+            ]}
+        query = {'$and': [query, keyset]}
+
+    sort = [(sort_field, direction)]
+    if sort_field != '_id':
+        sort.append(('_id', direction))
+
+    # Fetch one extra document to find out whether there is another page
+    docs = list(collection.find(query, projection).sort(sort).limit(limit + 1))
+
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        last = docs[-1]
+        next_cursor = encode_cursor([last.get(sort_field), last['_id']])
+
+    return docs, next_cursor
+
+
+def rank_offset(after):
+    """Position in a ranking that a decoded cursor points at - raises ValueError if it isn't a ranking cursor"""
+    if after is None:
+        return 0
+    marker, offset = after
+    if marker != 'rank' or not isinstance(offset, int) or offset < 0:
+        raise ValueError('Invalid cursor')
+    return offset
+
+
+def fetch_ranked_page(collection, ranked_ids, after=None, limit=DEFAULT_PAGE_SIZE, projection=None,
+                      more=False):
+    """
+    Fetch one page of a precomputed ranking (a list of _ids, best first).
+
+    The cursor holds the offset into the ranking. Returns the documents in
+    rank order and the cursor for the next page (None on the last page).
+    With more=True the ranking goes on past ranked_ids, so the page that
+    reaches their end still gets a cursor.
+    """
+    offset = rank_offset(after)
+    page_ids = ranked_ids[offset:offset + limit]
+    docs_by_id = {doc['_id']: doc for doc in collection.find({'_id': {'$in': page_ids}}, projection)}
+    docs = [docs_by_id[doc_id] for doc_id in page_ids if doc_id in docs_by_id]
+
+    next_cursor = None
+    if more or offset + limit < len(ranked_ids):
+        next_cursor = encode_cursor(['rank', offset + limit])
+
+    return docs, next_cursor
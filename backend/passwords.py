@@ -0,0 +1,104 @@
+"""
+Password hashing off the request threads, with login throttling.
+
+Werkzeug's KDFs are deliberately slow, so hashes are computed on a small
+process pool rather than on the thread serving the request. At most
+PASSWORD_HASH_MAX_PENDING operations are queued per worker process; past
+that, callers wait up to PASSWORD_HASH_WAIT seconds and then get HashingBusy,
+so a login burst can only queue a bounded amount of CPU work.
+
+PASSWORD_HASH_METHOD sets the cost parameters (any Werkzeug method string,
+e.g. 'scrypt:32768:8:1' or 'pbkdf2:sha256:600000'). Hashes stored with other
+parameters are upgraded on the user's next successful login.
+
+Password attempts are throttled per IP address and per email (see throttle.py)
+before any hashing happens.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from threading import BoundedSemaphore, Lock
+from werkzeug.security import check_password_hash, generate_password_hash
+import multiprocessing
+import os
+
+from throttle import Throttle
+
+PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 1))
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', PASSWORD_HASH_WORKERS * 8))
+PASSWORD_HASH_WAIT = float(os.environ.get('PASSWORD_HASH_WAIT', 2))
+
+# Attempts (login or signup) per client IP address
+ip_throttle = Throttle(
+    burst=int(os.environ.get('LOGIN_IP_BURST', 20)),
+    per_minute=float(os.environ.get('LOGIN_IP_PER_MINUTE', 10))
+)
+# Login attempts per account, wherever they come from
+email_throttle = Throttle(
+    burst=int(os.environ.get('LOGIN_EMAIL_BURST', 5)),
+    per_minute=float(os.environ.get('LOGIN_EMAIL_PER_MINUTE', 2))
+)
+
+
+class HashingBusy(Exception):
+    """Raised when the hashing queue stays full for PASSWORD_HASH_WAIT seconds"""
+
+
+_pool = None
+_pool_lock = Lock()
+_slots = BoundedSemaphore(PASSWORD_HASH_MAX_PENDING)
+_method_prefix = None
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawn rather than fork - this process holds MongoClient and logging threads
+            _pool = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS,
+                                        mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+
+def _run(fn, *args):
+    if not _slots.acquire(timeout=PASSWORD_HASH_WAIT):
+        raise HashingBusy('Too many password operations in progress')
+    try:
+        return _get_pool().submit(fn, *args).result()
+    finally:
+        _slots.release()
+
+
+def hash_password(password):
+    return _run(generate_password_hash, password, PASSWORD_HASH_METHOD)
+
+
+def needs_rehash(stored_hash):
+    """True if a stored hash wasn't made with the current PASSWORD_HASH_METHOD"""
+    global _method_prefix
+    if _method_prefix is None:
+        # Werkzeug fills in defaults ('scrypt' -> 'scrypt:32768:8:1'), so compare
+        # against the prefix it actually writes
+        _method_prefix = hash_password('').split('$', 1)[0]
+    return stored_hash.split('$', 1)[0] != _method_prefix
+
+
+def verify_password(stored_hash, password):
+    """Check a password against its stored hash - returns (matches, needs_rehash)"""
+    matches = _run(check_password_hash, stored_hash, password)
+    return matches, matches and needs_rehash(stored_hash)
+
+
+def throttle_enabled():
+    # Read on every call, so a benchmark can switch it off after this module is imported
+    return os.environ.get('LOGIN_THROTTLE', 'true').lower() != 'false'
+
+
+def throttle_attempt(ip, email=None):
+    """Take a token for the client IP (and email) - returns seconds to wait, or 0 if allowed"""
+    if not throttle_enabled():
+        return 0
+    retry_after = ip_throttle.hit(ip or 'unknown')
+    if email:
+        retry_after = max(retry_after, email_throttle.hit(email.strip().lower()))
+    return retry_after
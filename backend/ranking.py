@@ -0,0 +1,291 @@
+"""
+Personalized feed ranking for the Home page.
+
+Candidate events are scored in batches on interest match, recency, how soon
+they happen and popularity; events the user isn't eligible for (school year
+or gender restrictions) are dropped. Each user's top-K is cached. New or
+edited events are scored against the cached feeds of their school in place,
+and a user's feed is dropped when their interests change. Past events, and
+pages past the top-K, are ranked directly by rank_events().
+
+Feeds remember the school's feed version counter (see etags.py) they reflect:
+writes that change which events are in the school's feeds (create, edit,
+import) bump it. A feed that has missed such a write made by another worker
+process is rebuilt instead of being served. RSVPs only move the popularity
+signal, so they leave cached feeds alone until the feed expires
+(FEED_CACHE_TTL) rather than costing every worker a rebuild.
+"""
+
+from datetime import datetime
+from itertools import islice
+from threading import Lock
+import heapq
+import math
+import os
+
+from cache import TTLCache
+from dates import event_now, start_of_today
+
+FEED_SIZE = int(os.environ.get('FEED_SIZE', 200))
+FEED_CACHE_TTL = int(os.environ.get('FEED_CACHE_TTL', 600))
+MAX_CANDIDATES = 2000
+BATCH_SIZE = 500
+
+WEIGHTS = {
+    'interest': 3.0,
+    'recency': 1.0,
+    'proximity': 2.0,
+    'popularity': 1.0,
+}
+
+# Days over which the recency and proximity signals decay by a factor of e
+RECENCY_SCALE_DAYS = 14.0
+PROXIMITY_SCALE_DAYS = 14.0
+# Attendee count at which the popularity signal saturates
+POPULARITY_CAP = 200
+
+CANDIDATE_FIELDS = {'category': 1, 'date': 1, 'school_years': 1, 'genders': 1, 'attendees_count': 1}
+
+# (user_id, interests_only) -> feed dict (see build_feed)
+feed_cache = TTLCache(maxsize=10000, ttl=FEED_CACHE_TTL)
+# school -> keys of its feeds that may be cached, so a write only visits its own school
+_school_feeds = {}
+_feed_lock = Lock()
+
+
+def _allowed(restriction, value):
+    """Restrictions are 'All' or a comma separated list such as 'Freshman, Junior'"""
+    if not restriction:
+        return True
+    options = [option.strip() for option in str(restriction).split(',')]
+    return 'All' in options or value in options
+
+
+def _profile(user):
+    return {
+        'interests': frozenset(user.get('interests') or []),
+        'grade_level': user.get('grade_level'),
+        'gender': user.get('gender'),
+    }
+
+
+def score_batch(events, profile, now):
+    """Score a batch of candidate events - ineligible events get None"""
+    interests = profile['interests']
+    popularity_norm = math.log1p(POPULARITY_CAP)
+
+    # Build each signal as a column over the whole batch, then combine
+    eligible = [
+        _allowed(e.get('school_years'), profile['grade_level']) and _allowed(e.get('genders'), profile['gender'])
+        for e in events
+    ]
+    interest = [1.0 if e.get('category') in interests else 0.0 for e in events]
+    ages = [(now - e['_id'].generation_time.replace(tzinfo=None)).total_seconds() / 86400 for e in events]
+    recency = [math.exp(-max(age, 0.0) / RECENCY_SCALE_DAYS) for age in ages]
+    # Event dates are campus wall-clock times, unlike the UTC creation times above
+    local_now = event_now()
+    dates = [e.get('date') for e in events]
+    proximity = [
+        math.exp(-max((d - local_now).total_seconds() / 86400, 0.0) / PROXIMITY_SCALE_DAYS)
+        if isinstance(d, datetime) else 0.0
+        for d in dates
+    ]
+    popularity = [min(math.log1p(e.get('attendees_count', 0)) / popularity_norm, 1.0) for e in events]
+
+    return [
+        (WEIGHTS['interest'] * i + WEIGHTS['recency'] * r + WEIGHTS['proximity'] * p + WEIGHTS['popularity'] * c)
+        if ok else None
+        for ok, i, r, p, c in zip(eligible, interest, recency, proximity, popularity)
+    ]
+
+
+def candidate_query(user, interests_only=True):
+    query = {
+        'school': user.get('school'),
+        'host_id': {'$ne': str(user['_id'])},
+        'date': {'$gte': start_of_today()}
+    }
+    interests = user.get('interests') or []
+    if interests_only and interests:
+        query['category'] = {'$in': interests}
+    return query
+
+
+def build_feed(db, user, interests_only=True, feed_version=None):
+    """Score every candidate event for a user and keep the top FEED_SIZE"""
+    profile = _profile(user)
+    now = datetime.utcnow()
+    cursor = db.events.find(candidate_query(user, interests_only), CANDIDATE_FIELDS) \
+        .sort('date', 1).limit(MAX_CANDIDATES)
+
+    top = []
+    batch = []
+    for event in cursor:
+        batch.append(event)
+        if len(batch) == BATCH_SIZE:
+            _merge_top(top, batch, profile, now)
+            batch = []
+    if batch:
+        _merge_top(top, batch, profile, now)
+
+    return {
+        'school': user.get('school'),
+        'user_id': str(user['_id']),
+        'interests_only': interests_only,
+        'profile': profile,
+        'version': feed_version,
+        'items': sorted(top, reverse=True),
+    }
+
+
+def rank_events(db, user, date_range, interests_only=True):
+    """
+    Ranked (score, event_id) pairs for events in a date range, best first, without the cache.
+
+    For what a cached feed can't answer: past events, and ranks below the
+    top FEED_SIZE. Scores at most MAX_CANDIDATES events.
+    """
+    profile = _profile(user)
+    now = datetime.utcnow()
+    query = dict(candidate_query(user, interests_only), date=date_range)
+    events = list(db.events.find(query, CANDIDATE_FIELDS).sort('date', 1).limit(MAX_CANDIDATES))
+
+    items = []
+    for start in range(0, len(events), BATCH_SIZE):
+        batch = events[start:start + BATCH_SIZE]
+        items.extend((score, event['_id']) for event, score in zip(batch, score_batch(batch, profile, now))
+                     if score is not None)
+    items.sort(reverse=True)
+    return items
+
+
+def _merge_top(top, batch, profile, now):
+    """Push a scored batch into a bounded min-heap of (score, event_id)"""
+    for event, score in zip(batch, score_batch(batch, profile, now)):
+        if score is None:
+            continue
+        item = (score, event['_id'])
+        if len(top) < FEED_SIZE:
+            heapq.heappush(top, item)
+        elif item > top[0]:
+            heapq.heapreplace(top, item)
+
+
+def get_feed(db, user, interests_only=True, feed_version=None):
+    """Ranked (score, event_id) pairs for the user, best first"""
+    key = (str(user['_id']), interests_only)
+    feed = feed_cache.get(key)
+    stale = feed is None or feed['profile'] != _profile(user) or (
+        feed_version is not None and feed['version'] != feed_version
+    )
+    if stale:
+        feed = build_feed(db, user, interests_only, feed_version)
+        with _feed_lock:
+            feed_cache.set(key, feed)
+            _school_feeds.setdefault(feed['school'], set()).add(key)
+    return feed['items']
+
+
+def ranked_event_ids(db, user, date_range, narrowed=False, offset=0, limit=50, feed_version=None):
+    """
+    The interests ranking a page at offset is cut from: (event ids best first, more).
+
+    The cached feed holds only upcoming events, and only the top FEED_SIZE of
+    them. Past events, a narrowed window on a full feed and pages beyond a
+    full feed are ranked directly by rank_events(). more is True when the
+    ids are a full feed, which carries on in rank_events() past its end.
+    """
+    if date_range.get('$gte') is None or date_range['$gte'] < start_of_today():
+        return [event_id for _, event_id in rank_events(db, user, date_range)], False
+
+    feed = get_feed(db, user, True, feed_version)
+    feed_full = len(feed) >= FEED_SIZE
+    if feed_full and (narrowed or offset + limit > len(feed)):
+        return [event_id for _, event_id in rank_events(db, user, date_range)], False
+
+    ranked_ids = [event_id for _, event_id in feed]
+    if narrowed:
+        # Narrow the feed to the requested window
+        in_range = set(db.events.distinct('_id', {'_id': {'$in': ranked_ids}, 'date': date_range}))
+        ranked_ids = [event_id for event_id in ranked_ids if event_id in in_range]
+    return ranked_ids, feed_full
+
+
+def invalidate_feed(user_id):
+    """Drop a user's cached feeds, e.g. after their interests change"""
+    for interests_only in (True, False):
+        feed_cache.delete((str(user_id), interests_only))
+
+
+def refresh_event(event, feed_version):
+    """
+    Rescore one new or edited event in every cached feed of its school.
+
+    feed_version is the school's feed counter after this write; feeds that were
+    not at the version right before it have missed other writes and are dropped.
+    """
+    refresh_events([event], feed_version)
+
+
+def _rescored_items(feed, events, event_ids, scores_by_profile, now, today):
+    """A feed's items with the events' old positions replaced by their new scores"""
+    items = [item for item in feed['items'] if item[1] not in event_ids]
+    qualifying = [
+        event for event in events
+        if event.get('host_id') != feed['user_id']
+        and isinstance(event.get('date'), datetime) and event['date'] >= today
+        and (not feed['interests_only'] or not feed['profile']['interests']
+             or event.get('category') in feed['profile']['interests'])
+    ]
+    if not qualifying:
+        return items
+
+    # Feeds of users with the same interests, year and gender score an event the same
+    profile = feed['profile']
+    profile_key = (profile['interests'], profile['grade_level'], profile['gender'])
+    if profile_key not in scores_by_profile:
+        scores_by_profile[profile_key] = dict(zip((event['_id'] for event in events),
+                                                  score_batch(events, profile, now)))
+    scores = scores_by_profile[profile_key]
+    new_items = sorted(((scores[event['_id']], event['_id']) for event in qualifying
+                        if scores[event['_id']] is not None), reverse=True)
+    # Both lists are already ranked, so a merge replaces a full re-sort
+    return list(islice(heapq.merge(items, new_items, reverse=True), FEED_SIZE))
+
+
+def refresh_events(events, feed_version):
+    """
+    Rescore a batch of events of one school written under a single feed version bump.
+
+    Only the school's own feeds are visited, and the scoring runs outside the
+    lock, which is held just to swap each rescored feed in.
+    """
+    if not events:
+        return
+    now = datetime.utcnow()
+    today = start_of_today()
+    school = events[0].get('school')
+    event_ids = {event['_id'] for event in events}
+
+    with _feed_lock:
+        keys = list(_school_feeds.get(school, ()))
+
+    scores_by_profile = {}
+    for key in keys:
+        feed = feed_cache.get(key)
+        if feed is None or feed['school'] != school:
+            # Expired or evicted, or rebuilt after the user changed school
+            with _feed_lock:
+                _school_feeds.get(school, set()).discard(key)
+            continue
+        if feed['version'] != feed_version - 1:
+            feed_cache.delete(key)
+            continue
+
+        items = _rescored_items(feed, events, event_ids, scores_by_profile, now, today)
+        with _feed_lock:
+            # Another write got to this feed first - it can no longer be patched, so rebuild it later
+            if feed_cache.get(key) is not feed:
+                feed_cache.delete(key)
+                continue
+            feed_cache.replace(key, dict(feed, items=items, version=feed_version))
@@ -0,0 +1,74 @@
+"""
+RSVP storage.
+
+RSVPs live in their own collection, one document per (event, user), instead
+of an array embedded in the event. A unique index on (event_id, user_id)
+makes registering idempotent under concurrent requests, and the event keeps
+only an attendees_count counter.
+"""
+
+from datetime import datetime
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+
+def add_rsvp(db, event_id, user_id, event_date=None):
+    """Register a user for an event - returns False if they were already registered"""
+    try:
+        db.rsvps.insert_one({
+            'event_id': event_id,
+            'user_id': user_id,
+            'date': event_date,
+            'created_at': datetime.utcnow()
+        })
+    except DuplicateKeyError:
+        return False
+    return True
+
+
+def add_host_rsvps(db, events):
+    """Register each event's host for it in one round trip - the bulk form of add_rsvp"""
+    if not events:
+        return
+    now = datetime.utcnow()
+    try:
+        db.rsvps.insert_many([
+            {'event_id': event['_id'], 'user_id': event['host_id'], 'date': event['date'], 'created_at': now}
+            for event in events
+        ], ordered=False)
+    except BulkWriteError as e:
+        # Already registered is fine; anything else is a real failure
+        if any(error['code'] != 11000 for error in e.details.get('writeErrors', [])):
+            raise
+
+
+def remove_rsvp(db, event_id, user_id):
+    """Cancel a registration - returns False if the user wasn't registered"""
+    result = db.rsvps.delete_one({'event_id': event_id, 'user_id': user_id})
+    return result.deleted_count == 1
+
+
+def has_rsvp(db, event_id, user_id):
+    return db.rsvps.find_one({'event_id': event_id, 'user_id': user_id}, {'_id': 1}) is not None
+
+
+def rsvped_event_ids(db, user_id, event_ids):
+    """The subset of event_ids the user is registered for, in one query"""
+    cursor = db.rsvps.find(
+        {'user_id': user_id, 'event_id': {'$in': list(event_ids)}},
+        {'event_id': 1, '_id': 0}
+    )
+    return {rsvp['event_id'] for rsvp in cursor}
+
+
+def attending_event_ids(db, user_id, date_range=None):
+    """Ids of the events the user is registered for (optionally within a date range), by event date"""
+    query = {'user_id': user_id}
+    if date_range:
+        query['date'] = date_range
+    cursor = db.rsvps.find(query, {'event_id': 1, '_id': 0}).sort('date', 1)
+    return [rsvp['event_id'] for rsvp in cursor]
+
+
+def update_rsvp_dates(db, event_id, event_date):
+    """Keep the denormalized event date on RSVPs in sync after an event is edited"""
+    db.rsvps.update_many({'event_id': event_id}, {'$set': {'date': event_date}})
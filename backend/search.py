@@ -0,0 +1,33 @@
+"""
+Full-text event search.
+
+Searches go through the school_text index (see indexes.py), a MongoDB text
+index over title, description, location and host name prefixed by school, so
+a search only ever touches the matching events at the user's school.
+"""
+
+MAX_QUERY_LENGTH = 200
+# Results past this rank aren't worth paging to
+MAX_SEARCH_RESULTS = 500
+
+
+def parse_search_query(args):
+    """Read the q query parameter - raises ValueError if missing or too long"""
+    text = (args.get('q') or '').strip()
+    if not text:
+        raise ValueError('Search query is required')
+    if len(text) > MAX_QUERY_LENGTH:
+        raise ValueError(f'Search query must be at most {MAX_QUERY_LENGTH} characters')
+    return text
+
+
+def search_event_ids(db, school, text, date_range=None):
+    """Ids of the events at a school matching the search text, most relevant first"""
+    query = {'school': school, '$text': {'$search': text}}
+    if date_range:
+        query['date'] = date_range
+    cursor = db.events.find(
+        query,
+        {'_id': 1, 'score': {'$meta': 'textScore'}}
+    ).sort([('score', {'$meta': 'textScore'}), ('_id', -1)]).limit(MAX_SEARCH_RESULTS)
+    return [event['_id'] for event in cursor]
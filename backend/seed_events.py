@@ -3,14 +3,10 @@ from datetime import datetime, timedelta
 import os
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+from dates import normalize_schedule
 
-# Connect to MongoDB
-client = MongoClient(os.environ.get('MONGO_URI'))
-db = client.get_database()
-
-# Sample events data
+# Sample events data - synthetic_data.py imports these too, so importing this
+# module must not connect to anything
 test_events = [
     # Sports Events
     {
@@ -307,6 +303,11 @@ test_events = [
 ]
 
 def seed_events():
+    # Load environment variables and connect to MongoDB
+    load_dotenv()
+    client = MongoClient(os.environ.get('MONGO_URI'))
+    db = client.get_database()
+
     try:
         # Get all users to assign events to
         all_users = list(db.users.find())
@@ -320,22 +321,33 @@ def seed_events():
         # Clear existing events (optional - remove if you want to keep existing data)
         print("Clearing existing events...")
         db.events.delete_many({})
+        db.rsvps.delete_many({})
 
-        # Add registered_users field to some events if we have users
-        if user_ids:
-            # Register all users to first 8 events (mix of categories)
-            for i in range(min(8, len(test_events))):
-                test_events[i]['registered_users'] = user_ids
-
-        # Add empty registered_users array to events without it
-        for event in test_events:
-            if 'registered_users' not in event:
-                event['registered_users'] = []
+        # Register all users to first 8 events (mix of categories)
+        registered_count = min(8, len(test_events)) if user_ids else 0
+        for i, event in enumerate(test_events):
+            event['attendees_count'] = len(user_ids) if i < registered_count else 0
+            # Store the date and start/end times as datetimes
+            event.update(normalize_schedule(event['date'], time_text=event['time']))
 
         # Insert test events
         print(f"Inserting {len(test_events)} test events...")
         result = db.events.insert_many(test_events)
 
+        # RSVPs live in their own collection
+        rsvps = [
+            {
+                'event_id': event_id,
+                'user_id': user_id,
+                'date': test_events[i]['date'],
+                'created_at': datetime.utcnow()
+            }
+            for i, event_id in enumerate(result.inserted_ids[:registered_count])
+            for user_id in user_ids
+        ]
+        if rsvps:
+            db.rsvps.insert_many(rsvps)
+
         print(f"✓ Successfully inserted {len(result.inserted_ids)} events!")
 
         # Print summary by category
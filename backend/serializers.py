@@ -0,0 +1,66 @@
+"""
+Event serialization.
+
+Each named view lists the fields a response needs and comes with a matching
+MongoDB projection, so only those fields are read from the database:
+
+    card          event grids and lists (description shortened server-side, with
+                  description_truncated saying whether it was)
+    detail        a single event page
+    host-profile  events listed on someone's profile
+"""
+
+from datetime import datetime
+
+# Grid cards only show a preview of the description
+CARD_DESCRIPTION_LENGTH = 140
+
+_CARD_FIELDS = ['title', 'description', 'date', 'time', 'location', 'category', 'image',
+                'host', 'host_id', 'school', 'attendees_count', 'capacity']
+
+EVENT_VIEWS = {
+    'card': _CARD_FIELDS + ['description_truncated'],
+    'detail': _CARD_FIELDS + ['start_time', 'end_time', 'school_years', 'genders'],
+    'host-profile': ['title', 'date', 'time', 'location', 'category', 'image', 'attendees_count'],
+}
+
+FIELD_DEFAULTS = {
+    'school_years': 'All',
+    'genders': 'All',
+    'attendees_count': 0,
+    'description_truncated': False,
+}
+
+
+def _build_projection(view):
+    projection = {field: 1 for field in EVENT_VIEWS[view]}
+    if view == 'card':
+        # Truncate inside the database so long descriptions never cross the wire
+        projection['description'] = {
+            '$substrCP': [{'$ifNull': ['$description', '']}, 0, CARD_DESCRIPTION_LENGTH]
+        }
+        # Counted in code points like $substrCP, so clients needn't guess from the length
+        projection['description_truncated'] = {
+            '$gt': [{'$strLenCP': {'$ifNull': ['$description', '']}}, CARD_DESCRIPTION_LENGTH]
+        }
+    return projection
+
+
+_PROJECTIONS = {view: _build_projection(view) for view in EVENT_VIEWS}
+
+
+def event_projection(view):
+    """MongoDB projection that fetches exactly the fields a view needs"""
+    return dict(_PROJECTIONS[view])
+
+
+def serialize_event(event, view, **extra):
+    """Build the JSON-ready dict for an event; extra keys are appended as-is"""
+    data = {'id': str(event['_id'])}
+    for field in EVENT_VIEWS[view]:
+        value = event.get(field, FIELD_DEFAULTS.get(field))
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        data[field] = value
+    data.update(extra)
+    return data
@@ -0,0 +1,315 @@
+"""
+Synthetic data for load tests and index experiments.
+
+Streams users, events and RSVPs for any number of schools into MongoDB with
+batched inserts. At most one batch of each is held in memory, so millions of
+documents can be generated on a laptop. The data is skewed the way real
+usage is:
+
+- school sizes follow a Zipf distribution: a few large campuses and a long tail
+- categories are weighted (CATEGORY_WEIGHTS), and users' interests follow the weights
+- a few heavy-hitter hosts run most of a school's events
+- attendance is heavy-tailed: most events draw a handful of RSVPs, a few draw hundreds
+
+Events are built from the hand-written templates in seed_events.py. All
+randomness, including document _ids, comes from --seed, so the same
+arguments on the same day produce the same database. Dates are relative
+to today.
+
+    python synthetic_data.py                                   # 3 small schools
+    python synthetic_data.py --schools 50 --users 20000 --events 5000 --rsvps 15
+
+The target database's users, events and RSVPs (and their archives) are
+dropped first, and the indexes are built once the data is loaded. Restart
+any running server afterwards, because its caches still hold the old data.
+"""
+
+from bson.objectid import ObjectId
+from datetime import timedelta
+from math import gcd
+import calendar
+import os
+import random
+import struct
+import sys
+import time
+
+from dates import normalize_schedule, start_of_today
+from seed_events import test_events
+
+GENERATE_BATCH_SIZE = int(os.environ.get('GENERATE_BATCH_SIZE', 5000))
+
+# Relative share of events per category
+CATEGORY_WEIGHTS = {
+    'Sports': 22,
+    'Music': 18,
+    'Gaming': 12,
+    'Technology': 11,
+    'Art': 10,
+    'Cooking': 9,
+    'Science': 7,
+    'Travel': 6,
+    'Reading': 5,
+}
+
+FIRST_NAMES = ['Alex', 'Sam', 'Jordan', 'Taylor', 'Morgan', 'Casey', 'Riley', 'Jamie', 'Avery', 'Quinn',
+               'Maya', 'Noah', 'Liam', 'Emma', 'Olivia', 'Ethan', 'Sofia', 'Lucas', 'Aria', 'Mateo']
+LAST_NAMES = ['Smith', 'Garcia', 'Nguyen', 'Johnson', 'Patel', 'Kim', 'Brown', 'Lopez', 'Chen', 'Davis',
+              'Martinez', 'Wilson', 'Khan', 'Anderson', 'Silva', 'Thomas', 'Moore', 'Lee', 'Clark', 'Walker']
+
+# Id prefixes, so users and events of every school get distinct, reproducible _ids
+_USER, _EVENT = 1, 2
+
+
+def _object_id(kind, school_index, index, created_at):
+    """A deterministic ObjectId whose timestamp is created_at, like one the driver would make"""
+    timestamp = calendar.timegm(created_at.utctimetuple())
+    return ObjectId(struct.pack('>IBH', timestamp, kind, school_index) + index.to_bytes(5, 'big'))
+
+
+def _zipf_index(rng, n, skew):
+    """
+    Draw an index in [0, n) with P(i) roughly proportional to 1 / (i + 1) ** skew.
+
+    Uses the inverse CDF of the continuous approximation, so it needs no
+    per-index weight table however large n gets. A skew of 0 is uniform.
+    """
+    u = rng.random()
+    if skew == 1:
+        x = (n + 1) ** u
+    else:
+        x = (1 + u * ((n + 1) ** (1 - skew) - 1)) ** (1 / (1 - skew))
+    return min(int(x) - 1, n - 1)
+
+
+def _scatter(n, seed):
+    """A stride coprime to n - (rank * stride) % n spreads Zipf ranks over all n indexes"""
+    stride = (seed * 2654435761 + 1) % n or 1
+    while gcd(stride, n) != 1:
+        stride += 1
+    return stride
+
+
+def _school_sizes(total, num_schools, skew):
+    """Split total over the schools with Zipf weights - largest school first, each at least 1"""
+    weights = [1 / (rank + 1) ** skew for rank in range(num_schools)]
+    scale = total / sum(weights)
+    return [max(1, round(weight * scale)) for weight in weights]
+
+
+def _user_name(index):
+    first = FIRST_NAMES[index % len(FIRST_NAMES)]
+    last = LAST_NAMES[(index // len(FIRST_NAMES)) % len(LAST_NAMES)]
+    return first, last
+
+
+class _BatchWriter:
+    """Buffer documents for one collection and insert them batch_size at a time"""
+
+    def __init__(self, collection, batch_size):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.pending = []
+        self.written = 0
+
+    def add(self, doc):
+        self.pending.append(doc)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            self.collection.insert_many(self.pending, ordered=False)
+            self.written += len(self.pending)
+            self.pending = []
+
+
+def generate(db, num_schools=3, users_per_school=100, events_per_school=500, rsvps_per_event=20,
+             password='benchmark', seed=42, batch_size=GENERATE_BATCH_SIZE, school_skew=1.0,
+             host_skew=1.2, attendance_alpha=1.5, max_attendees=2000, past_days=60, future_days=120,
+             sample_size=1000):
+    """
+    Fill db with synthetic schools, users, events and RSVPs.
+
+    users_per_school, events_per_school and rsvps_per_event are averages:
+    schools are sized by a Zipf distribution with exponent school_skew,
+    hosts are picked with exponent host_skew, and per-event attendance
+    follows a Pareto distribution with shape attendance_alpha. Lower
+    values give heavier tails. Every user gets the same password so the
+    login route can be exercised.
+
+    Returns {school: {'user_ids': [...], 'event_ids': [...]}} with up to
+    sample_size ids of each per school, for driving requests.
+    """
+    from werkzeug.security import generate_password_hash
+    from indexes import ensure_indexes
+    from passwords import PASSWORD_HASH_METHOD
+
+    rng = random.Random(seed)
+    # Sampling has its own generator, so sample_size doesn't change the data
+    sample_rng = random.Random(seed + 1)
+    today = start_of_today()
+    # Hash once, with the server's parameters so logins don't trigger a rehash
+    hashed_password = generate_password_hash(password, PASSWORD_HASH_METHOD)
+
+    templates = {}
+    for template in test_events:
+        templates.setdefault(template['category'], []).append(template)
+    categories = [category for category in CATEGORY_WEIGHTS if category in templates]
+    category_weights = [CATEGORY_WEIGHTS[category] for category in categories]
+
+    for name in ('users', 'events', 'rsvps', 'events_archive', 'rsvps_archive'):
+        db[name].drop()
+
+    users = _BatchWriter(db.users, batch_size)
+    events = _BatchWriter(db.events, batch_size)
+    rsvps = _BatchWriter(db.rsvps, batch_size)
+
+    user_counts = _school_sizes(users_per_school * num_schools, num_schools, school_skew)
+    event_counts = _school_sizes(events_per_school * num_schools, num_schools, school_skew)
+    # Pareto draws have mean alpha / (alpha - 1); scale them to the requested mean (the host is one)
+    attendance_scale = max(rsvps_per_event - 1, 0) * (attendance_alpha - 1) / attendance_alpha
+
+    schools = {}
+    for school_index in range(num_schools):
+        school = f'school{school_index}'
+        num_users, num_events = user_counts[school_index], event_counts[school_index]
+        sample_users = set(sample_rng.sample(range(num_users), min(sample_size, num_users)))
+        sample_events = set(sample_rng.sample(range(num_events), min(sample_size, num_events)))
+        schools[school] = {'user_ids': [], 'event_ids': []}
+        school_rsvps = 0
+
+        # Users signed up evenly over the past year, so their _ids are computable from the index
+        signup_start = today - timedelta(days=365)
+        signup_step = timedelta(days=365) / num_users
+
+        def user_id(index):
+            return _object_id(_USER, school_index, index, signup_start + signup_step * index)
+
+        for index in range(num_users):
+            first, last = _user_name(index)
+            _id = user_id(index)
+            interests = set()
+            while len(interests) < 3:
+                interests.add(rng.choices(categories, category_weights)[0])
+            interests = sorted(interests)
+            users.add({
+                '_id': _id,
+                'first_name': first,
+                'last_name': last,
+                'email': f'{first}.{last}{index}@{school}.edu'.lower(),
+                'gender': rng.choice(['Male', 'Female', 'Other']),
+                'school': school,
+                'grade_level': rng.choice(['Freshman', 'Sophomore', 'Junior', 'Senior']),
+                'interests': interests,
+                'password': hashed_password,
+                'bio': None,
+                'profile_pic': None,
+                'created_at': signup_start + signup_step * index
+            })
+            if index in sample_users:
+                schools[school]['user_ids'].append(str(_id))
+
+        stride = _scatter(num_users, seed + school_index)
+        for index in range(num_events):
+            category = rng.choices(categories, category_weights)[0]
+            template = rng.choice(templates[category])
+            host_index = _zipf_index(rng, num_users, host_skew) * stride % num_users
+            first, last = _user_name(host_index)
+            host_id = str(user_id(host_index))
+
+            day = today + timedelta(days=rng.randint(-past_days, future_days))
+            schedule = normalize_schedule(day, time_text=template['time'])
+            created_at = min(schedule['date'], today) - timedelta(days=rng.uniform(0, 30))
+            _id = _object_id(_EVENT, school_index, index, created_at)
+
+            # Heavy-tailed attendance, capped by the school's size
+            extra = int(attendance_scale * rng.paretovariate(attendance_alpha)) if attendance_scale else 0
+            extra = min(extra, max_attendees - 1, num_users - 1)
+            attendees = [i for i in rng.sample(range(num_users), extra + 1) if i != host_index][:extra]
+            attendees.append(host_index)
+
+            events.add({
+                '_id': _id,
+                'title': template['title'],
+                'description': template['description'],
+                'category': category,
+                'date': schedule['date'],
+                'time': template['time'],
+                'start_time': schedule['start_time'],
+                'end_time': schedule['end_time'],
+                'location': template['location'],
+                'school_years': 'All',
+                'genders': 'All',
+                'image': template['image'],
+                'host': f'{first} {last}',
+                'host_id': host_id,
+                'school': school,
+                'attendees_count': len(attendees),
+                'created_at': created_at
+            })
+            # Registrations trickle in between creation and the event (or today, if sooner)
+            window = (min(schedule['date'], today) - created_at).total_seconds()
+            school_rsvps += len(attendees)
+            for attendee in attendees:
+                rsvps.add({
+                    'event_id': _id,
+                    'user_id': str(user_id(attendee)),
+                    'date': schedule['date'],
+                    'created_at': created_at + timedelta(seconds=rng.uniform(0, window))
+                })
+            if index in sample_events:
+                schools[school]['event_ids'].append(str(_id))
+
+        print(f"✓ {school}: {num_users} users, {num_events} events, {school_rsvps} RSVPs")
+
+    for writer in (users, events, rsvps):
+        writer.flush()
+
+    print("Building indexes...")
+    ensure_indexes(db)
+    return schools
+
+
+if __name__ == '__main__':
+    from pymongo import MongoClient
+    from dotenv import load_dotenv
+    import argparse
+
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description='Generate skewed synthetic users, events and RSVPs')
+    parser.add_argument('--mongo-uri', default=os.environ.get('MONGO_URI'),
+                        help='target database - its users, events and RSVPs are replaced')
+    parser.add_argument('--schools', type=int, default=3)
+    parser.add_argument('--users', type=int, default=1000, help='average users per school')
+    parser.add_argument('--events', type=int, default=500, help='average events per school')
+    parser.add_argument('--rsvps', type=int, default=20, help='average RSVPs per event')
+    parser.add_argument('--password', default='benchmark', help='password shared by every user')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--batch-size', type=int, default=GENERATE_BATCH_SIZE)
+    parser.add_argument('--school-skew', type=float, default=1.0, help='Zipf exponent of school sizes (0 = equal)')
+    parser.add_argument('--host-skew', type=float, default=1.2, help='Zipf exponent of events per host (0 = even)')
+    parser.add_argument('--attendance-alpha', type=float, default=1.5,
+                        help='Pareto shape of RSVPs per event (lower = more blockbuster events)')
+    parser.add_argument('--yes', action='store_true', help="don't ask before replacing the data")
+    args = parser.parse_args()
+
+    db = MongoClient(args.mongo_uri).get_database()
+    if not args.yes:
+        confirm = input(f"⚠ This replaces all users, events and RSVPs in '{db.name}'. Continue? (yes/no): ")
+        if confirm.strip().lower() != 'yes':
+            print("❌ Cancelled")
+            sys.exit(1)
+
+    started = time.perf_counter()
+    generate(db, args.schools, args.users, args.events, args.rsvps, password=args.password, seed=args.seed,
+             batch_size=args.batch_size, school_skew=args.school_skew, host_skew=args.host_skew,
+             attendance_alpha=args.attendance_alpha)
+    elapsed = time.perf_counter() - started
+
+    counts = {name: db[name].estimated_document_count() for name in ('users', 'events', 'rsvps')}
+    print(f"\n=== Summary ===")
+    for name, count in counts.items():
+        print(f"✓ {name}: {count}")
+    print(f"✓ {sum(counts.values()) / elapsed:.0f} documents/s over {elapsed:.1f}s")
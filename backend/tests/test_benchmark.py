@@ -0,0 +1,32 @@
+import pytest
+
+pytest.importorskip('pymongo')
+
+from benchmark import parse_sweep, recommend, summarize
+
+
+def test_parse_sweep():
+    assert parse_sweep('3x4, 5X8') == [(3, 4), (5, 8)]
+    for text in ('3', '0x4', '3x', 'ax4'):
+        with pytest.raises(ValueError):
+            parse_sweep(text)
+
+
+def test_summarize():
+    results = {
+        'a': {'requests': 100, 'rps': 100.0, 'p95_ms': 20.0, 'statuses': {'200': 100}},
+        'b': {'requests': 100, 'rps': 50.0, 'p95_ms': 35.0, 'statuses': {'200': 98, '500': 2}},
+    }
+    # 200 requests in 1s + 2s
+    assert summarize(results) == {'rps': 66.7, 'worst_p95_ms': 35.0, 'errors': 2}
+
+
+def test_recommend_prefers_throughput_within_the_latency_tolerance():
+    sweep = {
+        (3, 4): {'rps': 500.0, 'worst_p95_ms': 40.0, 'errors': 0},
+        (5, 4): {'rps': 700.0, 'worst_p95_ms': 45.0, 'errors': 0},
+        (9, 8): {'rps': 900.0, 'worst_p95_ms': 90.0, 'errors': 0},
+        (2, 2): {'rps': 2000.0, 'worst_p95_ms': 10.0, 'errors': 3},
+    }
+    assert recommend(sweep, 0.2) == (5, 4)
+    assert recommend({(2, 2): sweep[(2, 2)]}, 0.2) is None
@@ -0,0 +1,137 @@
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+import dates
+from dates import normalize_schedule, parse_clock, parse_date, parse_date_range, parse_time_range, start_of_today
+
+
+@pytest.fixture(autouse=True)
+def eastern(monkeypatch):
+    monkeypatch.setattr(dates, 'EVENT_TIMEZONE', ZoneInfo('America/New_York'))
+
+
+def freeze_utc(monkeypatch, instant):
+    """Make dates.py see instant (a UTC datetime) as the current time"""
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return instant.replace(tzinfo=timezone.utc).astimezone(tz)
+    monkeypatch.setattr(dates, 'datetime', FrozenDatetime)
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('18:30', (18, 30)),
+    ('6:30 PM', (18, 30)),
+    ('6pm', (18, 0)),
+    ('12:00 AM', (0, 0)),
+    ('12:15 p.m.', (12, 15)),
+])
+def test_parse_clock(text, expected):
+    assert parse_clock(text) == expected
+
+
+@pytest.mark.parametrize('text', ['25:00', '13 PM', '0:00 AM', 'noon', '6:60'])
+def test_parse_clock_rejects_invalid_times(text):
+    with pytest.raises(ValueError):
+        parse_clock(text)
+
+
+def test_parse_date_converts_to_the_event_timezone():
+    assert parse_date('2025-03-01T17:00:00Z') == datetime(2025, 3, 1, 12)
+    assert parse_date('2025-03-01T12:00:00-05:00') == datetime(2025, 3, 1, 12)
+    assert parse_date('2025-07-01T12:00:00-07:00') == datetime(2025, 7, 1, 15)
+    assert parse_date('2025-03-01') == datetime(2025, 3, 1)
+
+
+def test_evening_event_is_still_upcoming(monkeypatch):
+    # 9:30 PM in New York is already the next day in UTC
+    freeze_utc(monkeypatch, datetime(2025, 3, 2, 2, 30))
+    assert start_of_today() == datetime(2025, 3, 1)
+
+    tonight = normalize_schedule('2025-03-01', time_text='10:00 PM - 11:30 PM')['date']
+    upcoming = parse_date_range({})
+    assert tonight >= upcoming['$gte']
+
+
+def test_bounds_with_an_offset_match_local_event_dates():
+    event = normalize_schedule('2025-03-01', time_text='7:00 PM - 9:00 PM')['date']
+    # 7 PM Eastern sent as UTC
+    assert parse_date_range({'from': '2025-03-02T00:00:00Z'}) == {'$gte': event}
+
+
+def test_parse_time_range_tolerates_unparseable_parts():
+    assert parse_time_range('3:00 PM - 6:00 PM') == ((15, 0), (18, 0))
+    assert parse_time_range('7pm to 9pm') == ((19, 0), (21, 0))
+    assert parse_time_range('After dinner') == (None, None)
+    assert parse_time_range(None) == (None, None)
+
+
+def test_normalize_schedule_from_time_text():
+    schedule = normalize_schedule('2025-03-01', time_text='3:00 PM - 6:00 PM')
+    assert schedule == {
+        'date': datetime(2025, 3, 1, 15),
+        'start_time': datetime(2025, 3, 1, 15),
+        'end_time': datetime(2025, 3, 1, 18),
+    }
+
+
+def test_normalize_schedule_explicit_times_win_over_text():
+    schedule = normalize_schedule('2025-03-01', '10:00', '11:30', '3:00 PM - 6:00 PM')
+    assert schedule['start_time'] == datetime(2025, 3, 1, 10)
+    assert schedule['end_time'] == datetime(2025, 3, 1, 11, 30)
+
+
+def test_normalize_schedule_end_before_start_is_next_day():
+    schedule = normalize_schedule('2025-03-01', time_text='10:00 PM - 2:00 AM')
+    assert schedule['end_time'] == datetime(2025, 3, 2, 2)
+
+
+def test_normalize_schedule_datetime_date_is_the_start():
+    schedule = normalize_schedule('2025-03-01T19:00:00')
+    assert schedule['date'] == datetime(2025, 3, 1, 19)
+    assert schedule['start_time'] == datetime(2025, 3, 1, 19)
+    assert schedule['end_time'] is None
+
+
+def test_normalize_schedule_without_times():
+    schedule = normalize_schedule('2025-03-01', time_text='TBA')
+    assert schedule == {'date': datetime(2025, 3, 1), 'start_time': None, 'end_time': None}
+
+
+def test_normalize_schedule_requires_a_date():
+    with pytest.raises(ValueError):
+        normalize_schedule('')
+    with pytest.raises(ValueError):
+        normalize_schedule('next tuesday')
+
+
+def test_parse_date_range_defaults_to_upcoming():
+    assert parse_date_range({}) == {'$gte': start_of_today()}
+    assert parse_date_range({}, default_upcoming=False) == {}
+
+
+def test_parse_date_range_bare_to_date_includes_the_day():
+    condition = parse_date_range({'from': '2025-03-01', 'to': '2025-03-31'})
+    assert condition == {'$gte': datetime(2025, 3, 1), '$lt': datetime(2025, 4, 1)}
+
+
+def test_parse_date_range_datetime_to_is_inclusive():
+    condition = parse_date_range({'to': '2025-03-31T12:00:00'})
+    assert condition == {'$lte': datetime(2025, 3, 31, 12)}
+
+
+def test_parse_date_range_only_to_has_no_lower_bound():
+    tomorrow = (start_of_today() + timedelta(days=1)).strftime('%Y-%m-%d')
+    assert '$gte' not in parse_date_range({'to': tomorrow})
+
+
+@pytest.mark.parametrize('args', [
+    {'from': 'yesterday'},
+    {'to': '2025-13-01'},
+    {'from': '2025-03-02', 'to': '2025-03-01T00:00:00'},
+])
+def test_parse_date_range_rejects_invalid(args):
+    with pytest.raises(ValueError):
+        parse_date_range(args)
@@ -0,0 +1,96 @@
+import io
+
+import pytest
+
+pytest.importorskip('pymongo')
+
+import event_import
+from event_import import ImportFormatError, parse_import
+
+
+def rows(body, mimetype):
+    return list(parse_import(io.BytesIO(body.encode('utf-8')), mimetype))
+
+
+def test_json_array_rows():
+    body = '[{"title": "A"}, {"title": "B"},\n {"title": "C"}]'
+    assert rows(body, 'application/json') == [
+        (1, {'title': 'A'}, None),
+        (2, {'title': 'B'}, None),
+        (3, {'title': 'C'}, None),
+    ]
+
+
+def test_json_array_empty():
+    assert rows('  [ ]  ', 'application/json') == []
+
+
+def test_json_array_element_split_across_chunks(monkeypatch):
+    monkeypatch.setattr(event_import, 'READ_CHUNK_SIZE', 7)
+    body = '[{"title": "Trivia night", "location": "Union"}, {"title": "Café"}]'
+    assert [data for _, data, _ in rows(body, 'application/json')] == [
+        {'title': 'Trivia night', 'location': 'Union'},
+        {'title': 'Café'},
+    ]
+
+
+def test_json_requires_an_array():
+    with pytest.raises(ImportFormatError) as e:
+        rows('{"title": "A"}', 'application/json')
+    assert e.value.row == 1
+
+
+def test_json_invalid_element_reports_its_row():
+    parsed = parse_import(io.BytesIO(b'[{"title": "A"}, {"title": }]'), 'application/json')
+    assert next(parsed) == (1, {'title': 'A'}, None)
+    with pytest.raises(ImportFormatError) as e:
+        next(parsed)
+    assert e.value.row == 2
+
+
+def test_json_missing_separator():
+    with pytest.raises(ImportFormatError) as e:
+        rows('[{"title": "A"} {"title": "B"}]', 'application/json')
+    assert e.value.row == 2
+
+
+def test_ndjson_rows_use_line_numbers():
+    body = '{"title": "A"}\n\n{"title": \n{"title": "C"}\n'
+    parsed = rows(body, 'application/x-ndjson')
+    assert [(row, data) for row, data, _ in parsed] == [(1, {'title': 'A'}), (3, None), (4, {'title': 'C'})]
+    # A bad line is reported and the rest still parse
+    assert parsed[0][2] is None and parsed[2][2] is None
+    assert parsed[1][2].startswith('Invalid JSON')
+
+
+def test_csv_rows_strip_spaces_and_overflow_columns():
+    body = 'title, location\nTrivia , Union\nChess,Library,extra\n'
+    assert rows(body, 'text/csv') == [
+        (2, {'title': 'Trivia', 'location': 'Union'}, None),
+        (3, {'title': 'Chess', 'location': 'Library'}, None),
+    ]
+
+
+def test_csv_quoted_newline_reports_the_ending_line():
+    body = 'title,description\nA,"two\nlines"\nB,one\n'
+    assert rows(body, 'text/csv') == [
+        (3, {'title': 'A', 'description': 'two\nlines'}, None),
+        (4, {'title': 'B', 'description': 'one'}, None),
+    ]
+
+
+def test_unsupported_content_type():
+    with pytest.raises(ValueError):
+        parse_import(io.BytesIO(b''), 'text/plain')
+
+
+@pytest.mark.parametrize('mimetype, body', [
+    ('application/json', '[' + ', '.join(['{"title": "A"}'] * 20) + ']'),
+    ('application/x-ndjson', '{"title": "A"}\n' * 20),
+    ('text/csv', 'title\n' + 'A\n' * 100),
+])
+def test_body_over_the_size_limit_stops_the_import(monkeypatch, mimetype, body):
+    # A chunked upload has no Content-Length, so the limit is enforced while reading
+    monkeypatch.setattr(event_import, 'IMPORT_MAX_BYTES', 64)
+    with pytest.raises(ImportFormatError, match='larger than 64 bytes'):
+        rows(body, mimetype)
@@ -0,0 +1,60 @@
+import pytest
+
+pytest.importorskip('pymongo')
+
+from pymongo.errors import ServerSelectionTimeoutError
+
+from indexes import INDEXES, IndexBuildError, ensure_indexes
+
+
+class FakeCollection:
+    def __init__(self, db, name):
+        self.db = db
+        self.name = name
+
+    def create_index(self, keys, **options):
+        label = f"{self.name}.{options['name']}"
+        if self.db.unreachable:
+            self.db.attempts += 1
+            raise ServerSelectionTimeoutError('No servers found')
+        if label in self.db.failing:
+            raise RuntimeError('E11000 duplicate key error')
+        self.db.created.append((label, bool(options.get('unique'))))
+
+
+class FakeDB:
+    def __init__(self, failing=(), unreachable=False):
+        self.failing = set(failing)
+        self.unreachable = unreachable
+        self.attempts = 0
+        self.created = []
+
+    def __getitem__(self, name):
+        return FakeCollection(self, name)
+
+
+def test_creates_every_index_unique_first():
+    db = FakeDB()
+    ensure_indexes(db)
+    assert len(db.created) == sum(len(indexes) for indexes in INDEXES.values())
+    flags = [unique for _, unique in db.created]
+    assert flags == sorted(flags, reverse=True)
+
+
+def test_one_failure_does_not_stop_the_others():
+    db = FakeDB(failing={'users.email_unique'})
+    with pytest.raises(IndexBuildError) as e:
+        ensure_indexes(db)
+
+    assert [label for label, _ in e.value.failures] == ['users.email_unique']
+    created = [label for label, _ in db.created]
+    assert 'rsvps.event_user_unique' in created
+    assert 'waitlist.event_user_unique' in created
+    assert len(created) == sum(len(indexes) for indexes in INDEXES.values()) - 1
+
+
+def test_unreachable_server_fails_fast():
+    db = FakeDB(unreachable=True)
+    with pytest.raises(ServerSelectionTimeoutError):
+        ensure_indexes(db)
+    assert db.attempts == 1
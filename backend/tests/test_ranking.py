@@ -0,0 +1,177 @@
+from datetime import datetime, timedelta
+from itertools import count
+
+import pytest
+
+pytest.importorskip('bson')
+
+import ranking
+from dates import start_of_today
+from pagination import decode_cursor, fetch_ranked_page
+
+
+class FakeId:
+    """Orderable stand-in for an ObjectId"""
+
+    _counter = count()
+
+    def __init__(self, generation_time):
+        self.n = next(self._counter)
+        self.generation_time = generation_time
+
+    def __lt__(self, other):
+        return self.n < other.n
+
+    def __hash__(self):
+        return self.n
+
+    def __eq__(self, other):
+        return isinstance(other, FakeId) and self.n == other.n
+
+
+def _matches(doc, query):
+    for key, condition in query.items():
+        value = doc.get(key)
+        if not isinstance(condition, dict):
+            if value != condition:
+                return False
+            continue
+        for op, operand in condition.items():
+            if op == '$in' and value not in operand or op == '$ne' and value == operand \
+                    or op == '$gte' and not value >= operand or op == '$lt' and not value < operand \
+                    or op == '$lte' and not value <= operand:
+                return False
+    return True
+
+
+class FakeCursor(list):
+    def sort(self, field, direction=1):
+        return FakeCursor(sorted(self, key=lambda doc: doc[field], reverse=direction == -1))
+
+    def limit(self, n):
+        return FakeCursor(self[:n])
+
+
+class FakeEvents:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find(self, query, projection=None):
+        return FakeCursor(doc for doc in self.docs if _matches(doc, query))
+
+    def distinct(self, field, query):
+        return [doc[field] for doc in self.docs if _matches(doc, query)]
+
+
+class FakeDB:
+    def __init__(self, docs):
+        self.events = FakeEvents(docs)
+
+
+@pytest.fixture(autouse=True)
+def empty_feed_cache():
+    ranking.feed_cache.clear()
+    yield
+    ranking.feed_cache.clear()
+
+
+@pytest.fixture
+def user():
+    return {'_id': 'me', 'school': 'State', 'interests': ['Music'], 'grade_level': 'Junior', 'gender': 'Other'}
+
+
+def make_events(n, days_from_today=1):
+    now = datetime.utcnow()
+    return [{
+        '_id': FakeId(now - timedelta(hours=i)),
+        'school': 'State',
+        'host_id': 'someone',
+        'category': 'Music',
+        'date': start_of_today() + timedelta(days=days_from_today, minutes=i),
+        'attendees_count': i,
+    } for i in range(n)]
+
+
+def page_through(db, user, date_range, limit, narrowed=False):
+    """Follow next_cursor the way the client does - returns the ids of every page"""
+    pages, after = [], None
+    while True:
+        offset = after[1] if after else 0
+        ranked_ids, more = ranking.ranked_event_ids(db, user, date_range, narrowed, offset, limit)
+        docs, next_cursor = fetch_ranked_page(db.events, ranked_ids, after=after, limit=limit, more=more)
+        pages.append([doc['_id'] for doc in docs])
+        if next_cursor is None:
+            return pages
+        after = decode_cursor(next_cursor)
+
+
+@pytest.mark.parametrize('limit', [50, 100, 30])
+def test_paging_continues_past_a_full_feed(user, limit):
+    events = make_events(ranking.FEED_SIZE + 70)
+    db = FakeDB(events)
+    pages = page_through(db, user, {'$gte': start_of_today()}, limit)
+
+    seen = [event_id for page in pages for event_id in page]
+    assert len(seen) == len(events)
+    assert set(seen) == {event['_id'] for event in events}
+    assert pages[-1]
+
+
+def test_small_feed_ends_with_its_last_page(user):
+    db = FakeDB(make_events(60))
+    pages = page_through(db, user, {'$gte': start_of_today()}, 50)
+    assert [len(page) for page in pages] == [50, 10]
+
+
+def test_past_events_are_ranked_directly(user):
+    past = make_events(5, days_from_today=-3)
+    db = FakeDB(past + make_events(5))
+    ranked_ids, more = ranking.ranked_event_ids(db, user, {'$lt': start_of_today()}, narrowed=True)
+    assert set(ranked_ids) == {event['_id'] for event in past}
+    assert not more
+    # The cached feed was never built for a past-only query
+    assert len(ranking.feed_cache) == 0
+
+
+def cache_feed(db, user, version):
+    ranking.get_feed(db, user, True, version)
+    return ranking.feed_cache.get((str(user['_id']), True))
+
+
+def test_refresh_only_visits_the_schools_feeds(user):
+    db = FakeDB(make_events(10))
+    other = dict(user, _id='them', school='Tech')
+    cache_feed(db, user, 1)
+    other_feed = cache_feed(db, other, 1)
+
+    new_event = dict(make_events(1)[0], attendees_count=150)
+    ranking.refresh_events([new_event], 2)
+
+    feed = ranking.feed_cache.get(('me', True))
+    assert feed['version'] == 2
+    assert new_event['_id'] in {event_id for _, event_id in feed['items']}
+    assert [score for score, _ in feed['items']] == sorted((score for score, _ in feed['items']), reverse=True)
+    # The other school's feed is untouched, version and all
+    assert ranking.feed_cache.get(('them', True)) is other_feed
+
+
+def test_refresh_drops_feeds_that_missed_a_write(user):
+    db = FakeDB(make_events(10))
+    cache_feed(db, user, 1)
+    ranking.refresh_events(make_events(1), 3)
+    assert ranking.feed_cache.get(('me', True)) is None
+
+
+def test_refresh_moves_an_edited_event_and_keeps_the_feed_size(user, monkeypatch):
+    monkeypatch.setattr(ranking, 'FEED_SIZE', 5)
+    events = make_events(8)
+    db = FakeDB(events)
+    feed = cache_feed(db, user, 1)
+    assert len(feed['items']) == 5
+
+    # The last-ranked event in the feed moves to the other category - it leaves every interests feed
+    edited = dict(next(event for event in events if event['_id'] == feed['items'][-1][1]), category='Art')
+    ranking.refresh_events([edited], 2)
+    items = ranking.feed_cache.get(('me', True))['items']
+    assert edited['_id'] not in {event_id for _, event_id in items}
+    assert len(items) == 4
@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from serializers import CARD_DESCRIPTION_LENGTH, event_projection, serialize_event
+
+
+def test_card_projection_flags_truncated_descriptions():
+    projection = event_projection('card')
+    assert projection['description'] == {
+        '$substrCP': [{'$ifNull': ['$description', '']}, 0, CARD_DESCRIPTION_LENGTH]
+    }
+    assert projection['description_truncated'] == {
+        '$gt': [{'$strLenCP': {'$ifNull': ['$description', '']}}, CARD_DESCRIPTION_LENGTH]
+    }
+    assert 'description_truncated' not in event_projection('detail')
+
+
+def test_serialize_card():
+    event = {'_id': 'abc', 'title': 'Trivia', 'description': 'Short', 'date': datetime(2025, 3, 1, 19),
+             'description_truncated': True}
+    data = serialize_event(event, 'card', is_registered=False)
+    assert data['id'] == 'abc'
+    assert data['date'] == '2025-03-01T19:00:00'
+    assert data['description_truncated'] is True
+    assert data['attendees_count'] == 0
+    assert data['is_registered'] is False
+
+    # Documents read without the card projection were never cut
+    del event['description_truncated']
+    assert serialize_event(event, 'card')['description_truncated'] is False
@@ -0,0 +1,221 @@
+from datetime import datetime, timedelta
+from itertools import count
+from threading import Barrier, Lock, Thread
+
+import pytest
+
+pytest.importorskip('pymongo')
+
+from pymongo.errors import DuplicateKeyError
+
+from waitlist import (claim_seat, is_waitlisted, join_waitlist, leave_waitlist, promote_waitlisted, release_seat,
+                      waitlist_position)
+
+
+def _value(doc, operand):
+    return doc.get(operand[1:]) if isinstance(operand, str) and operand.startswith('$') else operand
+
+
+def _matches(doc, query):
+    for key, condition in query.items():
+        if key == '$or':
+            if not any(_matches(doc, option) for option in condition):
+                return False
+        elif key == '$expr':
+            (op, (left, right)), = condition.items()
+            assert op == '$lt'
+            if not _value(doc, left) < _value(doc, right):
+                return False
+        elif isinstance(condition, dict):
+            (op, bound), = condition.items()
+            assert op == '$lte'
+            if not doc.get(key) <= bound:
+                return False
+        elif doc.get(key) != condition:
+            return False
+    return True
+
+
+class FakeCollection:
+    """
+    The few collection methods waitlist.py uses. Each call holds one lock,
+    so every operation is atomic on its own, as single-document writes are
+    in MongoDB - but nothing more than that.
+    """
+
+    _ids = count()
+
+    def __init__(self, unique=None):
+        self.docs = []
+        self.unique = unique
+        self.lock = Lock()
+
+    def insert_one(self, doc):
+        with self.lock:
+            if self.unique and any(all(d[f] == doc[f] for f in self.unique) for d in self.docs):
+                raise DuplicateKeyError('duplicate key')
+            self.docs.append(dict(doc, _id=next(self._ids)))
+
+    def find_one(self, query, projection=None):
+        with self.lock:
+            return next((dict(d) for d in self.docs if _matches(d, query)), None)
+
+    def find_one_and_update(self, query, update, projection=None, return_document=None):
+        with self.lock:
+            doc = next((d for d in self.docs if _matches(d, query)), None)
+            if doc is None:
+                return None
+            for field, amount in update['$inc'].items():
+                doc[field] = doc.get(field, 0) + amount
+            return dict(doc)
+
+    def find_one_and_delete(self, query, sort=None):
+        with self.lock:
+            matching = [d for d in self.docs if _matches(d, query)]
+            if not matching:
+                return None
+            doc = min(matching, key=lambda d: tuple(d[field] for field, _ in sort))
+            self.docs.remove(doc)
+            return doc
+
+    def delete_one(self, query):
+        with self.lock:
+            doc = next((d for d in self.docs if _matches(d, query)), None)
+            if doc is not None:
+                self.docs.remove(doc)
+
+            class Result:
+                deleted_count = 0 if doc is None else 1
+            return Result()
+
+    def count_documents(self, query):
+        with self.lock:
+            return sum(1 for d in self.docs if _matches(d, query))
+
+
+class FakeDB:
+    def __init__(self):
+        self.events = FakeCollection()
+        self.rsvps = FakeCollection(unique=('event_id', 'user_id'))
+        self.waitlist = FakeCollection(unique=('event_id', 'user_id'))
+
+
+@pytest.fixture
+def db():
+    return FakeDB()
+
+
+def add_event(db, capacity, attendees_count=0):
+    db.events.insert_one({'capacity': capacity, 'attendees_count': attendees_count})
+    return db.events.docs[-1]['_id']
+
+
+def attendees(db, event_id):
+    return db.events.find_one({'_id': event_id})['attendees_count']
+
+
+def run_concurrently(target, args_list):
+    # Start every thread at once to give the calls the best chance to interleave
+    barrier = Barrier(len(args_list))
+    results = [None] * len(args_list)
+
+    def run(i, args):
+        barrier.wait()
+        results[i] = target(*args)
+
+    threads = [Thread(target=run, args=(i, args)) for i, args in enumerate(args_list)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_claim_seat_until_full(db):
+    event_id = add_event(db, capacity=2)
+    assert claim_seat(db, event_id) == 1
+    assert claim_seat(db, event_id) == 2
+    assert claim_seat(db, event_id) is None
+    assert attendees(db, event_id) == 2
+
+
+def test_claim_seat_without_capacity(db):
+    event_id = add_event(db, capacity=None, attendees_count=500)
+    assert claim_seat(db, event_id) == 501
+
+
+def test_concurrent_claims_never_oversubscribe(db):
+    event_id = add_event(db, capacity=5)
+    results = run_concurrently(claim_seat, [(db, event_id)] * 40)
+    assert sorted(r for r in results if r is not None) == [1, 2, 3, 4, 5]
+    assert attendees(db, event_id) == 5
+
+
+def test_waitlist_order_and_position(db):
+    event_id = add_event(db, capacity=1, attendees_count=1)
+    assert join_waitlist(db, event_id, 'a')
+    assert join_waitlist(db, event_id, 'b')
+    assert not join_waitlist(db, event_id, 'a')
+    db.waitlist.docs[0]['created_at'] -= timedelta(seconds=1)
+    assert waitlist_position(db, event_id, 'a') == 1
+    assert waitlist_position(db, event_id, 'b') == 2
+    assert waitlist_position(db, event_id, 'c') is None
+
+    assert leave_waitlist(db, event_id, 'a')
+    assert not leave_waitlist(db, event_id, 'a')
+    assert not is_waitlisted(db, event_id, 'a')
+    assert waitlist_position(db, event_id, 'b') == 1
+
+
+def test_promote_does_nothing_while_full(db):
+    event_id = add_event(db, capacity=1, attendees_count=1)
+    join_waitlist(db, event_id, 'a')
+    assert promote_waitlisted(db, event_id) == []
+    assert is_waitlisted(db, event_id, 'a')
+    assert attendees(db, event_id) == 1
+
+
+def test_promote_fills_freed_seats_in_join_order(db):
+    event_id = add_event(db, capacity=2, attendees_count=2)
+    start = datetime(2025, 1, 1)
+    for i, user_id in enumerate(['c', 'a', 'b']):
+        db.waitlist.insert_one({'event_id': event_id, 'user_id': user_id, 'date': None,
+                                'created_at': start + timedelta(minutes=i)})
+
+    release_seat(db, event_id)
+    release_seat(db, event_id)
+    assert promote_waitlisted(db, event_id) == ['c', 'a']
+    assert attendees(db, event_id) == 2
+    assert is_waitlisted(db, event_id, 'b')
+    assert db.rsvps.count_documents({'event_id': event_id}) == 2
+
+
+def test_promote_skips_users_already_registered(db):
+    event_id = add_event(db, capacity=1, attendees_count=0)
+    db.rsvps.insert_one({'event_id': event_id, 'user_id': 'a'})
+    join_waitlist(db, event_id, 'a')
+    join_waitlist(db, event_id, 'b')
+    db.waitlist.docs[0]['created_at'] -= timedelta(seconds=1)
+
+    # 'a' is dropped from the waitlist and their seat goes to 'b'
+    assert promote_waitlisted(db, event_id) == ['b']
+    assert attendees(db, event_id) == 1
+    assert not is_waitlisted(db, event_id, 'a')
+
+
+def test_concurrent_promotions_promote_each_user_once(db):
+    event_id = add_event(db, capacity=3, attendees_count=3)
+    for user_id in 'abcdef':
+        join_waitlist(db, event_id, user_id)
+
+    # Three cancellations, each followed by promotion, racing one another
+    def cancel_and_promote():
+        release_seat(db, event_id)
+        return promote_waitlisted(db, event_id)
+
+    results = run_concurrently(cancel_and_promote, [()] * 3)
+    promoted = [user_id for result in results for user_id in result]
+    assert len(promoted) == len(set(promoted)) == 3
+    assert attendees(db, event_id) == 3
+    assert db.rsvps.count_documents({'event_id': event_id}) == 3
+    assert db.waitlist.count_documents({'event_id': event_id}) == 3
@@ -0,0 +1,36 @@
+"""
+Token-bucket rate limiting keyed by any string (an email, an IP address).
+
+Each key gets a bucket of `burst` tokens that refills at `per_minute` tokens a
+minute; an attempt takes one token. Buckets live in an in-process cache and
+expire once they would have refilled completely, so idle keys cost nothing.
+Limits apply per worker process.
+"""
+
+from threading import Lock
+import time
+
+from cache import TTLCache
+
+
+class Throttle:
+    """Per-key token buckets"""
+
+    def __init__(self, burst, per_minute, maxsize=100000):
+        self.burst = burst
+        self.rate = per_minute / 60.0
+        self._buckets = TTLCache(maxsize=maxsize, ttl=burst / self.rate + 1)
+        self._lock = Lock()
+
+    def hit(self, key):
+        """Take a token for key - returns 0 if allowed, else seconds until the next token"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+
+            if tokens >= 1:
+                self._buckets.set(key, (tokens - 1, now))
+                return 0
+            self._buckets.set(key, (tokens, now))
+            return (1 - tokens) / self.rate
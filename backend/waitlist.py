@@ -0,0 +1,94 @@
+"""
+Event capacity and waitlists.
+
+An event may have a capacity (None means unlimited), and its attendees_count
+is the number of seats taken. A seat is claimed with one conditional update
+that only increments the counter while it is below capacity, so a burst of
+concurrent RSVPs can never oversubscribe an event.
+
+Users who find an event full join its waitlist: one document per (event,
+user) in the waitlist collection, unique like RSVPs. They are promoted in
+join order as seats free up. Promotion claims a seat first and then pops the
+oldest entry with find_one_and_delete, so two cancellations never promote
+the same user, and every promoted user has a seat. Whoever joins the
+waitlist or gives a seat back runs promotion afterwards, which covers a
+seat freeing up between a failed claim and the waitlist insert.
+"""
+
+from datetime import datetime
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from rsvps import add_rsvp
+
+
+def claim_seat(db, event_id):
+    """Take a seat if one is free - returns the new attendees_count, or None if the event is full"""
+    event = db.events.find_one_and_update(
+        {'_id': event_id, '$or': [
+            {'capacity': None},
+            {'$expr': {'$lt': ['$attendees_count', '$capacity']}}
+        ]},
+        {'$inc': {'attendees_count': 1}},
+        projection={'attendees_count': 1},
+        return_document=ReturnDocument.AFTER
+    )
+    return event['attendees_count'] if event else None
+
+
+def release_seat(db, event_id):
+    """Give a seat back - returns the new attendees_count"""
+    event = db.events.find_one_and_update(
+        {'_id': event_id},
+        {'$inc': {'attendees_count': -1}},
+        projection={'attendees_count': 1},
+        return_document=ReturnDocument.AFTER
+    )
+    return event['attendees_count'] if event else 0
+
+
+def join_waitlist(db, event_id, user_id, event_date=None):
+    """Add a user to the back of the waitlist - returns False if they were already on it"""
+    try:
+        db.waitlist.insert_one({
+            'event_id': event_id,
+            'user_id': user_id,
+            'date': event_date,
+            'created_at': datetime.utcnow()
+        })
+    except DuplicateKeyError:
+        return False
+    return True
+
+
+def leave_waitlist(db, event_id, user_id):
+    """Take a user off the waitlist - returns False if they weren't on it"""
+    return db.waitlist.delete_one({'event_id': event_id, 'user_id': user_id}).deleted_count == 1
+
+
+def is_waitlisted(db, event_id, user_id):
+    return db.waitlist.find_one({'event_id': event_id, 'user_id': user_id}, {'_id': 1}) is not None
+
+
+def waitlist_position(db, event_id, user_id):
+    """1-based place in line, or None if the user isn't waitlisted"""
+    entry = db.waitlist.find_one({'event_id': event_id, 'user_id': user_id}, {'created_at': 1})
+    if entry is None:
+        return None
+    return db.waitlist.count_documents({'event_id': event_id, 'created_at': {'$lte': entry['created_at']}})
+
+
+def promote_waitlisted(db, event_id):
+    """Fill free seats from the front of the waitlist - returns the ids of the users promoted"""
+    promoted = []
+    # Checking the waitlist first keeps this to one indexed read when nobody is waiting
+    while db.waitlist.find_one({'event_id': event_id}, {'_id': 1}):
+        if claim_seat(db, event_id) is None:
+            break
+        entry = db.waitlist.find_one_and_delete({'event_id': event_id}, sort=[('created_at', 1), ('_id', 1)])
+        if entry and add_rsvp(db, event_id, entry['user_id'], entry.get('date')):
+            promoted.append(entry['user_id'])
+        else:
+            # Another request promoted the last in line, or they were registered already
+            release_seat(db, event_id)
+    return promoted
@@ -61,6 +61,7 @@ const CreateEvent = ({ isOpen, onClose, onEventCreated }) => {
     startTime: '',
     endTime: '',
     location: '',
+    capacity: '',
     schoolYears: [],
     genders: [],
     imageUrl: ''
@@ -133,6 +134,9 @@ const CreateEvent = ({ isOpen, onClose, onEventCreated }) => {
     if (!formData.startTime) newErrors.startTime = 'Start time is required';
     if (!formData.endTime) newErrors.endTime = 'End time is required';
     if (!formData.location.trim()) newErrors.location = 'Location is required';
+    if (formData.capacity !== '' && !(Number.isInteger(Number(formData.capacity)) && Number(formData.capacity) >= 1)) {
+      newErrors.capacity = 'Capacity must be a whole number of at least 1';
+    }
     if (formData.schoolYears.length === 0) newErrors.schoolYears = 'Select at least one school year';
     if (formData.genders.length === 0) newErrors.genders = 'Select at least one gender';
 
@@ -175,7 +179,8 @@ const CreateEvent = ({ isOpen, onClose, onEventCreated }) => {
         location: formData.location,
         school_years: formData.schoolYears.join(', '),
         genders: formData.genders.join(', '),
-        image: validatedImageUrl
+        image: validatedImageUrl,
+        capacity: formData.capacity === '' ? null : Number(formData.capacity)
       };
 
       console.log('Sending event data:', eventData);
@@ -209,6 +214,7 @@ const CreateEvent = ({ isOpen, onClose, onEventCreated }) => {
         startTime: '',
         endTime: '',
         location: '',
+        capacity: '',
         schoolYears: [],
         genders: [],
         imageUrl: ''
@@ -345,6 +351,22 @@ const CreateEvent = ({ isOpen, onClose, onEventCreated }) => {
             {errors.location && <span className="error-message">{errors.location}</span>}
           </div>
 
+          {/* Capacity */}
+          <div className="form-group">
+            <label htmlFor="capacity">Capacity</label>
+            <input
+              type="number"
+              id="capacity"
+              name="capacity"
+              min="1"
+              value={formData.capacity}
+              onChange={handleChange}
+              className={errors.capacity ? 'error' : ''}
+              placeholder="Leave empty for no limit"
+            />
+            {errors.capacity && <span className="error-message">{errors.capacity}</span>}
+          </div>
+
           {/* School Years */}
           <div className="form-group">
             <label>School Years Allowed *</label>
@@ -61,6 +61,7 @@ const EditEvent = ({ isOpen, onClose, eventId, onEventUpdated }) => {
     startTime: '',
     endTime: '',
     location: '',
+    capacity: '',
     schoolYears: [],
     genders: [],
     imageUrl: ''
@@ -105,10 +106,12 @@ const EditEvent = ({ isOpen, onClose, eventId, onEventUpdated }) => {
         title: event.title || '',
         description: event.description || '',
         category: event.category || '',
-        date: event.date || '',
-        startTime: event.start_time || '',
-        endTime: event.end_time || '',
+        // Dates and times come back as ISO datetimes ('2025-03-01T18:30:00')
+        date: event.date ? event.date.slice(0, 10) : '',
+        startTime: event.start_time ? event.start_time.slice(11, 16) : '',
+        endTime: event.end_time ? event.end_time.slice(11, 16) : '',
         location: event.location || '',
+        capacity: event.capacity ? String(event.capacity) : '',
         schoolYears: schoolYears,
         genders: genders,
         imageUrl: event.image || ''
@@ -160,6 +163,9 @@ const EditEvent = ({ isOpen, onClose, eventId, onEventUpdated }) => {
     if (!formData.startTime) newErrors.startTime = 'Start time is required';
     if (!formData.endTime) newErrors.endTime = 'End time is required';
     if (!formData.location.trim()) newErrors.location = 'Location is required';
+    if (formData.capacity !== '' && !(Number.isInteger(Number(formData.capacity)) && Number(formData.capacity) >= 1)) {
+      newErrors.capacity = 'Capacity must be a whole number of at least 1';
+    }
     if (formData.schoolYears.length === 0) newErrors.schoolYears = 'Select at least one school year';
     if (formData.genders.length === 0) newErrors.genders = 'Select at least one gender';
 
@@ -200,7 +206,8 @@ const EditEvent = ({ isOpen, onClose, eventId, onEventUpdated }) => {
         location: formData.location,
         school_years: formData.schoolYears.join(', '),
         genders: formData.genders.join(', '),
-        image: validatedImageUrl
+        image: validatedImageUrl,
+        capacity: formData.capacity === '' ? null : Number(formData.capacity)
       };
 
       const response = await fetch(`http://127.0.0.1:5001/api/events/${eventId}`, {
@@ -354,6 +361,22 @@ const EditEvent = ({ isOpen, onClose, eventId, onEventUpdated }) => {
               {errors.location && <span className="error-message">{errors.location}</span>}
             </div>
 
+            {/* Capacity */}
+            <div className="form-group">
+              <label htmlFor="capacity">Capacity</label>
+              <input
+                type="number"
+                id="capacity"
+                name="capacity"
+                min="1"
+                value={formData.capacity}
+                onChange={handleChange}
+                className={errors.capacity ? 'error' : ''}
+                placeholder="Leave empty for no limit"
+              />
+              {errors.capacity && <span className="error-message">{errors.capacity}</span>}
+            </div>
+
             {/* School Years */}
             <div className="form-group">
               <label>School Years Allowed *</label>
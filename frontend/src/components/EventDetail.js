@@ -21,7 +21,8 @@ const EventDetail = () => {
     const fetchEventDetail = async () => {
       try {
         setLoading(true);
-        const response = await fetch(`http://localhost:5001/api/events/${eventId}`, {
+        // include=host embeds the host's summary, saving a second request
+        const response = await fetch(`http://localhost:5001/api/events/${eventId}?include=host`, {
           method: 'GET',
           headers: {
             'Authorization': `Bearer ${token}`,
@@ -35,11 +36,7 @@ const EventDetail = () => {
 
         const data = await response.json();
         setEvent(data.event || data);
-
-        // Fetch host profile information if host_id is available
-        if (data.event?.host_id) {
-          fetchHostProfile(data.event.host_id);
-        }
+        setHostProfile(data.event?.host_summary || null);
 
         setError(null);
       } catch (err) {
@@ -50,25 +47,6 @@ const EventDetail = () => {
       }
     };
 
-    const fetchHostProfile = async (hostId) => {
-      try {
-        const response = await fetch(`http://localhost:5001/api/user/${hostId}`, {
-          method: 'GET',
-          headers: {
-            'Authorization': `Bearer ${token}`,
-            'Content-Type': 'application/json'
-          }
-        });
-
-        if (response.ok) {
-          const data = await response.json();
-          setHostProfile(data.user);
-        }
-      } catch (err) {
-        console.error('Error fetching host profile:', err);
-      }
-    };
-
     if (token && eventId) {
       fetchEventDetail();
     }
@@ -86,7 +64,8 @@ const EventDetail = () => {
 
     setIsRsvping(true);
     try {
-      const method = event.user_rsvp ? 'DELETE' : 'POST';
+      // Cancelling covers both a registration and a place on the waitlist
+      const method = event.user_rsvp || event.user_waitlisted ? 'DELETE' : 'POST';
       const response = await fetch(`http://localhost:5001/api/events/${eventId}/rsvp`, {
         method: method,
         headers: {
@@ -105,10 +84,15 @@ const EventDetail = () => {
       // Update event state
       setEvent(prev => ({
         ...prev,
-        user_rsvp: !prev.user_rsvp,
+        user_rsvp: data.registered,
+        user_waitlisted: data.waitlisted,
         attendees_count: data.attendees_count
       }));
 
+      if (data.waitlisted) {
+        alert(`This event is full. You're #${data.waitlist_position} on the waitlist.`);
+      }
+
     } catch (err) {
       console.error('Error updating RSVP:', err);
       alert(err.message || 'Failed to update RSVP. Please try again.');
@@ -117,6 +101,16 @@ const EventDetail = () => {
     }
   };
 
+  const isFull = () => event.capacity && event.attendees_count >= event.capacity;
+
+  const signUpLabel = () => {
+    if (isUserHost()) return 'Hosting';
+    if (isRsvping) return 'Loading...';
+    if (event.user_rsvp) return 'Cancel RSVP';
+    if (event.user_waitlisted) return 'Leave Waitlist';
+    return isFull() ? 'Join Waitlist' : 'Sign Up';
+  };
+
   const isUserHost = () => {
     if (!event || !user) return false;
     return event.host_id === user.id;
@@ -253,13 +247,15 @@ const EventDetail = () => {
             {/* Sign Up Button and Attendees */}
             <div className="event-detail-actions">
               <button
-                className={`sign-up-button ${isUserHost() ? 'host-button' : event.user_rsvp ? 'rsvp-active' : ''}`}
+                className={`sign-up-button ${isUserHost() ? 'host-button' : event.user_rsvp || event.user_waitlisted ? 'rsvp-active' : ''}`}
                 onClick={handleSignUp}
                 disabled={isRsvping || isUserHost()}
               >
-                {isUserHost() ? 'Hosting' : (isRsvping ? 'Loading...' : (event.user_rsvp ? 'Cancel RSVP' : 'Sign Up'))}
+                {signUpLabel()}
               </button>
-              <p className="attendees-count">{event.attendees_count || 0} Attending</p>
+              <p className="attendees-count">
+                {event.attendees_count || 0}{event.capacity ? ` / ${event.capacity}` : ''} Attending
+              </p>
             </div>
           </div>
         </div>
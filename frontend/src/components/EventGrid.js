@@ -9,29 +9,41 @@ const EventGrid = () => {
   const [events, setEvents] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     fetchEvents();
   }, [category]);
 
-  const fetchEvents = async () => {
-    try {
-      setLoading(true);
-      const token = localStorage.getItem('token');
-
-      const response = await fetch(`http://localhost:5001/api/events/category/${category}`, {
-        headers: {
-          'Authorization': `Bearer ${token}`,
-          'Content-Type': 'application/json'
-        }
-      });
+  // Fetch one page of the category; with a cursor the page is added to the list
+  const fetchPage = async (cursor = null) => {
+    const token = localStorage.getItem('token');
+    let url = `http://localhost:5001/api/events/category/${category}`;
+    if (cursor) {
+      url += `?cursor=${encodeURIComponent(cursor)}`;
+    }
 
-      if (!response.ok) {
-        throw new Error('Failed to fetch events');
+    const response = await fetch(url, {
+      headers: {
+        'Authorization': `Bearer ${token}`,
+        'Content-Type': 'application/json'
       }
+    });
 
-      const data = await response.json();
-      setEvents(data.events);
+    if (!response.ok) {
+      throw new Error('Failed to fetch events');
+    }
+
+    const data = await response.json();
+    setEvents(prev => cursor ? [...prev, ...(data.events || [])] : (data.events || []));
+    setNextCursor(data.next_cursor || null);
+  };
+
+  const fetchEvents = async () => {
+    try {
+      setLoading(true);
+      await fetchPage();
       setLoading(false);
     } catch (err) {
       setError(err.message);
@@ -39,6 +51,17 @@ const EventGrid = () => {
     }
   };
 
+  const handleLoadMore = async () => {
+    try {
+      setLoadingMore(true);
+      await fetchPage(nextCursor);
+    } catch (err) {
+      setError(err.message);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleViewEvent = (eventId) => {
     navigate(`/event/${eventId}`);
   };
@@ -73,7 +96,9 @@ const EventGrid = () => {
           ← Back to Explore
         </button>
         <h2>{category} Events</h2>
-        <p>{events.length} {events.length === 1 ? 'event' : 'events'} available</p>
+        <p>
+          {events.length}{nextCursor ? '+' : ''} {events.length === 1 && !nextCursor ? 'event' : 'events'} available
+        </p>
       </div>
 
       {events.length === 0 ? (
@@ -120,7 +145,14 @@ const EventGrid = () => {
                   </div>
                 )}
                 {event.description && (
-                  <p className="event-description">{event.description}</p>
+                  <p className="event-description">
+                    {event.description_truncated ? (
+                      <>
+                        {event.description.trimEnd()}…{' '}
+                        <span className="read-more">Read more</span>
+                      </>
+                    ) : event.description}
+                  </p>
                 )}
                 {event.host && (
                   <div className="event-host">
@@ -132,6 +164,18 @@ const EventGrid = () => {
           ))}
         </div>
       )}
+
+      {nextCursor && (
+        <div className="load-more-container">
+          <button
+            className="load-more-button"
+            onClick={handleLoadMore}
+            disabled={loadingMore}
+          >
+            {loadingMore ? 'Loading...' : 'Load More'}
+          </button>
+        </div>
+      )}
     </div>
   );
 };
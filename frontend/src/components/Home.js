@@ -11,6 +11,8 @@ const Home = () => {
   const [events, setEvents] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [welcomeMessage, setWelcomeMessage] = useState('');
   // const [isCreateEventOpen, setIsCreateEventOpen] = useState(false);
 
@@ -45,24 +47,35 @@ const Home = () => {
     }
   };
 
+  // Fetch one page of the feed; with a cursor the page is added to the list
+  const fetchEvents = async (cursor = null) => {
+    let url = 'http://localhost:5001/api/events/all?interests_only=true';
+    if (cursor) {
+      url += `&cursor=${encodeURIComponent(cursor)}`;
+    }
+
+    const response = await fetch(url, {
+      method: 'GET',
+      headers: {
+        'Authorization': `Bearer ${token}`,
+        'Content-Type': 'application/json'
+      }
+    });
+
+    if (!response.ok) {
+      throw new Error('Failed to fetch events');
+    }
+
+    const data = await response.json();
+    setEvents(prev => cursor ? [...prev, ...(data.events || [])] : (data.events || []));
+    setNextCursor(data.next_cursor || null);
+  };
+
   useEffect(() => {
-    const fetchEvents = async () => {
+    const loadEvents = async () => {
       try {
         setLoading(true);
-        const response = await fetch('http://localhost:5001/api/events/all?interests_only=true', {
-          method: 'GET',
-          headers: {
-            'Authorization': `Bearer ${token}`,
-            'Content-Type': 'application/json'
-          }
-        });
-
-        if (!response.ok) {
-          throw new Error('Failed to fetch events');
-        }
-
-        const data = await response.json();
-        setEvents(data.events || []);
+        await fetchEvents();
         setError(null);
       } catch (err) {
         console.error('Error fetching events:', err);
@@ -73,10 +86,22 @@ const Home = () => {
     };
 
     if (token) {
-      fetchEvents();
+      loadEvents();
     }
   }, [token]);
 
+  const handleLoadMore = async () => {
+    try {
+      setLoadingMore(true);
+      await fetchEvents(nextCursor);
+    } catch (err) {
+      console.error('Error fetching more events:', err);
+      setError(err.message);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleViewEvent = (eventId) => {
     console.log('View event clicked, eventId:', eventId);
     navigate(`/event/${eventId}`);
@@ -145,6 +170,18 @@ const Home = () => {
               ))}
             </div>
           )}
+
+          {!loading && !error && nextCursor && (
+            <div className="load-more-container">
+              <button
+                className="load-more-button"
+                onClick={handleLoadMore}
+                disabled={loadingMore}
+              >
+                {loadingMore ? 'Loading...' : 'Load More'}
+              </button>
+            </div>
+          )}
         </div>
       </div>
     </div>
@@ -31,15 +31,14 @@ const Profile = () => {
     ];
 
     useEffect(() => {
-        fetchUserProfile();
-        fetchUserEvents();
-        fetchHostingEvents();
+        fetchDashboard();
     }, []);
 
-    const fetchUserProfile = async () => {
+    // Profile, attending and hosting sections arrive in a single request
+    const fetchDashboard = async () => {
         try {
             const token = localStorage.getItem('token');
-            const response = await fetch('http://127.0.0.1:5001/api/profile', {
+            const response = await fetch('http://127.0.0.1:5001/api/dashboard', {
                 headers: {
                     'Authorization': `Bearer ${token}`,
                     'Content-Type': 'application/json'
@@ -54,29 +53,12 @@ const Profile = () => {
             setUser(data.user);
             setEditedBio(data.user.bio || '');
             setEditedInterests(data.user.interests || []);
+            setAttendingEvents(data.attending.events);
+            setHostingEvents(data.hosting.events);
+            setLoading(false);
         } catch (err) {
             setError(err.message);
-        }
-    };
-
-    const fetchUserEvents = async () => {
-        try {
-            const token = localStorage.getItem('token');
-            const response = await fetch('http://127.0.0.1:5001/api/user/events', {
-                headers: {
-                    'Authorization': `Bearer ${token}`,
-                    'Content-Type': 'application/json'
-                }
-            });
-
-            if (!response.ok) {
-                throw new Error('Failed to fetch events');
-            }
-
-            const data = await response.json();
-            setAttendingEvents(data.events);
-        } catch (err) {
-            setError(err.message);
+            setLoading(false);
         }
     };
 